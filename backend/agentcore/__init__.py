@@ -8,5 +8,6 @@ Files:
   - tools.py        : Tool definitions (action groups) for AgentCore
   - agent.py        : Agent creation + alias deployment via boto3
   - invoke.py       : Invocation wrapper (used by Flask API)
+  - emulator.py     : Offline invoke_agent emulator + tool-pipeline load test
   - deploy.py       : CLI script to deploy/update the AgentCore agent
 """
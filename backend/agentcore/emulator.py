@@ -0,0 +1,313 @@
+"""
+agentcore/emulator.py — Offline AgentCore Emulator
+==================================================
+Deterministic, in-process stand-in for the ``bedrock-agent-runtime`` client.
+
+It speaks the same ``invoke_agent`` contract as Bedrock AgentCore — an event
+stream of ``trace`` / ``chunk`` / ``returnControl`` events, continued via
+``sessionState.returnControlInvocationResults`` — so ``invoke_agentcore`` and
+the real ``dispatch_tool`` functions run unchanged, without AWS.
+
+Enable it for the Flask API with ``AGENTCORE_EMULATOR=true``, or drive it
+directly as a load tester:
+
+    python -m agentcore.emulator --iterations 200 --concurrency 8
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+logger = logging.getLogger(__name__)
+
+ACTION_GROUP = "JanSathiTools"
+
+# Utterances that exercise the tool pipeline without touching the network.
+DEFAULT_UTTERANCES = [
+    "PM Kisan apply karna hai",
+    "I want to check eligibility for pm awas",
+    "list schemes",
+    "what schemes are available for me",
+    "e shram apply",
+]
+
+
+def is_enabled() -> bool:
+    """True when AGENTCORE_EMULATOR is set — read per call so tests can toggle it."""
+    return os.getenv("AGENTCORE_EMULATOR", "false").lower() in ("1", "true", "yes")
+
+
+# ── Planners ──────────────────────────────────────────────────────────────────
+# A planner plays the role of the foundation model: given the turn context it
+# returns the next tool call ({"function", "parameters"}) or None to finish,
+# and renders the final answer from the collected observations.
+
+class RulePlanner:
+    """
+    Default planner: classify_intent first, then branch on the tool output.
+      apply        → validate_eligibility → compute_risk_score
+      anything else → retrieve_knowledge
+    """
+
+    def next_step(self, ctx: dict):
+        obs = ctx["observations"]
+        if not obs:
+            return {
+                "function": "classify_intent",
+                "parameters": {"query": ctx["input_text"], "language": ctx["language"]},
+            }
+
+        intent_result = obs[0][1]
+        intent = intent_result.get("intent", "info")
+        scheme_hint = intent_result.get("scheme_hint", "unknown")
+        done = [name for name, _ in obs]
+
+        if intent == "apply":
+            if "validate_eligibility" not in done:
+                return {
+                    "function": "validate_eligibility",
+                    "parameters": {"slots": ctx["slots"], "scheme_hint": scheme_hint,
+                                   "include_breakdown": False},     # only the verdict is used
+                }
+            if "compute_risk_score" not in done:
+                elig = dict(obs)["validate_eligibility"]
+                return {
+                    "function": "compute_risk_score",
+                    "parameters": {
+                        "rules_score": elig.get("score", 0.0),
+                        "eligible": elig.get("eligible", False),
+                        "intent_confidence": intent_result.get("confidence", 0.85),
+                    },
+                }
+            return None
+
+        if "retrieve_knowledge" not in done:
+            return {
+                "function": "retrieve_knowledge",
+                "parameters": {
+                    "query": ctx["input_text"],
+                    "scheme_hint": scheme_hint,
+                    "language": ctx["language"],
+                },
+            }
+        return None
+
+    def final_text(self, ctx: dict) -> str:
+        results = dict(ctx["observations"])
+        if "compute_risk_score" in results:
+            risk = results["compute_risk_score"]
+            elig = results.get("validate_eligibility", {})
+            verdict = "eligible" if elig.get("eligible") else "not eligible"
+            return f"You appear {verdict}. Decision: {risk.get('decision', 'UNKNOWN')}."
+        chunks = results.get("retrieve_knowledge", {}).get("context_chunks") or []
+        if chunks:
+            return "\n".join(str(c) for c in chunks[:3])
+        return "Please visit india.gov.in for scheme information."
+
+
+class ScriptedPlanner(RulePlanner):
+    """Replays a fixed list of tool calls regardless of tool output."""
+
+    def __init__(self, steps: list):
+        self.steps = list(steps)
+
+    def next_step(self, ctx: dict):
+        i = len(ctx["observations"])
+        return self.steps[i] if i < len(self.steps) else None
+
+
+# ── Emulated runtime client ───────────────────────────────────────────────────
+
+def _encode(value) -> str:
+    """Bedrock sends every Return Control parameter value as a string."""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _trace(orchestration: dict) -> dict:
+    return {"trace": {"trace": {"orchestrationTrace": orchestration}}}
+
+
+class EmulatedAgentRuntime:
+    """
+    Drop-in for ``boto3.client("bedrock-agent-runtime")`` exposing invoke_agent.
+    One pending Return Control per session, exactly like the managed service.
+    """
+
+    def __init__(self, planner=None, think_time_ms: float = 0.0):
+        self.planner = planner or RulePlanner()
+        self.think_time_ms = think_time_ms
+        self._turns = {}
+        self._lock = threading.Lock()
+
+    def invoke_agent(self, **kwargs) -> dict:
+        session_id = kwargs["sessionId"]
+        state = kwargs.get("sessionState") or {}
+        attrs = state.get("sessionAttributes", {})
+
+        with self._lock:
+            if kwargs.get("inputText"):
+                slots = attrs.get("slots")
+                ctx = {
+                    "input_text": kwargs["inputText"],
+                    "language": attrs.get("language", "hi"),
+                    "channel": attrs.get("channel", "web"),
+                    "slots": json.loads(slots) if slots else {},
+                    "observations": [],
+                    "pending": None,
+                }
+                self._turns[session_id] = ctx
+                events = [_trace({"rationale": {"text": f"Planning turn for: {ctx['input_text'][:60]}"}})]
+            else:
+                ctx = self._turns.get(session_id)
+                if ctx is None or ctx["pending"] != state.get("invocationId"):
+                    raise ClientError(
+                        {"Error": {"Code": "ValidationException",
+                                   "Message": "No pending Return Control for this invocationId"}},
+                        "InvokeAgent",
+                    )
+                ctx["pending"] = None
+                events = []
+                for item in state.get("returnControlInvocationResults", []):
+                    fr = item.get("functionResult", {})
+                    body = fr.get("responseBody", {}).get("TEXT", {}).get("body", "{}")
+                    try:
+                        result = json.loads(body)
+                    except ValueError:
+                        result = {"success": False, "raw": body}
+                    ctx["observations"].append((fr.get("function", ""), result))
+                    events.append(_trace({"observation": {"actionGroupInvocationOutput": {"text": body}}}))
+
+        if self.think_time_ms:
+            time.sleep(self.think_time_ms / 1000.0)
+
+        step = self.planner.next_step(ctx)
+        if step is not None:
+            invocation_id = str(uuid.uuid4())
+            with self._lock:
+                ctx["pending"] = invocation_id
+            events.append({
+                "returnControl": {
+                    "invocationId": invocation_id,
+                    "invocationInputs": [{
+                        "functionInvocationInput": {
+                            "actionGroup": ACTION_GROUP,
+                            "function": step["function"],
+                            "parameters": [
+                                {"name": k, "type": "string", "value": _encode(v)}
+                                for k, v in step["parameters"].items()
+                            ],
+                        }
+                    }],
+                }
+            })
+            return {"completion": events, "sessionId": session_id}
+
+        text = self.planner.final_text(ctx)
+        with self._lock:
+            self._turns.pop(session_id, None)
+        events.append(_trace({"observation": {"finalResponse": {"text": text}}}))
+        events.append({"chunk": {"bytes": text.encode("utf-8")}})
+        return {"completion": events, "sessionId": session_id}
+
+
+_emulator = None
+
+
+def get_emulator_client() -> EmulatedAgentRuntime:
+    global _emulator
+    if _emulator is None:
+        think = float(os.getenv("AGENTCORE_EMULATOR_THINK_MS", "0"))
+        _emulator = EmulatedAgentRuntime(think_time_ms=think)
+    return _emulator
+
+
+# ── Load test ─────────────────────────────────────────────────────────────────
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+def run_load_test(
+    utterances: list = None,
+    iterations: int = 100,
+    concurrency: int = 4,
+    language: str = "en",
+    slots: dict = None,
+) -> dict:
+    """
+    Drive invoke_agentcore against the emulator and report throughput and
+    tail latency. Each iteration is one full turn (all Return Control hops).
+    """
+    from agentcore import invoke
+
+    utterances = utterances or DEFAULT_UTTERANCES
+    slots = slots if slots is not None else {"land_holding_acres": 2, "annual_income": 120000}
+    latencies = []
+    errors = 0
+    tool_calls = 0
+    lock = threading.Lock()
+
+    def _turn(i: int):
+        nonlocal errors, tool_calls
+        t0 = time.perf_counter()
+        result = invoke.invoke_agentcore(
+            user_message=utterances[i % len(utterances)],
+            session_id=f"load-{i}",
+            language=language,
+            slots=slots,
+            client=get_emulator_client(),
+        )
+        elapsed = (time.perf_counter() - t0) * 1000
+        calls = sum(1 for t in result.get("thoughts", []) if t.get("type") == "tool_call")
+        with lock:
+            latencies.append(elapsed)
+            tool_calls += calls
+            if result.get("error"):
+                errors += 1
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        list(pool.map(_turn, range(iterations)))
+    wall_s = time.perf_counter() - t_start
+
+    latencies.sort()
+    return {
+        "turns": iterations,
+        "errors": errors,
+        "tool_calls": tool_calls,
+        "concurrency": concurrency,
+        "wall_s": round(wall_s, 3),
+        "throughput_rps": round(iterations / wall_s, 2) if wall_s else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the AgentCore tool pipeline offline")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--language", default="en")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    print(json.dumps(
+        run_load_test(iterations=args.iterations, concurrency=args.concurrency, language=args.language),
+        indent=2,
+    ))
@@ -6,6 +6,8 @@ Handles multi-turn sessions via session_id continuity.
 
 Used when USE_AGENTCORE=true in .env (production mode).
 When USE_AGENTCORE=false, the Flask API uses the local LangGraph supervisor directly.
+With AGENTCORE_EMULATOR=true the offline emulator (agentcore/emulator.py) stands in
+for bedrock-agent-runtime and drives the same tools locally.
 """
 import os
 import json
@@ -20,9 +22,12 @@ logger = logging.getLogger(__name__)
 # ── AgentCore Configuration ────────────────────────────────────────────────────
 AGENT_ID = os.getenv("BEDROCK_AGENT_ID", "")
 AGENT_ALIAS_ID = os.getenv("BEDROCK_AGENT_ALIAS_ID", "TSTALIASID")  # Default test alias
+AGENT_MODEL_ID = os.getenv("BEDROCK_AGENT_MODEL_ID", "amazon.nova-pro-v1:0")  # agent.py FOUNDATION_MODEL
 
 
 from agentcore.tools import dispatch_tool
+from agentcore import emulator
+from app.services.token_usage_service import record_usage
 
 def invoke_agentcore(
     user_message: str,
@@ -38,7 +43,14 @@ def invoke_agentcore(
     Invoke the JanSathi Bedrock AgentCore agent.
     Handles 'Return Control' by dispatching local tools.
     """
-    if not AGENT_ID:
+    # Offline emulator (AGENTCORE_EMULATOR=true) or an injected client share
+    # the exact invoke_agent contract, so everything below runs unchanged.
+    client = kwargs.get("client")
+    if client is None and emulator.is_enabled():
+        client = emulator.get_emulator_client()
+    agent_id = AGENT_ID or ("local-emulator" if client is not None else "")
+
+    if not agent_id:
         logger.error("[AgentCore] BEDROCK_AGENT_ID not set. Use local LangGraph mode.")
         return {
             "response": "AgentCore not configured. Please set BEDROCK_AGENT_ID in .env",
@@ -47,7 +59,8 @@ def invoke_agentcore(
 
     session_id = session_id or str(uuid.uuid4())
     region = os.getenv("AWS_REGION", "us-east-1")
-    client = boto3.client("bedrock-agent-runtime", region_name=region)
+    if client is None:
+        client = boto3.client("bedrock-agent-runtime", region_name=region)
 
     # Initial input state
     input_text = user_message
@@ -71,7 +84,7 @@ def invoke_agentcore(
         try:
             # Prepare invoke arguments
             invoke_kwargs = {
-                "agentId": AGENT_ID,
+                "agentId": agent_id,
                 "agentAliasId": AGENT_ALIAS_ID,
                 "sessionId": session_id,
                 "sessionState": session_state,
@@ -94,6 +107,17 @@ def invoke_agentcore(
                     # Orchestration Trace
                     if "orchestrationTrace" in trace:
                         orch = trace["orchestrationTrace"]
+                        # Token usage of each orchestration model step
+                        usage = (
+                            orch.get("modelInvocationOutput", {})
+                            .get("metadata", {})
+                            .get("usage")
+                        )
+                        if usage:
+                            record_usage(
+                                usage, AGENT_MODEL_ID, label="agentcore:orchestration",
+                                session_id=session_id,
+                            )
                         if "rationale" in orch:
                             thoughts.append({
                                 "type": "rationale",
@@ -12,9 +12,6 @@ import logging
 import sys
 import os
 import inspect
-from pathlib import Path
-
-import yaml
 
 logger = logging.getLogger(__name__)
 
@@ -64,16 +61,14 @@ def retrieve_knowledge(
         # Some Agent planners include metadata fields in every tool call.
         # Keep signature tolerant while preserving existing retrieval behavior.
         _ = intent, session_id
+        from app.services.scheme_catalog import get_scheme_catalog
 
         q = (query or "").lower()
         if any(k in q for k in ["available schemes", "what schemes", "list schemes", "all schemes", "yojana list"]):
-            # App-context-free fallback: read local YAML catalog directly.
-            catalog_path = Path(__file__).resolve().parent.parent / "app" / "data" / "schemes_config.yaml"
+            # App-context-free fallback: the in-memory scheme catalog.
             lines = ["Available government schemes you can explore:"]
-            if catalog_path.exists():
-                with catalog_path.open("r", encoding="utf-8") as f:
-                    parsed = yaml.safe_load(f) or {}
-                schemes = parsed.get("schemes", {}) if isinstance(parsed, dict) else {}
+            schemes = get_scheme_catalog().schemes()
+            if schemes:
                 for i, (sid, item) in enumerate(schemes.items(), start=1):
                     if i > 8:
                         break
@@ -95,14 +90,11 @@ def retrieve_knowledge(
                 }
 
         if any(k in q for k in ["new scheme", "new schemes", "latest scheme", "latest schemes", "today scheme", "today schemes"]):
-            catalog_path = Path(__file__).resolve().parent.parent / "app" / "data" / "schemes_config.yaml"
             lines = ["Latest discoverable schemes and updates (official sources):"]
 
             # Include currently supported schemes from local verified catalog.
-            if catalog_path.exists():
-                with catalog_path.open("r", encoding="utf-8") as f:
-                    parsed = yaml.safe_load(f) or {}
-                schemes = parsed.get("schemes", {}) if isinstance(parsed, dict) else {}
+            schemes = get_scheme_catalog().schemes()
+            if schemes:
                 for i, (sid, item) in enumerate(schemes.items(), start=1):
                     if i > 6:
                         break
@@ -173,11 +165,8 @@ def retrieve_knowledge(
         no_kb_answer = (not results or all("visit india.gov.in" in str(r).lower() for r in results))
 
         if no_kb_answer:
-            catalog_path = Path(__file__).resolve().parent.parent / "app" / "data" / "schemes_config.yaml"
-            if catalog_path.exists():
-                with catalog_path.open("r", encoding="utf-8") as f:
-                    parsed = yaml.safe_load(f) or {}
-                schemes = parsed.get("schemes", {}) if isinstance(parsed, dict) else {}
+            schemes = get_scheme_catalog().schemes()
+            if schemes:
 
                 matched_id = None
                 if any(k in q for k in ["pm awas", "pmay", "awas yojana"]):
@@ -234,21 +223,23 @@ def retrieve_knowledge(
 
 # ── Tool 3: Validate Eligibility ──────────────────────────────────────────────
 
-def validate_eligibility(slots: dict, scheme_hint: str = "unknown") -> dict:
+def validate_eligibility(slots: dict, scheme_hint: str = "unknown", include_breakdown: bool = True) -> dict:
     """
     Deterministically validate user eligibility for a scheme.
     Uses the RulesEngine — NO LLM involved.
-    Returns eligible (bool), score (0-1), and breakdown.
+    Returns eligible (bool), score (0-1), and breakdown (unless include_breakdown=False,
+    which skips building it).
     """
     # Import embedded rules from rules_agent
     try:
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-        from agents.rules_agent import SCHEME_RULES
-        from app.services.rules_engine import RulesEngine
+        from agents.rules_agent import compiled_scheme_rules
 
-        rules = SCHEME_RULES.get(scheme_hint, SCHEME_RULES.get("unknown", {"mandatory": []}))
-        engine = RulesEngine()
-        eligible, breakdown, score = engine.evaluate(user_profile=slots, rules=rules)
+        compiled = compiled_scheme_rules(scheme_hint)
+        if not include_breakdown:
+            eligible, score = compiled.check(slots)
+            return {"success": True, "eligible": eligible, "score": float(score)}
+        eligible, breakdown, score = compiled.evaluate(slots).as_tuple()
         return {
             "success": True,
             "eligible": eligible,
@@ -513,6 +504,23 @@ TOOL_REGISTRY = {
 }
 
 
+def _coerce_param(value, annotation):
+    """Coerce a Bedrock string parameter to the tool's annotated type."""
+    if not isinstance(value, str) or annotation in (inspect.Parameter.empty, str):
+        return value
+    try:
+        if annotation is bool:
+            return value.strip().lower() in ("true", "1", "yes")
+        if annotation in (int, float):
+            return annotation(value)
+        if annotation in (dict, list):
+            parsed = json.loads(value) if value.strip() else annotation()
+            return parsed if isinstance(parsed, annotation) else value
+    except (ValueError, TypeError):
+        pass
+    return value
+
+
 def dispatch_tool(tool_name: str, parameters: dict) -> dict:
     """Dispatch a tool call by name. Used by the AgentCore invoke handler."""
     if tool_name not in TOOL_REGISTRY:
@@ -539,6 +547,14 @@ def dispatch_tool(tool_name: str, parameters: dict) -> dict:
                     f"[ActionGroup] Ignoring unsupported params for {tool_name}: {dropped}"
                 )
 
+        # Return Control sends every parameter value as a string; coerce to the
+        # declared annotation so dict/bool/float params behave like local calls.
+        filtered_params = {
+            k: _coerce_param(v, signature.parameters[k].annotation)
+            if k in signature.parameters else v
+            for k, v in filtered_params.items()
+        }
+
         return tool_fn(**filtered_params)
     except TypeError as e:
         return {"success": False, "error": f"Invalid parameters for {tool_name}: {e}"}
@@ -0,0 +1,71 @@
+"""
+codec.py — Compact binary encoding for stored sessions.
+
+Payload layout: one format byte followed by the body
+
+  b"J" + compact JSON (utf-8)        — always available
+  b"M" + msgpack                     — if `msgpack` is installed
+  b"Z" + zstd(<one of the above>)    — if `zstandard` is installed and the
+                                       encoded body is ≥ SESSION_ZSTD_MIN_BYTES
+
+Both libraries are optional; without them sessions are written as compact
+JSON. `decode_session` also accepts legacy plain-JSON text, so existing rows
+keep working and mixed deployments can read each other's payloads as long
+as the reader has the libraries the writer used.
+"""
+
+import os
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+CODEC = os.getenv("SESSION_CODEC", "auto").lower()          # auto | msgpack | json
+ZSTD_MIN_BYTES = int(os.getenv("SESSION_ZSTD_MIN_BYTES", "1024"))
+ZSTD_LEVEL = int(os.getenv("SESSION_ZSTD_LEVEL", "3"))
+
+_JSON = b"J"
+_MSGPACK = b"M"
+_ZSTD = b"Z"
+
+
+def _use_msgpack() -> bool:
+    return msgpack is not None and CODEC in ("auto", "msgpack")
+
+
+def encode_session(session: dict) -> bytes:
+    if _use_msgpack():
+        body = _MSGPACK + msgpack.packb(session, use_bin_type=True)
+    else:
+        body = _JSON + json.dumps(session, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if zstandard is not None and len(body) >= ZSTD_MIN_BYTES:
+        return _ZSTD + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return body
+
+
+def decode_session(payload) -> dict:
+    if isinstance(payload, str):
+        return json.loads(payload)              # legacy TEXT rows
+    payload = bytes(payload)
+    kind, body = payload[:1], payload[1:]
+    if kind == _ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Session payload is zstd-compressed but zstandard is not installed")
+        return decode_session(zstandard.ZstdDecompressor().decompress(body))
+    if kind == _MSGPACK:
+        if msgpack is None:
+            raise RuntimeError("Session payload is msgpack-encoded but msgpack is not installed")
+        return msgpack.unpackb(body, raw=False)
+    if kind == _JSON:
+        return json.loads(body.decode("utf-8"))
+    return json.loads(payload.decode("utf-8"))  # legacy JSON stored as bytes
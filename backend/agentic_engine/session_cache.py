@@ -0,0 +1,183 @@
+"""
+session_cache.py — In-process LRU cache in front of a session storage backend.
+
+IVR calls hit the same session 10–20 times within a few minutes. The cache
+keeps the last-written/read copy of each session together with its storage
+`version`:
+
+  - reads within SESSION_CACHE_TRUST_SECONDS of the last validation are
+    served from memory
+  - older entries are revalidated with a version-only lookup
+    (`storage.get_version`) — if another instance wrote the session the
+    version differs and the session is re-read
+  - writes are conditional on the cached version, so a stale entry can
+    never overwrite a newer session; on SessionConflictError the entry is
+    dropped and the error propagates
+
+Writes are deferred to the end of the request by the SessionManager unit of
+work (one flush per dirty session); the cache is refreshed from what was
+written, so the next turn starts warm.
+"""
+
+import copy
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from .storage import BaseSessionStorage, SessionConflictError
+
+logger = logging.getLogger(__name__)
+
+CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "2048"))
+TRUST_SECONDS = float(os.getenv("SESSION_CACHE_TRUST_SECONDS", "5"))
+
+
+class SessionCache:
+    """Bounded LRU of session_id → (session, version, validated_at)."""
+
+    def __init__(self, max_entries: int = CACHE_SIZE, trust_seconds: float = TRUST_SECONDS):
+        self.max_entries = max_entries
+        self.trust_seconds = trust_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.stale = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key, session: dict):
+        entry = [copy.deepcopy(session), session.get("version"), time.monotonic()]
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def touch(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2] = time.monotonic()
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.revalidated + self.stale + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "stale": self.stale,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.revalidated) / lookups, 4) if lookups else 0.0,
+        }
+
+
+class CachedSessionStorage(BaseSessionStorage):
+    """BaseSessionStorage decorator that serves reads from a SessionCache."""
+
+    def __init__(self, backend: BaseSessionStorage, cache: Optional[SessionCache] = None,
+                 namespace: str = ""):
+        self.backend = backend
+        self.cache = cache or SessionCache()
+        # Several storage configs may share one cache — keep their keys apart
+        self.namespace = namespace or type(backend).__name__
+
+    def initialize(self):
+        self.backend.initialize()
+
+    def get_session(self, session_id: str) -> dict:
+        key = (self.namespace, session_id)
+        entry = self.cache.lookup(key)
+        if entry is not None:
+            session, version, validated_at = entry
+            if time.monotonic() - validated_at < self.cache.trust_seconds:
+                self.cache.hits += 1
+                return copy.deepcopy(session)
+            if version is not None and self.backend.get_version(session_id) == version:
+                self.cache.revalidated += 1
+                self.cache.touch(key)
+                return copy.deepcopy(session)
+            self.cache.stale += 1
+        else:
+            self.cache.misses += 1
+
+        session = self.backend.get_session(session_id)
+        if session is None:
+            self.cache.invalidate(key)
+        else:
+            self.cache.store(key, session)
+        return session
+
+    def get_version(self, session_id: str):
+        return self.backend.get_version(session_id)
+
+    def health_check(self):
+        self.backend.health_check()
+
+    def _write(self, session_id: str, write):
+        try:
+            write()
+        except Exception as e:
+            # Conflict or failed write: the cached copy can no longer be trusted
+            self.cache.invalidate((self.namespace, session_id))
+            if isinstance(e, SessionConflictError):
+                logger.info(f"[SessionCache] {e} — entry dropped")
+            raise
+
+    def put_session(self, session_id: str, data: dict):
+        self._write(session_id, lambda: self.backend.put_session(session_id, data))
+        self.cache.store((self.namespace, session_id), data)
+
+    def patch_session(self, session_id: str, data: dict, state_changed: bool, data_keys: set):
+        self._write(session_id, lambda: self.backend.patch_session(session_id, data, state_changed, data_keys))
+        self.cache.store((self.namespace, session_id), data)
+
+    def expire_sessions(self, cutoff: float, limit: int) -> int:
+        # Cached copies of swept sessions fail their next version check
+        return self.backend.expire_sessions(cutoff, limit)
+
+    def iter_session_meta(self):
+        return self.backend.iter_session_meta()
+
+    def compact(self):
+        self.backend.compact()
+
+    def load(self) -> dict:
+        return self.backend.load()
+
+    def save(self, data: dict):
+        self.backend.save(data)
+        self.cache.clear()
+
+
+# ── Shared cache (one per process) ───────────────────────────────────────────
+
+_cache: Optional[SessionCache] = None
+
+
+def get_session_cache() -> SessionCache:
+    global _cache
+    if _cache is None:
+        _cache = SessionCache()
+    return _cache
@@ -1,7 +1,57 @@
 from .state_machine import WorkflowState
 from .storage import BaseSessionStorage
+from contextlib import contextmanager
+import contextvars
+import logging
+import os
+import threading
 import time
 
+logger = logging.getLogger(__name__)
+
+# Unit of work bound to the current request / task (see SessionManager.unit_of_work)
+_active_uow: contextvars.ContextVar = contextvars.ContextVar("jansathi_session_uow", default=None)
+
+
+class SessionUnitOfWork:
+    """
+    Request-scoped identity map over a session storage backend.
+
+    Each session is read from storage at most once; mutations are applied to
+    the in-memory copy and the touched fields (state / data keys) are tracked.
+    `commit()` writes every dirty session exactly once.
+    """
+    def __init__(self, storage: BaseSessionStorage):
+        self.storage = storage
+        self._sessions = {}
+        self._dirty = {}        # session_id -> {"state": bool, "keys": set, "new": bool}
+        self.reads = 0
+        self.writes = 0
+
+    def get(self, session_id):
+        if session_id not in self._sessions:
+            self._sessions[session_id] = self.storage.get_session(session_id)
+            self.reads += 1
+        return self._sessions[session_id]
+
+    def stage(self, session_id, session, state_changed=False, data_keys=(), new=False):
+        self._sessions[session_id] = session
+        changes = self._dirty.setdefault(session_id, {"state": False, "keys": set(), "new": False})
+        changes["state"] = changes["state"] or state_changed
+        changes["keys"].update(data_keys)
+        changes["new"] = changes["new"] or new
+
+    def commit(self):
+        for session_id, changes in self._dirty.items():
+            session = self._sessions[session_id]
+            if changes["new"]:
+                self.storage.put_session(session_id, session)
+            else:
+                self.storage.patch_session(session_id, session, changes["state"], changes["keys"])
+            self.writes += 1
+        self._dirty.clear()
+
+
 class SessionManager:
     """
     Manages user sessions using a pluggable storage backend.
@@ -10,44 +60,106 @@ class SessionManager:
         self.storage = storage
         self.storage.initialize()
 
-    def create_session(self, session_id):
-        """Creates a new session with initial state."""
+    # ── Unit of work ──────────────────────────────────────────────────────────
+
+    def _uow(self):
+        uow = _active_uow.get()
+        return uow if uow is not None and uow.storage is self.storage else None
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Batch every session read/write inside the block: one load per session,
+        one write per dirty session on exit. Nested calls join the outer unit.
+        Nothing is written if the block raises.
+        """
+        existing = self._uow()
+        if existing is not None:
+            yield existing
+            return
+        uow = self.begin()
+        try:
+            yield uow
+            uow.commit()
+        finally:
+            self.end(uow)
+
+    def begin(self) -> SessionUnitOfWork:
+        """Open a unit of work for the current context (paired with end())."""
+        uow = SessionUnitOfWork(self.storage)
+        uow.token = _active_uow.set(uow)
+        return uow
+
+    def end(self, uow: SessionUnitOfWork):
+        try:
+            _active_uow.reset(uow.token)
+        except ValueError:
+            # Token from another context (e.g. teardown on a different task)
+            _active_uow.set(None)
+
+    def _load(self, session_id):
+        uow = self._uow()
+        return uow.get(session_id) if uow else self.storage.get_session(session_id)
+
+    def _write(self, session_id, session, state_changed=False, data_keys=(), new=False):
+        uow = self._uow()
+        if uow:
+            uow.stage(session_id, session, state_changed, data_keys, new)
+        elif new:
+            self.storage.put_session(session_id, session)
+        else:
+            self.storage.patch_session(session_id, session, state_changed, set(data_keys))
+
+    # ── Session API ───────────────────────────────────────────────────────────
+
+    def create_session(self, session_id, data=None):
+        """Creates a new session with initial state (and optional initial data)."""
         session_data = {
             "current_state": WorkflowState.START,
-            "data": {},
+            "data": dict(data or {}),
             "created_at": time.time()
         }
-        self.storage.put_session(session_id, session_data)
+        self._write(session_id, session_data, new=True)
         return session_data
 
     def get_session(self, session_id):
         """Retrieves a session by ID."""
-        return self.storage.get_session(session_id)
+        return self._load(session_id)
+
+    def patch(self, session_id, state=None, data=None, create=False):
+        """
+        Apply a state transition and/or several data keys with a single
+        read and a single write. With create=True a missing session is
+        created first (still one write).
+        """
+        session = self._load(session_id)
+        new = False
+        if not session:
+            if not create:
+                raise KeyError(f"Session '{session_id}' not found.")
+            session = {"current_state": WorkflowState.START, "data": {}, "created_at": time.time()}
+            new = True
+
+        if state is not None:
+            current_state = session["current_state"]
+            if not WorkflowState.is_valid_transition(current_state, state):
+                raise ValueError(f"Invalid transition from {current_state} to {state}")
+            session["current_state"] = state
+
+        data = data or {}
+        session["data"].update(data)
+        self._write(session_id, session, state_changed=state is not None, data_keys=data.keys(), new=new)
+        return session
 
     def update_state(self, session_id, new_state):
         """
         Updates the state of a session after validating the transition.
         """
-        session = self.get_session(session_id)
-        if not session:
-            raise KeyError(f"Session '{session_id}' not found.")
-        
-        current_state = session["current_state"]
-        # Convert string state to Choice if necessary
-        if WorkflowState.is_valid_transition(current_state, new_state):
-            session["current_state"] = new_state
-            self.storage.put_session(session_id, session)
-        else:
-            raise ValueError(f"Invalid transition from {current_state} to {new_state}")
+        self.patch(session_id, state=new_state)
 
     def update_data(self, session_id, key, value):
         """Updates the data dictionary of a session."""
-        session = self.get_session(session_id)
-        if not session:
-            raise KeyError(f"Session '{session_id}' not found.")
-        
-        session["data"][key] = value
-        self.storage.put_session(session_id, session)
+        self.patch(session_id, data={key: value})
 
     def list_all_sessions(self):
         """Legacy support for listing all sessions (only for local storage)."""
@@ -55,3 +167,106 @@ class SessionManager:
             return self.storage.load()
         except NotImplementedError:
             return {}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PROCESS-WIDE SESSION MANAGER
+# ═══════════════════════════════════════════════════════════════════════════════
+# One SessionManager per storage configuration per process. Building one per
+# request meant a boto3 resource + DescribeTable (DynamoDBStorage.initialize)
+# on every call. Initialization is lazy; a failed init is not cached but is
+# retried at most every SESSION_INIT_RETRY_SECONDS so an outage doesn't turn
+# into a DescribeTable storm.
+
+_INIT_RETRY_SECONDS = float(os.getenv("SESSION_INIT_RETRY_SECONDS", "10"))
+_HEALTH_TTL_SECONDS = float(os.getenv("SESSION_HEALTH_TTL_SECONDS", "30"))
+
+_managers = {}
+_init_failures = {}     # config -> (monotonic time, error message)
+_health = {}            # config -> (monotonic time, result dict)
+_managers_lock = threading.Lock()
+
+
+def _storage_config(storage_type=None) -> tuple:
+    storage_type = (storage_type or os.getenv("STORAGE_TYPE", "local")).lower()
+    engine_dir = os.path.dirname(os.path.abspath(__file__))
+    if storage_type == "dynamodb":
+        return ("dynamodb", os.getenv("DYNAMODB_SESSIONS_TABLE", "JanSathi-Sessions"),
+                os.getenv("AWS_REGION", "us-east-1"))
+    if storage_type == "json":
+        return ("json", os.path.join(engine_dir, "sessions.json"))
+    return ("sqlite", os.getenv("SESSION_DB_PATH", os.path.join(engine_dir, "sessions.db")),
+            os.path.join(engine_dir, "sessions.json"))
+
+
+def _build_storage(config: tuple) -> BaseSessionStorage:
+    from .storage import DynamoDBStorage, LocalJSONStorage, SQLiteSessionStorage
+    kind = config[0]
+    if kind == "dynamodb":
+        storage = DynamoDBStorage(config[1], config[2])
+    elif kind == "json":
+        storage = LocalJSONStorage(config[1])
+    else:
+        storage = SQLiteSessionStorage(config[1], legacy_json_path=config[2])
+
+    from .session_cache import CACHE_SIZE
+    if CACHE_SIZE > 0:
+        from .session_cache import CachedSessionStorage, get_session_cache
+        storage = CachedSessionStorage(storage, get_session_cache(), ":".join(config[:2]))
+    return storage
+
+
+def get_session_manager(storage_type=None) -> SessionManager:
+    """Shared SessionManager for STORAGE_TYPE (or the given type), built on first use."""
+    config = _storage_config(storage_type)
+    sm = _managers.get(config)
+    if sm is not None:
+        return sm
+    with _managers_lock:
+        sm = _managers.get(config)
+        if sm is not None:
+            return sm
+        failed = _init_failures.get(config)
+        if failed and time.monotonic() - failed[0] < _INIT_RETRY_SECONDS:
+            raise RuntimeError(f"Session storage unavailable: {failed[1]}")
+        try:
+            sm = SessionManager(_build_storage(config))
+        except Exception as e:
+            _init_failures[config] = (time.monotonic(), str(e))
+            logger.error(f"[SessionManager] {config[0]} storage init failed: {e}")
+            raise
+        _init_failures.pop(config, None)
+        _managers[config] = sm
+        logger.info(f"[SessionManager] {config[0]} storage ready")
+        return sm
+
+
+def session_store_health(storage_type=None) -> dict:
+    """
+    Health of the configured session store for /v1/health. Probes the
+    backend at most every SESSION_HEALTH_TTL_SECONDS; a failed probe drops
+    the shared manager so the next request re-initializes it.
+    """
+    config = _storage_config(storage_type)
+    cached = _health.get(config)
+    if cached and time.monotonic() - cached[0] < _HEALTH_TTL_SECONDS:
+        return cached[1]
+    result = {"backend": config[0]}
+    try:
+        sm = get_session_manager(storage_type)
+        sm.storage.health_check()
+        result["state"] = "ok"
+    except Exception as e:
+        with _managers_lock:
+            _managers.pop(config, None)
+        result.update(state="error", error=str(e))
+    _health[config] = (time.monotonic(), result)
+    return result
+
+
+def reset_session_managers():
+    """Drop shared managers (tests / config reload)."""
+    with _managers_lock:
+        _managers.clear()
+        _init_failures.clear()
+        _health.clear()
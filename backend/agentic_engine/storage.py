@@ -1,15 +1,46 @@
 import json
 import os
 import time
+import sqlite3
 import logging
+import threading
+from decimal import Decimal
 from abc import ABC, abstractmethod
 
+from .codec import encode_session, decode_session
+
 # Configure local logger for storage
 logger = logging.getLogger(__name__)
 
 # TTL for sessions: 24 hours by default (configurable via env)
 _SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(60 * 60 * 24)))
 
+
+class SessionConflictError(Exception):
+    """Raised when a session was modified by another writer since it was read."""
+
+
+def _to_dynamo(value):
+    """Python → DynamoDB types: floats become Decimal (boto3 rejects float)."""
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    if isinstance(value, dict):
+        return {k: _to_dynamo(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_dynamo(v) for v in value]
+    return value
+
+
+def _from_dynamo(value):
+    """DynamoDB → Python types: integral Decimals become int, others float."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, dict):
+        return {k: _from_dynamo(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_from_dynamo(v) for v in value]
+    return value
+
 class BaseSessionStorage(ABC):
     """
     Abstract base class for session storage.
@@ -29,6 +60,39 @@ class BaseSessionStorage(ABC):
         """Initializes the storage medium."""
         pass
 
+    def patch_session(self, session_id: str, data: dict, state_changed: bool, data_keys: set):
+        """
+        Persists a session of which only `current_state` (if state_changed)
+        and `data[k]` for k in data_keys changed. Backends that support
+        partial updates override this; the default rewrites the session.
+        """
+        self.put_session(session_id, data)
+
+    def health_check(self):
+        """Raises if the backend is unreachable. Default: a point read."""
+        self.get_session("__healthcheck__")
+
+    def get_version(self, session_id: str):
+        """
+        Current write version of a session (None if missing or unversioned).
+        Versioned backends override this with a cheaper lookup.
+        """
+        session = self.get_session(session_id)
+        return session.get("version") if session else None
+
+    # ── Maintenance (see app/services/session_sweeper.py) ─────────────────────
+
+    def expire_sessions(self, cutoff: float, limit: int) -> int:
+        """Delete up to `limit` sessions last written before `cutoff`; returns count."""
+        raise NotImplementedError(f"{type(self).__name__} has no local expiry")
+
+    def iter_session_meta(self):
+        """Yields (payload_bytes, last_written_epoch) per stored session."""
+        raise NotImplementedError(f"{type(self).__name__} does not support full scans")
+
+    def compact(self):
+        """Reclaim space after a sweep (no-op by default)."""
+
 class LocalJSONStorage(BaseSessionStorage):
     """
     Local JSON file implementation of session storage.
@@ -48,7 +112,7 @@ class LocalJSONStorage(BaseSessionStorage):
     def load(self) -> dict:
         """Loads sessions from the JSON file."""
         if os.path.exists(self.file_path):
-            with open(self.file_path, "r") as f:
+            with open(self.file_path, "r", encoding="utf-8") as f:
                 try:
                     return json.load(f)
                 except json.JSONDecodeError:
@@ -58,8 +122,8 @@ class LocalJSONStorage(BaseSessionStorage):
     def save(self, data: dict):
         """Saves current sessions to the JSON file."""
         os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-        with open(self.file_path, "w") as f:
-            json.dump(data, f, indent=2)
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
 
     def get_session(self, session_id: str) -> dict:
         return self.load().get(session_id)
@@ -69,6 +133,174 @@ class LocalJSONStorage(BaseSessionStorage):
         sessions[session_id] = data
         self.save(sessions)
 
+    def expire_sessions(self, cutoff: float, limit: int) -> int:
+        """Sessions here have no write timestamp; expiry is by created_at."""
+        sessions = self.load()
+        expired = [sid for sid, s in sessions.items() if (s.get("created_at") or cutoff) < cutoff][:limit]
+        for sid in expired:
+            del sessions[sid]
+        if expired:
+            self.save(sessions)
+        return len(expired)
+
+    def iter_session_meta(self):
+        for s in self.load().values():
+            yield len(json.dumps(s, separators=(",", ":"))), s.get("created_at") or time.time()
+
+    def compact(self):
+        self.save(self.load())
+
+class SQLiteSessionStorage(BaseSessionStorage):
+    """
+    SQLite (WAL) implementation of session storage — the local default.
+
+    One row per session, keyed by session_id, so reads and writes touch a
+    single B-tree entry instead of rewriting the whole sessions.json file.
+    WAL mode lets gunicorn workers read while another worker writes; writers
+    serialise on SQLite's file lock (busy_timeout) rather than racing and
+    losing each other's updates.
+
+    Table Schema:
+      - session_id (TEXT PRIMARY KEY)
+      - payload    (BLOB)    — session document (agentic_engine.codec:
+                               msgpack/zstd when installed, else compact JSON)
+      - updated_at (REAL)    — indexed, used for TTL sweeps
+      - version    (INTEGER) — bumped on every write; writes of a session
+                               read at an older version raise SessionConflictError
+    """
+    BUSY_TIMEOUT_MS = int(os.getenv("SESSION_DB_BUSY_TIMEOUT_MS", "5000"))
+
+    def __init__(self, db_path=None, legacy_json_path=None):
+        if db_path is None:
+            db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions.db")
+        self.db_path = db_path
+        self.legacy_json_path = legacy_json_path
+        # sqlite3 connections must not be shared across threads
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.BUSY_TIMEOUT_MS / 1000.0,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={self.BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def initialize(self):
+        """Creates the sessions table (idempotent) and imports a legacy JSON file once."""
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = self._conn()
+        # payload holds _encode() bytes. Tables created before it was BLOB keep
+        # the TEXT declaration: SQLite column affinity never converts a stored
+        # BLOB, so old and new rows read back as they were written.
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " payload BLOB NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+        if "version" not in columns:
+            conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions(updated_at)")
+        if self.legacy_json_path and os.path.exists(self.legacy_json_path):
+            if conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone() is None:
+                legacy = LocalJSONStorage(self.legacy_json_path).load()
+                if legacy:
+                    self.save(legacy)
+                    logger.info(f"[SQLiteSessionStorage] Imported {len(legacy)} sessions from {self.legacy_json_path}")
+
+    @staticmethod
+    def _encode(data: dict) -> bytes:
+        return encode_session({k: v for k, v in data.items() if k != "version"})
+
+    def get_session(self, session_id: str) -> dict:
+        row = self._conn().execute(
+            "SELECT payload, version FROM sessions WHERE session_id = ? AND updated_at >= ?",
+            (session_id, time.time() - _SESSION_TTL_SECONDS),
+        ).fetchone()
+        if not row:
+            return None
+        session = decode_session(row[0])
+        session["version"] = row[1]
+        return session
+
+    def get_version(self, session_id: str):
+        row = self._conn().execute(
+            "SELECT version FROM sessions WHERE session_id = ? AND updated_at >= ?",
+            (session_id, time.time() - _SESSION_TTL_SECONDS),
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_session(self, session_id: str, data: dict):
+        """Upsert; conditional on data['version'] when the session was read from here."""
+        expected = data.get("version")
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if expected is not None and row is not None and row[0] != expected:
+                raise SessionConflictError(f"Session '{session_id}' changed since version {expected}")
+            version = (row[0] if row else 0) + 1
+            conn.execute(
+                "INSERT INTO sessions (session_id, payload, updated_at, version) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET payload = excluded.payload, "
+                "updated_at = excluded.updated_at, version = excluded.version",
+                (session_id, self._encode(data), time.time(), version),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        data["version"] = version
+
+    def expire_sessions(self, cutoff: float, limit: int) -> int:
+        """One bounded batch, served by the updated_at index."""
+        cur = self._conn().execute(
+            "DELETE FROM sessions WHERE session_id IN "
+            "(SELECT session_id FROM sessions WHERE updated_at < ? LIMIT ?)",
+            (cutoff, limit),
+        )
+        return cur.rowcount
+
+    def iter_session_meta(self):
+        yield from self._conn().execute("SELECT length(payload), updated_at FROM sessions")
+
+    def compact(self):
+        """Checkpoint the WAL and VACUUM once a quarter of the pages are free."""
+        conn = self._conn()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        total = conn.execute("PRAGMA page_count").fetchone()[0]
+        if total and free / total > 0.25:
+            conn.execute("VACUUM")
+
+    def load(self) -> dict:
+        """All sessions as a dict (admin listing only — not on the request path)."""
+        rows = self._conn().execute("SELECT session_id, payload FROM sessions").fetchall()
+        return {sid: decode_session(payload) for sid, payload in rows}
+
+    def save(self, data: dict):
+        """Bulk upsert in a single transaction."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO sessions (session_id, payload, updated_at, version) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT(session_id) DO UPDATE SET payload = excluded.payload, "
+                "updated_at = excluded.updated_at, version = sessions.version + 1",
+                [(sid, self._encode(s), now) for sid, s in data.items()],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
 class DynamoDBStorage(BaseSessionStorage):
     """
     Production-ready DynamoDB implementation of session storage.
@@ -76,11 +308,18 @@ class DynamoDBStorage(BaseSessionStorage):
     DynamoDB Table Schema:
       - PK: session_id (String) — partition key
       - expires_at (Number)    — TTL attribute (set in DynamoDB table settings)
+      - version (Number)       — optimistic concurrency counter
       - data (Map)             — full session payload
 
     TTL Configuration:
       Enable TTL on the table with attribute name: expires_at
       Sessions auto-delete after SESSION_TTL_SECONDS (default: 86400 = 24h)
+
+    Sessions returned by get_session carry their item `version`; writes are
+    conditional on it and raise SessionConflictError if another instance
+    wrote the session in between. patch_session sends an UpdateItem that
+    only touches `data.current_state` and the changed `data.data.<key>`
+    attributes instead of rewriting the whole item.
     """
     def __init__(self, table_name: str, region_name: str = "us-east-1"):
         if not table_name:
@@ -122,27 +361,84 @@ class DynamoDBStorage(BaseSessionStorage):
         except Exception as e:
             raise RuntimeError(f"DynamoDB Initialization Failed: {str(e)}")
 
+    @staticmethod
+    def _is_conflict(e: Exception) -> bool:
+        response = getattr(e, "response", None) or {}
+        return response.get("Error", {}).get("Code") == "ConditionalCheckFailedException"
+
     def put_session(self, session_id: str, session_data: dict):
         """
         Write a single session item to DynamoDB with TTL.
         The expires_at field enables automatic cleanup via DynamoDB TTL.
+        If the session carries a version, the write is conditional on it.
         """
         if self.table is None:
             self.initialize()
-            
-        import json
-        from decimal import Decimal
-        # Convert floats to Decimals
-        session_data_dyn = json.loads(json.dumps(session_data), parse_float=Decimal)
 
+        expected = session_data.get("version")
+        payload = {k: v for k, v in session_data.items() if k != "version"}
         expires_at = int(time.time()) + _SESSION_TTL_SECONDS
-        self.table.put_item(Item={
-            "session_id": session_id,
-            "data": session_data_dyn,
-            "expires_at": expires_at,  # DynamoDB TTL attribute
-        })
+        kwargs = {}
+        if expected is not None:
+            kwargs = {
+                "ConditionExpression": "attribute_not_exists(session_id) OR #v = :expected",
+                "ExpressionAttributeNames": {"#v": "version"},
+                "ExpressionAttributeValues": {":expected": expected},
+            }
+        try:
+            self.table.put_item(Item={
+                "session_id": session_id,
+                "data": _to_dynamo(payload),
+                "expires_at": expires_at,  # DynamoDB TTL attribute
+                "version": (expected or 0) + 1,
+            }, **kwargs)
+        except Exception as e:
+            if self._is_conflict(e):
+                raise SessionConflictError(f"Session '{session_id}' changed since version {expected}")
+            raise
+        session_data["version"] = (expected or 0) + 1
         logger.debug(f"[DynamoDBStorage] Session {session_id} written, TTL={expires_at}")
 
+    def patch_session(self, session_id: str, session_data: dict, state_changed: bool, data_keys: set):
+        """
+        UpdateItem of only the changed attributes, conditional on the version
+        the session was read at. Also refreshes the TTL.
+        """
+        if self.table is None:
+            self.initialize()
+
+        names = {"#d": "data", "#v": "version"}
+        values = {":exp": int(time.time()) + _SESSION_TTL_SECONDS, ":one": 1, ":zero": 0}
+        sets = ["expires_at = :exp", "#v = if_not_exists(#v, :zero) + :one"]
+        if state_changed:
+            names["#cs"] = "current_state"
+            values[":cs"] = session_data["current_state"]
+            sets.append("#d.#cs = :cs")
+        for i, key in enumerate(sorted(data_keys)):
+            names[f"#k{i}"] = key
+            values[f":v{i}"] = _to_dynamo(session_data["data"][key])
+            sets.append(f"#d.#d.#k{i} = :v{i}")
+
+        expected = session_data.get("version")
+        if expected is None:
+            condition = "attribute_exists(session_id) AND attribute_not_exists(#v)"
+        else:
+            condition = "#v = :expected"
+            values[":expected"] = expected
+        try:
+            self.table.update_item(
+                Key={"session_id": session_id},
+                UpdateExpression="SET " + ", ".join(sets),
+                ConditionExpression=condition,
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values,
+            )
+        except Exception as e:
+            if self._is_conflict(e):
+                raise SessionConflictError(f"Session '{session_id}' changed since version {expected}")
+            raise
+        session_data["version"] = (expected or 0) + 1
+
     def get_session(self, session_id: str) -> dict:
         """
         Read a single session item from DynamoDB.
@@ -159,17 +455,24 @@ class DynamoDBStorage(BaseSessionStorage):
         if expires_at and int(time.time()) > expires_at:
             logger.info(f"[DynamoDBStorage] Session {session_id} locally expired (TTL={expires_at})")
             return None
-            
-        import json
-        from decimal import Decimal
-        class DecimalEncoder(json.JSONEncoder):
-            def default(self, obj):
-                if isinstance(obj, Decimal):
-                    return float(obj)
-                return super(DecimalEncoder, self).default(obj)
-                
-        data = item.get("data", {})
-        return json.loads(json.dumps(data, cls=DecimalEncoder))
+
+        session = _from_dynamo(item.get("data", {}))
+        if "version" in item:
+            session["version"] = int(item["version"])
+        return session
+
+    def get_version(self, session_id: str):
+        """Version-only read (small projection) for cache revalidation."""
+        if self.table is None:
+            self.initialize()
+        item = self.table.get_item(
+            Key={"session_id": session_id},
+            ProjectionExpression="#v, expires_at",
+            ExpressionAttributeNames={"#v": "version"},
+        ).get("Item")
+        if not item or (item.get("expires_at") and int(time.time()) > item["expires_at"]):
+            return None
+        return int(item["version"]) if "version" in item else None
 
     def load(self) -> dict:
         """
@@ -1,32 +1,21 @@
 import random
 import string
-import os
 import logging
-import yaml
+from app.services.scheme_catalog import get_scheme_catalog, scheme_version  # noqa: F401 — re-exported
 from .state_machine import WorkflowState
 from .session_manager import SessionManager
 
 logger = logging.getLogger(__name__)
 
-# Load schemes config once at module level
-_SCHEMES_CONFIG: dict = {}
-
 
 def _load_schemes():
-    global _SCHEMES_CONFIG
-    if _SCHEMES_CONFIG:
-        return _SCHEMES_CONFIG
-    try:
-        config_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            "app", "data", "schemes_config.yaml"
-        )
-        with open(config_path, "r", encoding="utf-8") as f:
-            _SCHEMES_CONFIG = yaml.safe_load(f).get("schemes", {})
-    except Exception as e:
-        logger.warning(f"[WorkflowEngine] Could not load schemes_config.yaml: {e}")
-        _SCHEMES_CONFIG = {}
-    return _SCHEMES_CONFIG
+    """All schemes from the shared catalog (parsed once, reloaded on file change)."""
+    return get_scheme_catalog().schemes()
+
+
+def _slot_index(scheme_name: str) -> tuple:
+    """(version, {slot_key: slot definition}) for a scheme."""
+    return get_scheme_catalog().slot_index(scheme_name)
 
 
 class AgenticWorkflowEngine:
@@ -50,7 +39,12 @@ class AgenticWorkflowEngine:
     def handle_input(self, session_id: str, user_input: str) -> dict:
         """
         Processes user input, updates session state, and returns a structured response.
+        All session reads/writes for the turn go through one unit of work.
         """
+        with self.session_manager.unit_of_work():
+            return self._handle_input(session_id, user_input)
+
+    def _handle_input(self, session_id: str, user_input: str) -> dict:
         user_input = user_input.strip()
 
         # Restart command
@@ -89,13 +83,13 @@ class AgenticWorkflowEngine:
             return self._resp(session_id, "Which state are you from?", WorkflowState.COLLECT_STATE, "ASK_STATE", requires_input=True)
 
         if current_state == WorkflowState.COLLECT_STATE:
-            self.session_manager.update_data(session_id, "state", user_input.lower())
-            self.session_manager.update_state(session_id, WorkflowState.COLLECT_LAND_OWNERSHIP)
+            self.session_manager.patch(session_id, state=WorkflowState.COLLECT_LAND_OWNERSHIP,
+                                       data={"state": user_input.lower()})
             return self._resp(session_id, "Do you own farming land? (Yes/No)", WorkflowState.COLLECT_LAND_OWNERSHIP, "ASK_LAND_OWNERSHIP", requires_input=True)
 
         if current_state == WorkflowState.COLLECT_LAND_OWNERSHIP:
-            self.session_manager.update_data(session_id, "land_owned", user_input.lower())
-            self.session_manager.update_state(session_id, WorkflowState.EVALUATE_ELIGIBILITY)
+            self.session_manager.patch(session_id, state=WorkflowState.EVALUATE_ELIGIBILITY,
+                                       data={"land_owned": user_input.lower()})
             return self.handle_input(session_id, "AUTO_EVALUATE")
 
         if current_state == WorkflowState.EVALUATE_ELIGIBILITY:
@@ -128,8 +122,8 @@ class AgenticWorkflowEngine:
 
         if current_state == WorkflowState.SUBMIT_GRIEVANCE:
             grievance_id = "GRV-" + "".join(random.choices(string.digits, k=6))
-            self.session_manager.update_data(session_id, "grievance_id", grievance_id)
-            self.session_manager.update_state(session_id, WorkflowState.COMPLETED)
+            self.session_manager.patch(session_id, state=WorkflowState.COMPLETED,
+                                       data={"grievance_id": grievance_id})
             return self._resp(session_id, f"Your grievance has been submitted. ID: {grievance_id}.", WorkflowState.COMPLETED, "GRIEVANCE_SUBMITTED", terminal=True)
 
         if current_state == WorkflowState.COMPLETED:
@@ -154,13 +148,14 @@ class AgenticWorkflowEngine:
             )
 
         slots = scheme.get("slots", [])
-        session = self.session_manager.get_session(session_id) or self.session_manager.create_session(session_id)
 
-        # Store slot metadata in session
-        self.session_manager.update_data(session_id, "_scheme", scheme_name)
-        self.session_manager.update_data(session_id, "_pending_slots", [s["key"] for s in slots])
-        self.session_manager.update_data(session_id, "_slot_schemas", {s["key"]: s for s in slots})
-        self.session_manager.update_state(session_id, "COLLECT_SLOTS")
+        # Store a reference to the slot schemas, not the schemas themselves
+        # (prompts/DTMF maps are resolved from the in-memory catalog per turn)
+        self.session_manager.patch(session_id, state="COLLECT_SLOTS", create=True, data={
+            "_scheme": scheme_name,
+            "_scheme_version": _slot_index(scheme_name)[0],
+            "_pending_slots": [s["key"] for s in slots],
+        })
 
         first_slot = slots[0]
         prompt = first_slot.get("prompt", f"Please provide your {first_slot['key']}")
@@ -172,8 +167,8 @@ class AgenticWorkflowEngine:
         session = self.session_manager.get_session(session_id)
         data = session.get("data", {})
         pending = list(data.get("_pending_slots", []))
-        schemas: dict = data.get("_slot_schemas", {})
         scheme_name: str = data.get("_scheme", "pm_kisan")
+        schemas: dict = data.get("_slot_schemas") or self._slot_schemas(scheme_name, data.get("_scheme_version"))
 
         if not pending:
             schemes = _load_schemes()
@@ -209,9 +204,8 @@ class AgenticWorkflowEngine:
         except (ValueError, TypeError):
             pass
 
-        self.session_manager.update_data(session_id, current_key, value)
         pending.pop(0)
-        self.session_manager.update_data(session_id, "_pending_slots", pending)
+        self.session_manager.patch(session_id, data={current_key: value, "_pending_slots": pending})
 
         if not pending:
             schemes = _load_schemes()
@@ -230,17 +224,26 @@ class AgenticWorkflowEngine:
         prompt = next_schema.get("prompt", f"Please provide your {next_key}")
         return self._resp(session_id, prompt, "COLLECT_SLOTS", "COLLECTING_SLOTS", requires_input=True)
 
+    @staticmethod
+    def _slot_schemas(scheme_name: str, version: str = None) -> dict:
+        """Slot definitions for a scheme from the catalog (sessions only keep the version)."""
+        current, schemas = _slot_index(scheme_name)
+        if version and version != current:
+            logger.warning(
+                f"[WorkflowEngine] {scheme_name} slots changed mid-session ({version} → {current}); using current"
+            )
+        return schemas
+
     def _run_eligibility(self, session_id: str, scheme_name: str) -> dict:
         """Run RulesEngine against collected data and produce BenefitReceipt."""
-        schemes = _load_schemes()
-        scheme = schemes.get(scheme_name, {})
-        rules = scheme.get("rules", {})
+        catalog = get_scheme_catalog()
+        scheme = catalog.get(scheme_name) or {}
         sources = scheme.get("sources", [])
 
         session = self.session_manager.get_session(session_id)
         user_profile = {k: v for k, v in session.get("data", {}).items() if not k.startswith("_")}
 
-        eligible, breakdown, score = self.rules_engine.evaluate(user_profile, rules)
+        eligible, breakdown, score = catalog.compiled_rules(scheme_name).evaluate(user_profile).as_tuple()
 
         benefit_receipt = {
             "eligible": eligible,
@@ -250,8 +253,7 @@ class AgenticWorkflowEngine:
             "confidence": score,
         }
 
-        self.session_manager.update_data(session_id, "benefit_receipt", benefit_receipt)
-        self.session_manager.update_data(session_id, "eligibility_score", score)
+        self.session_manager.patch(session_id, data={"benefit_receipt": benefit_receipt, "eligibility_score": score})
 
         # Trigger HITL if confidence below threshold
         if score < 0.8:
@@ -286,9 +288,8 @@ class AgenticWorkflowEngine:
 
     def _handle_grievance(self, session_id: str, text: str) -> dict:
         grievance_id = "GRV-" + "".join(random.choices(string.digits, k=6))
-        self.session_manager.get_session(session_id) or self.session_manager.create_session(session_id)
-        self.session_manager.update_data(session_id, "grievance_id", grievance_id)
-        self.session_manager.update_state(session_id, WorkflowState.COMPLETED)
+        self.session_manager.patch(session_id, state=WorkflowState.COMPLETED, create=True,
+                                   data={"grievance_id": grievance_id})
         return self._resp(
             session_id,
             f"Your grievance has been registered. ID: {grievance_id}. You will receive an SMS confirmation.",
@@ -14,9 +14,10 @@ import json
 import logging
 from typing import Optional, List, Dict, Any
 
-import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 
+from app.core.resilience import CircuitOpenError
+
 logger = logging.getLogger(__name__)
 
 # ── Model ID constants ─────────────────────────────────────────────────────────
@@ -24,22 +25,20 @@ NOVA_MICRO = "amazon.nova-micro-v1:0"
 NOVA_LITE  = "amazon.nova-lite-v1:0"
 NOVA_PRO   = "amazon.nova-pro-v1:0"
 
-# ── Singleton Bedrock client ───────────────────────────────────────────────────
-_bedrock_client = None
-
+# ── Shared Bedrock client ──────────────────────────────────────────────────────
 
 def get_bedrock_client():
-    """Lazy-init Bedrock runtime client (singleton)."""
-    global _bedrock_client
-    if _bedrock_client is None:
-        region = os.getenv("AWS_REGION", "us-east-1")
-        try:
-            _bedrock_client = boto3.client("bedrock-runtime", region_name=region)
-            logger.info(f"[NovaClient] Bedrock runtime initialised (region={region})")
-        except NoCredentialsError:
-            logger.error("[NovaClient] No AWS credentials found")
-            _bedrock_client = None
-    return _bedrock_client
+    """
+    Shared Bedrock runtime client. Read timeout tracks the bedrock breaker's
+    observed p99 (app.core.resilience) and the client is rebuilt on drift.
+    """
+    region = os.getenv("AWS_REGION", "us-east-1")
+    try:
+        from app.core.resilience import adaptive_client
+        return adaptive_client("bedrock", "bedrock-runtime", region)
+    except NoCredentialsError:
+        logger.error("[NovaClient] No AWS credentials found")
+        return None
 
 
 # ── Core Converse wrapper ──────────────────────────────────────────────────────
@@ -82,7 +81,9 @@ def nova_converse(
         kwargs["system"] = [{"text": system_prompt}]
 
     try:
-        response = client.converse(**kwargs)
+        from app.core.resilience import get_breaker
+        response = get_breaker("bedrock").call(client.converse, **kwargs)
+        _record_usage(response, model_id, messages)
         output = response["output"]["message"]["content"]
         # output is a list of content blocks; grab first text block
         for block in output:
@@ -93,6 +94,9 @@ def nova_converse(
         code = e.response["Error"]["Code"]
         logger.error(f"[NovaClient] Bedrock ClientError ({code}): {e}")
         return _offline_fallback(messages)
+    except CircuitOpenError:
+        logger.info("[NovaClient] Bedrock circuit open — offline fallback")
+        return _offline_fallback(messages)
     except Exception as e:
         logger.error(f"[NovaClient] Unexpected error: {e}")
         return _offline_fallback(messages)
@@ -161,6 +165,21 @@ def nova_analyze_image(image_bytes: bytes, prompt: str, language: str = "hi") ->
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
+def _record_usage(response: Dict[str, Any], model_id: str, messages: List[Dict]) -> None:
+    """Report Converse `usage` to token accounting (tagged via usage_context)."""
+    try:
+        from app.services.token_usage_service import record_usage
+        prompt = ""
+        for block in (messages[-1].get("content", []) if messages else []):
+            if "text" in block:
+                prompt = block["text"]
+                break
+        usage = response.get("usage") if isinstance(response, dict) else None
+        record_usage(usage, model_id, prompt=prompt)
+    except Exception as e:
+        logger.debug(f"[NovaClient] usage accounting skipped: {e}")
+
+
 def build_user_message(text: str) -> Dict[str, Any]:
     """Build a properly formatted user message for nova_converse."""
     return {"role": "user", "content": [{"text": text}]}
@@ -15,6 +15,8 @@ import json
 import logging
 import sys
 
+from app.services.rules_engine import compile_rules, precompile
+
 from .state import JanSathiState
 
 logger = logging.getLogger(__name__)
@@ -128,6 +130,16 @@ SCHEME_RULES: dict = {
     },
 }
 
+# Compiled once at import; rules_agent and the validate_eligibility tool evaluate these directly
+COMPILED_RULES: dict = precompile(SCHEME_RULES)
+
+
+def compiled_scheme_rules(scheme_hint: str, db_rules: dict = None):
+    """CompiledRules for a scheme: DB rules when present (content-cached), else the embedded set."""
+    if db_rules:
+        return compile_rules(db_rules, scheme_hint)
+    return COMPILED_RULES.get(scheme_hint, COMPILED_RULES["unknown"])
+
 
 def rules_agent(state: JanSathiState) -> JanSathiState:
     """
@@ -152,20 +164,14 @@ def rules_agent(state: JanSathiState) -> JanSathiState:
         }
         return updated
 
-    # ── Load scheme rules ─────────────────────────────────────────────────────
-    rules = SCHEME_RULES.get(scheme_hint, SCHEME_RULES.get("unknown", {"mandatory": []}))
-
     # ── Try to load from app DB (optional enrichment) ─────────────────────────
     db_rules = _load_rules_from_db(scheme_hint)
-    if db_rules:
-        rules = db_rules
 
     # ── Run deterministic RulesEngine ─────────────────────────────────────────
     try:
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-        from app.services.rules_engine import RulesEngine
-        engine = RulesEngine()
-        eligible, breakdown, score = engine.evaluate(user_profile=slots, rules=rules)
+        compiled = compiled_scheme_rules(scheme_hint, db_rules)
+        # breakdown is needed downstream (verifier / HITL / response agents)
+        eligible, breakdown, score = compiled.evaluate(slots).as_tuple()
     except Exception as e:
         logger.error(f"[RulesAgent] RulesEngine failed: {e}")
         eligible, breakdown, score = True, [], 0.75
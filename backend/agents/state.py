@@ -59,6 +59,9 @@ class JanSathiState(TypedDict, total=False):
     # ── LangGraph Message History ─────────────────────────────────────────────
     messages: List[Dict[str, Any]]   # Nova Converse API message history
 
+    # ── Tracing ───────────────────────────────────────────────────────────────
+    trace_spans: List[Dict[str, Any]]  # Per-node timing spans (agents/tracing.py)
+
     # ── Error Handling ────────────────────────────────────────────────────────
     error: str                       # Fatal error message (routes to END)
 
@@ -96,5 +99,6 @@ def initial_state(
         sms_sent=False,
         asr_confidence=asr_confidence,
         messages=[],
+        trace_spans=[],
         error="",
     )
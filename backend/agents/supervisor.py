@@ -50,6 +50,7 @@ from .verifier_agent import verifier_agent, should_route_after_verifier
 from .response_agent import response_agent
 from .notification_agent import notification_agent
 from .hitl_agent import hitl_agent
+from .tracing import traced, node_timings, export_chrome_trace
 
 logger = logging.getLogger(__name__)
 
@@ -86,18 +87,18 @@ def create_graph():
 
     graph = StateGraph(JanSathiState)
 
-    # ── Register all 9 agent nodes ────────────────────────────────────────────
-    graph.add_node("telecom_agent",          telecom_agent)
-    graph.add_node("intent_agent",           intent_agent)
-    graph.add_node("rag_agent",              rag_agent)
-    graph.add_node("slot_collection_agent",  slot_collection_agent)
-    graph.add_node("rules_agent",            rules_agent)
-    graph.add_node("verifier_agent",         verifier_agent)
-    graph.add_node("response_agent",         response_agent)
-    graph.add_node("hitl_agent",             hitl_agent)
-    graph.add_node("notification_agent",     notification_agent)
+    # ── Register all 9 agent nodes (each wrapped in a timing span) ────────────
+    graph.add_node("telecom_agent",          traced("telecom_agent", telecom_agent))
+    graph.add_node("intent_agent",           traced("intent_agent", intent_agent))
+    graph.add_node("rag_agent",              traced("rag_agent", rag_agent))
+    graph.add_node("slot_collection_agent",  traced("slot_collection_agent", slot_collection_agent))
+    graph.add_node("rules_agent",            traced("rules_agent", rules_agent))
+    graph.add_node("verifier_agent",         traced("verifier_agent", verifier_agent))
+    graph.add_node("response_agent",         traced("response_agent", response_agent))
+    graph.add_node("hitl_agent",             traced("hitl_agent", hitl_agent))
+    graph.add_node("notification_agent",     traced("notification_agent", notification_agent))
 
-    graph.add_node("life_event_agent", life_event_agent)
+    graph.add_node("life_event_agent", traced("life_event_agent", life_event_agent))
 
     # ── Entry point ───────────────────────────────────────────────────────────
     graph.set_entry_point("telecom_agent")
@@ -239,6 +240,7 @@ def run_pipeline(
 
     # Apply caller-provided values
     state["consent_given"] = consent_given
+    state["trace_spans"] = []
     if slots:
         state["slots"] = {**state.get("slots", {}), **slots}
 
@@ -247,13 +249,17 @@ def run_pipeline(
         f"channel={channel} lang={language} intent_hint=none"
     )
 
+    from app.services.token_usage_service import usage_context
     try:
-        final_state = graph.invoke(state)
+        with usage_context(session_id=session_id):
+            final_state = graph.invoke(state)
         logger.info(
             f"[Supervisor] Pipeline complete: session={session_id} "
             f"intent={final_state.get('intent')} "
-            f"decision={final_state.get('verifier_result', {}).get('decision', 'N/A')}"
+            f"decision={final_state.get('verifier_result', {}).get('decision', 'N/A')} "
+            f"nodes={node_timings(final_state)}"
         )
+        export_chrome_trace(final_state)
         return final_state
     except Exception as e:
         logger.error(f"[Supervisor] Pipeline error: {e}")
@@ -284,27 +290,33 @@ def run_pipeline_fallback(
         user_query=user_query,
     )
     state["consent_given"] = True
+    state["trace_spans"] = []
 
+    from app.services.token_usage_service import usage_context
     try:
-        state = telecom_agent(state)
-        if not state.get("consent_given"):
-            return state
-        state = intent_agent(state)
-        state = rag_agent(state)
-        state = slot_collection_agent(state)
-        if not state.get("slots_complete"):
-            return state  # Return with question
-        state = rules_agent(state)
-        state = verifier_agent(state)
-        decision = state.get("verifier_result", {}).get("decision", "AUTO_SUBMIT")
-        if decision == "HITL_QUEUE":
-            state = hitl_agent(state)
-        else:
-            state = response_agent(state)
-        state = notification_agent(state)
+        with usage_context(session_id=session_id):
+            state = traced("telecom_agent", telecom_agent)(state)
+            if not state.get("consent_given"):
+                return state
+            state = traced("intent_agent", intent_agent)(state)
+            state = traced("rag_agent", rag_agent)(state)
+            state = traced("slot_collection_agent", slot_collection_agent)(state)
+            if not state.get("slots_complete"):
+                return state  # Return with question
+            state = traced("rules_agent", rules_agent)(state)
+            state = traced("verifier_agent", verifier_agent)(state)
+            decision = state.get("verifier_result", {}).get("decision", "AUTO_SUBMIT")
+            if decision == "HITL_QUEUE":
+                state = traced("hitl_agent", hitl_agent)(state)
+            else:
+                state = traced("response_agent", response_agent)(state)
+            state = traced("notification_agent", notification_agent)(state)
     except Exception as e:
         logger.error(f"[Supervisor] Fallback pipeline error: {e}")
         state["error"] = str(e)
         state["response_text"] = "⚠️ System error. Please visit india.gov.in"
+    finally:
+        logger.info(f"[Supervisor] Fallback pipeline nodes: session={session_id} {node_timings(state)}")
+        export_chrome_trace(state)
 
     return state
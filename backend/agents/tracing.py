@@ -0,0 +1,106 @@
+"""
+tracing.py — Per-node timing spans for the JanSathi agent pipeline
+===================================================================
+`traced(name, node)` wraps an agent node so every call appends a span to
+state["trace_spans"] and emits AgentNodeLatencyMs{Node} to TelemetryService
+(which also feeds the rolling latency histograms and /metrics).
+
+Span: {"node", "start_ms" (epoch ms), "duration_ms", "error"?}
+
+`chrome_trace(state)` converts the spans into Chrome trace-event JSON
+(open in chrome://tracing or https://ui.perfetto.dev). Set AGENT_TRACE_DIR
+to write one trace file per pipeline run.
+"""
+import os
+import json
+import time
+import logging
+import functools
+
+logger = logging.getLogger(__name__)
+
+TRACE_DIR = os.getenv("AGENT_TRACE_DIR", "")
+
+
+def _emit(node: str, duration_ms: float):
+    try:
+        from app.services.telemetry_service import get_telemetry
+        get_telemetry().emit("AgentNodeLatencyMs", duration_ms, {"Node": node}, unit="Milliseconds")
+    except Exception as e:
+        logger.debug(f"[Tracing] telemetry unavailable: {e}")
+
+
+def traced(name: str, node):
+    """Wrap a node function `state -> state` with a timing span."""
+
+    @functools.wraps(node)
+    def wrapper(state):
+        start_ms = time.time() * 1000
+        t0 = time.perf_counter()
+        error = None
+        try:
+            result = node(state)
+            return result
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            duration_ms = round((time.perf_counter() - t0) * 1000, 2)
+            span = {"node": name, "start_ms": round(start_ms, 3), "duration_ms": duration_ms}
+            if error:
+                # No result to carry the span; keep it on the input so the
+                # fallback pipeline's error state still shows the failing node
+                span["error"] = error
+                state["trace_spans"] = list(state.get("trace_spans") or []) + [span]
+            else:
+                result["trace_spans"] = list(state.get("trace_spans") or []) + [span]
+            _emit(name, duration_ms)
+            logger.debug(f"[Tracing] {name} {duration_ms}ms")
+
+    return wrapper
+
+
+def node_timings(state: dict) -> dict:
+    """{node: total duration_ms} for the spans in `state`."""
+    timings: dict = {}
+    for span in state.get("trace_spans") or []:
+        timings[span["node"]] = round(timings.get(span["node"], 0) + span["duration_ms"], 2)
+    return timings
+
+
+def chrome_trace(state: dict) -> dict:
+    """Chrome trace-event JSON ("X" complete events, µs since the first span)."""
+    spans = state.get("trace_spans") or []
+    origin = min((s["start_ms"] for s in spans), default=0)
+    events = [{
+        "name": s["node"],
+        "cat": "agent",
+        "ph": "X",
+        "ts": round((s["start_ms"] - origin) * 1000),
+        "dur": round(s["duration_ms"] * 1000),
+        "pid": 1,
+        "tid": 1,
+        "args": {"error": s["error"]} if "error" in s else {},
+    } for s in spans]
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"session_id": state.get("session_id", ""), "intent": state.get("intent", "")},
+    }
+
+
+def export_chrome_trace(state: dict, directory: str = "") -> str:
+    """Write chrome_trace(state) to `directory` (default AGENT_TRACE_DIR); returns the path or ""."""
+    directory = directory or TRACE_DIR
+    if not directory or not state.get("trace_spans"):
+        return ""
+    try:
+        os.makedirs(directory, exist_ok=True)
+        name = f"{state.get('session_id') or 'session'}-{int(time.time() * 1000)}.json"
+        path = os.path.join(directory, name.replace(os.sep, "_"))
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(chrome_trace(state), f)
+        return path
+    except OSError as e:
+        logger.warning(f"[Tracing] Could not write trace: {e}")
+        return ""
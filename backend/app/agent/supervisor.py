@@ -284,16 +284,8 @@ class JanSathiSupervisor:
             engine = _engine()
             if pre_slots:
                 # Seed pre-collected slots into session
-                from agentic_engine.storage import LocalJSONStorage
-                from agentic_engine.session_manager import SessionManager
-                import os
-                session_file = os.path.join(
-                    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-                    "agentic_engine", "sessions.json"
-                )
-                sm = SessionManager(LocalJSONStorage(session_file))
-                for k, v in pre_slots.items():
-                    sm.update_data(session_id, k, v)
+                from agentic_engine.session_manager import get_session_manager
+                get_session_manager().patch(session_id, data=dict(pre_slots), create=True)
 
             eng_result = engine(message=f"start_apply:{scheme_name}", session_id=session_id)
         except Exception as e:
@@ -346,15 +338,8 @@ class JanSathiSupervisor:
         # [5b] Generate BenefitReceipt HTML
         receipt_data = {}
         try:
-            from agentic_engine.storage import LocalJSONStorage
-            from agentic_engine.session_manager import SessionManager
-            import os as _os
-            session_file = _os.path.join(
-                _os.path.dirname(_os.path.dirname(_os.path.dirname(_os.path.abspath(__file__)))),
-                "agentic_engine", "sessions.json"
-            )
-            sm   = SessionManager(LocalJSONStorage(session_file))
-            sess = sm.get_session(session_id)
+            from agentic_engine.session_manager import get_session_manager
+            sess = get_session_manager().get_session(session_id)
             slots_collected = {
                 k: v for k, v in (sess.get("data", {}) if sess else {}).items()
                 if not k.startswith("_")
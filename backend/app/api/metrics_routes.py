@@ -0,0 +1,28 @@
+"""
+metrics_routes.py — Prometheus scrape endpoint
+
+Endpoints:
+  GET /metrics  → text exposition format 0.0.4 (see metrics_exporter)
+
+Set METRICS_TOKEN to require `Authorization: Bearer <token>` from the scraper.
+"""
+
+import os
+import hmac
+
+from flask import Blueprint, Response, request
+
+from app.services.metrics_exporter import render_metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+_METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    if _METRICS_TOKEN:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied, _METRICS_TOKEN):
+            return Response("unauthorized\n", status=401, mimetype="text/plain")
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4; charset=utf-8")
@@ -28,7 +28,7 @@ print("DEBUG: process_user_input imported.", flush=True)
 from app.core.middleware import require_auth, require_admin
 from app.core.schema_validator import validate_unified_event, UnifiedResponse
 from app.models.models import db, CommunityPost, UserDocument, Conversation, SchemeApplication
-from agentic_engine.session_manager import SessionManager
+from agentic_engine.session_manager import SessionManager, get_session_manager
 
 # ── Singletons ────────────────────────────────────────────────────────────────
 hitl_service = HITLService()
@@ -41,18 +41,47 @@ civic_infra_service = CivicInfraService()
 # ─── Session helpers ──────────────────────────────────────────────────────────
 
 def _get_session_manager() -> SessionManager:
-    storage_type = os.getenv("STORAGE_TYPE", "local").lower()
-    
-    if storage_type == "dynamodb":
-        from agentic_engine.storage import DynamoDBStorage
-        table_name = os.getenv("DYNAMODB_SESSIONS_TABLE", "JanSathi-Sessions")
-        region = os.getenv("AWS_REGION", "us-east-1")
-        return SessionManager(DynamoDBStorage(table_name, region))
-    else:
-        from agentic_engine.storage import LocalJSONStorage
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        session_file = os.path.join(base_dir, "agentic_engine", "sessions.json")
-        return SessionManager(LocalJSONStorage(session_file))
+    """
+    Session manager for the current request. The first call opens a unit of
+    work: each session is loaded once and dirty sessions are written once
+    in after_request (discarded if the request fails).
+    """
+    sm = g.get("_session_manager")
+    if sm is None:
+        sm = g._session_manager = get_session_manager()
+        g._session_uow = sm.begin()
+    return sm
+
+
+@v1.after_request
+def _commit_session_uow(response):
+    uow = g.pop("_session_uow", None)
+    if uow is not None:
+        from agentic_engine.storage import SessionConflictError
+        try:
+            if response.status_code < 500:
+                uow.commit()
+        except SessionConflictError as e:
+            logger.warning(f"[Sessions] {e}")
+            body, _ = UnifiedResponse.error("Session was updated concurrently, please retry",
+                                            error_code="SESSION_CONFLICT", status=409)
+            body.status_code = 409
+            response = body
+        except Exception as e:
+            logger.error(f"[Sessions] Unit-of-work commit failed: {e}")
+            body, status = UnifiedResponse.error("Session write failed", error_code="SESSION_WRITE_FAILED")
+            body.status_code = status
+            response = body
+        finally:
+            g._session_manager.end(uow)
+    return response
+
+
+@v1.teardown_request
+def _discard_session_uow(exc):
+    uow = g.pop("_session_uow", None)
+    if uow is not None:
+        g._session_manager.end(uow)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -73,10 +102,11 @@ def init_session():
     sm = _get_session_manager()
     existing = sm.get_session(event.session_id)
     if not existing:
-        sm.create_session(event.session_id)
-        sm.update_data(event.session_id, "_user_id", user_id)
-        sm.update_data(event.session_id, "_channel", event.channel)
-        sm.update_data(event.session_id, "_language", event.language)
+        sm.create_session(event.session_id, data={
+            "_user_id": user_id,
+            "_channel": event.channel,
+            "_language": event.language,
+        })
         created = True
     else:
         created = False
@@ -569,12 +599,23 @@ def upload_presign():
 @v1.route("/admin/cases", methods=["GET"])
 def list_hitl_cases():
     """
-    GET /v1/admin/cases?status=pending_review
-    Returns list of HITL cases.
+    GET /v1/admin/cases?status=pending_review[&limit=50&cursor=...]
+    Returns list of HITL cases. With `limit` or `cursor`, returns one page:
+    {"items": [...], "next_cursor": "..." | null} (keyset, oldest first).
     """
     status = request.args.get("status", "pending_review")
-    cases = hitl_service.get_cases(status)
-    return jsonify(cases)
+    if "limit" not in request.args and "cursor" not in request.args:
+        return jsonify(hitl_service.get_cases(status))
+    try:
+        page = hitl_service.list_cases(
+            status,
+            limit=int(request.args.get("limit", 50)),
+            cursor=request.args.get("cursor"),
+        )
+    except ValueError:
+        return UnifiedResponse.error("limit must be an integer and cursor a value from next_cursor",
+                                     error_code="INVALID_CURSOR", status=400)
+    return jsonify(page)
 
 
 @v1.route("/admin/cases/<case_id>/approve", methods=["POST"])
@@ -651,10 +692,7 @@ def ivr_turn():
 
     # Persist slot into session
     sm = _get_session_manager()
-    existing = sm.get_session(session_id)
-    if not existing:
-        sm.create_session(session_id)
-    sm.update_data(session_id, slot_key, slot_value)
+    sm.patch(session_id, data={slot_key: slot_value}, create=True)
 
     # Audit slot fill (value omitted for PII safety)
     try:
@@ -776,17 +814,92 @@ def get_telemetry_summary():
     """
     try:
         from app.services.telemetry_service import get_telemetry
+        from app.services.intent_service import get_active_intent_classifier
         tel = get_telemetry()
-        return jsonify({
+        body = {
             "summary":  tel.get_summary(),
             "raw":      tel.get_local_metrics()[-50:],   # last 50 events
             "namespace": "JanSathi",
-        })
+        }
+        classifier = get_active_intent_classifier()
+        if classifier is not None:                       # no split without a two-stage classifier
+            body["intent_split"] = classifier.stats()
+        return jsonify(body)
     except Exception as e:
         logger.error(f"[v1/telemetry] Error: {e}")
         return jsonify({"summary": {}, "raw": []}), 500
 
 
+@v1.route("/admin/telemetry/summary", methods=["GET"])
+@require_auth
+@require_admin
+def get_admin_telemetry_summary():
+    """
+    GET /v1/admin/telemetry/summary[?raw=true]
+    Metric totals plus p50/p90/p99/max latency per route, dependency and
+    latency metric over the rolling window. `raw=true` adds this worker's
+    serialised histograms so several workers can be merged
+    (latency_histogram.merge_exports).
+    """
+    try:
+        from app.services.telemetry_service import get_telemetry
+        from app.services.latency_histogram import get_latency_histograms
+        hist = get_latency_histograms()
+        body = {
+            "metrics": get_telemetry().get_summary(),
+            "latency": hist.summary(),
+            "window_minutes": hist.window_minutes,
+            "worker": os.getpid(),
+        }
+        if request.args.get("raw", "").lower() == "true":
+            body["histograms"] = hist.export()
+        return jsonify(body)
+    except Exception as e:
+        logger.error(f"[v1/admin/telemetry] Error: {e}")
+        return jsonify({"metrics": {}, "latency": {}, "error": str(e)}), 500
+
+
+@v1.route("/admin/usage/top-prompts", methods=["GET"])
+@require_auth
+@require_admin
+def get_top_prompts():
+    """
+    GET /v1/admin/usage/top-prompts?limit=20
+    Bedrock token accounting: rolling-window totals per route/model/cache
+    status plus the prompts consuming the most tokens.
+    """
+    try:
+        from app.services.token_usage_service import get_usage_tracker
+        tracker = get_usage_tracker()
+        limit = min(int(request.args.get("limit", 20)), 100)
+        return jsonify({
+            "window": tracker.summary(),
+            "top_prompts": tracker.top_prompts(limit),
+        })
+    except Exception as e:
+        logger.error(f"[v1/admin/usage] Error: {e}")
+        return jsonify({"window": {}, "top_prompts": [], "error": str(e)}), 500
+
+
+@v1.route("/admin/maintenance/sessions", methods=["GET", "POST"])
+@require_auth
+@require_admin
+def session_maintenance():
+    """
+    GET  /v1/admin/maintenance/sessions → last sweep report + live size/age histograms
+    POST /v1/admin/maintenance/sessions → run a sweep now and return its report
+    """
+    try:
+        from app.services.session_sweeper import get_sweeper
+        sweeper = get_sweeper()
+        if request.method == "POST":
+            return jsonify(sweeper.run_once())
+        return jsonify({"last_sweep": sweeper.last_report, "histograms": sweeper.session_histograms()})
+    except Exception as e:
+        logger.error(f"[v1/admin/maintenance] Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # AUDIT LOG — read local audit records (dev only)
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -807,6 +920,37 @@ def get_audit_log():
         return jsonify({"records": [], "error": str(e)}), 500
 
 
+@v1.route("/admin/audit/verify", methods=["GET"])
+@require_auth
+@require_admin
+def verify_audit_chain():
+    """
+    GET /v1/admin/audit/verify?source=local|s3&prefix=audit/segments/2026/03&workers=4
+    Verifies the audit hash chain and reports the first broken link.
+    """
+    source = request.args.get("source", "local")
+    from app.services.audit_verifier import DEFAULT_WORKERS
+    try:
+        workers = int(request.args.get("workers", DEFAULT_WORKERS))
+    except ValueError:
+        return jsonify({"ok": False, "error": "workers must be an integer"}), 400
+    workers = max(1, min(workers, DEFAULT_WORKERS))
+    try:
+        from app.services.audit_service import get_audit_writer
+        from app.services.audit_verifier import verify_local, verify_s3
+        get_audit_writer().flush()
+        if source == "s3":
+            report = verify_s3(request.args.get("prefix", "audit/segments"), workers=workers)
+        else:
+            # Threads only: forking a web worker that runs audit/telemetry/sweeper
+            # threads can deadlock; process-parallel runs are for the CLI
+            report = verify_local(workers=workers, processes=False)
+        return jsonify(report), 200 if report["ok"] else 409
+    except Exception as e:
+        logger.error(f"[v1/admin/audit/verify] Error: {e}")
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # CIVIC INFRASTRUCTURE ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1055,9 +1199,16 @@ def connect_market():
 
 @v1.route("/health", methods=["GET"])
 def health():
-    """GET /v1/health — service health and unified dashboard stats."""
+    """GET /v1/health — service health, dependency circuit breakers and dashboard stats."""
+    from app.core.resilience import breaker_states, OPEN
+    from agentic_engine.session_manager import session_store_health
+    dependencies = breaker_states()
+    sessions = session_store_health()
+    degraded = any(d["state"] == OPEN for d in dependencies.values()) or sessions["state"] != "ok"
     return jsonify({
-        "status": "healthy",
+        "status": "degraded" if degraded else "healthy",
+        "dependencies": dependencies,
+        "sessions": sessions,
         "service": "JanSathi Unified API",
         "version": "2.1.0",
         "timestamp": time.time(),
@@ -1089,7 +1240,8 @@ def agent_invoke():
         "consent_given":  true,               // DPDP consent
         "phone":          "+918888888888",    // optional, for SMS
         "slots":          {},                 // previously collected slots
-        "asr_confidence": 1.0                 // 1.0 for text; 0-1 for IVR
+        "asr_confidence": 1.0,                // 1.0 for text; 0-1 for IVR
+        "trace":          false               // include Chrome trace-event JSON
       }
 
     Returns:
@@ -1105,6 +1257,7 @@ def agent_invoke():
         "benefit_receipt":    dict,
         "hitl_case_id":       str,
         "sms_sent":           bool,
+        "node_timings":       {node: ms},
         "mode":               "langgraph" | "agentcore" | "fallback"
       }
     """
@@ -1176,7 +1329,8 @@ def agent_invoke():
 
         latency_ms = round((time.perf_counter() - start_time) * 1000, 2)
 
-        return jsonify({
+        from agents.tracing import node_timings, chrome_trace
+        body = {
             "session_id":         final_state.get("session_id", session_id),
             "turn_id":            final_state.get("turn_id", f"turn-{uuid.uuid4().hex[:8]}"),
             "response_text":      final_state.get("response_text", ""),
@@ -1192,9 +1346,13 @@ def agent_invoke():
             "hitl_case_id":       final_state.get("hitl_case_id", ""),
             "sms_sent":           final_state.get("sms_sent", False),
             "error":              final_state.get("error", ""),
+            "node_timings":       node_timings(final_state),
             "mode":               mode,
             "latency_ms":         latency_ms,
-        })
+        }
+        if data.get("trace"):
+            body["trace"] = chrome_trace(final_state)
+        return jsonify(body)
 
     except Exception as e:
         logger.error(f"[v1/agent/invoke] Pipeline error: {e}")
@@ -1333,12 +1491,8 @@ def get_schemes():
     Returns list of available government schemes from schemes_config.yaml
     """
     try:
-        import yaml
-        config_path = os.path.join(os.path.dirname(__file__), '../data/schemes_config.yaml')
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        
-        schemes = config.get('schemes', {})
+        from app.services.scheme_catalog import get_scheme_catalog
+        schemes = get_scheme_catalog().schemes()
         return jsonify({"schemes": schemes, "count": len(schemes)})
     except Exception as e:
         logger.error(f"Failed to load schemes: {e}")
@@ -50,6 +50,13 @@ def log_request_lifecycle(response):
         "user_id": getattr(g, "user_id", "anonymous"),
     }
     logger.info(json.dumps(log_entry))
+    try:
+        from app.services.latency_histogram import get_latency_histograms
+        # Route template, not the raw path, keeps the series count bounded
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        get_latency_histograms().record("RequestLatencyMs", latency_ms, {"route": route})
+    except Exception:
+        pass
     # Propagate correlation ID in response so the frontend can trace requests
     response.headers["X-Correlation-Id"] = getattr(g, "correlation_id", "unknown")
     return response
@@ -0,0 +1,229 @@
+"""
+resilience.py — Circuit breakers + adaptive timeouts for AWS dependencies.
+
+One breaker per dependency (bedrock, kendra, polly, transcribe) keeps a
+rolling window of call outcomes and latencies:
+
+  CLOSED     → calls flow; error rate over the window is tracked
+  OPEN       → calls fail fast with CircuitOpenError (callers use their
+               local fallback: _local_kb_query, _offline_fallback, mocks)
+  HALF_OPEN  → after the cooldown a single probe is let through; success
+               closes the circuit, failure re-opens it
+
+Read timeouts follow the observed p99 of successful calls (with headroom)
+instead of fixed BotoConfig constants; `adaptive_client` rebuilds the
+shared boto3 client when the recommended timeout drifts.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Per-dependency defaults: (connect_s, default_read_s, min_read_s, max_read_s)
+DEPENDENCY_TIMEOUTS = {
+    "bedrock":    (2.0, 10.0, 2.0, 15.0),
+    "kendra":     (2.0, 8.0, 1.0, 10.0),
+    "polly":      (2.0, 5.0, 1.0, 8.0),
+    "transcribe": (2.0, 5.0, 1.0, 8.0),
+}
+
+WINDOW_SIZE = int(os.getenv("BREAKER_WINDOW", "50"))
+MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "10"))
+ERROR_THRESHOLD = float(os.getenv("BREAKER_ERROR_THRESHOLD", "0.5"))
+COOLDOWN_SECONDS = float(os.getenv("BREAKER_COOLDOWN_SECONDS", "30"))
+TIMEOUT_HEADROOM = float(os.getenv("BREAKER_TIMEOUT_HEADROOM", "1.5"))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, window: int = WINDOW_SIZE, min_calls: int = MIN_CALLS,
+                 error_threshold: float = ERROR_THRESHOLD, cooldown_s: float = COOLDOWN_SECONDS,
+                 timeouts: Optional[tuple] = None):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.cooldown_s = cooldown_s
+        self.connect_timeout, self.default_read, self.min_read, self.max_read = (
+            timeouts or DEPENDENCY_TIMEOUTS.get(name, (2.0, 10.0, 1.0, 15.0))
+        )
+        self._calls: deque = deque(maxlen=window)   # (ok, latency_ms)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._short_circuited = 0
+        self._lock = threading.Lock()
+
+    # ── State ─────────────────────────────────────────────────────────────────
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown_s:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._short_circuited += 1
+            return False
+
+    def record(self, ok: bool, latency_ms: float) -> None:
+        try:
+            from app.services.latency_histogram import get_latency_histograms
+            get_latency_histograms().record("DependencyLatencyMs", latency_ms, {"dependency": self.name})
+        except Exception:
+            pass
+        with self._lock:
+            state = self._current_state()
+            if state == HALF_OPEN:
+                self._probe_in_flight = False
+                if ok:
+                    self._state = CLOSED
+                    self._calls.clear()
+                    logger.info(f"[Resilience] {self.name} circuit closed")
+                else:
+                    self._trip()
+                    return
+            self._calls.append((ok, latency_ms))
+            if self._state == CLOSED and len(self._calls) >= self.min_calls:
+                errors = sum(1 for c_ok, _ in self._calls if not c_ok)
+                if errors / len(self._calls) >= self.error_threshold:
+                    self._trip()
+
+    def _trip(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        logger.warning(f"[Resilience] {self.name} circuit OPEN — failing fast for {self.cooldown_s:.0f}s")
+        try:
+            from app.services.telemetry_service import get_telemetry
+            get_telemetry().emit("CircuitOpened", 1.0, {"dependency": self.name})
+        except Exception:
+            pass
+
+    # ── Calls ─────────────────────────────────────────────────────────────────
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """Run fn under the breaker; raises CircuitOpenError when open."""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit open")
+        t0 = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record(False, (time.perf_counter() - t0) * 1000)
+            raise
+        self.record(True, (time.perf_counter() - t0) * 1000)
+        return result
+
+    # ── Adaptive timeouts ─────────────────────────────────────────────────────
+
+    def p99_ms(self) -> Optional[float]:
+        with self._lock:
+            ok = sorted(lat for c_ok, lat in self._calls if c_ok)
+        if len(ok) < self.min_calls:
+            return None
+        return ok[min(len(ok) - 1, int(len(ok) * 0.99))]
+
+    def read_timeout(self) -> float:
+        p99 = self.p99_ms()
+        if p99 is None:
+            return self.default_read
+        return round(max(self.min_read, min(self.max_read, p99 * TIMEOUT_HEADROOM / 1000.0)), 2)
+
+    def snapshot(self) -> dict:
+        p99 = self.p99_ms()
+        with self._lock:
+            state = self._current_state()
+            calls = list(self._calls)
+            short = self._short_circuited
+        errors = sum(1 for ok, _ in calls if not ok)
+        return {
+            "state": state,
+            "calls": len(calls),
+            "error_rate": round(errors / len(calls), 3) if calls else 0.0,
+            "p99_ms": round(p99, 1) if p99 is not None else None,
+            "read_timeout_s": self.read_timeout(),
+            "short_circuited": short,
+        }
+
+
+# ── Registry ──────────────────────────────────────────────────────────────────
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _registry_lock:
+            breaker = _breakers.setdefault(name, CircuitBreaker(name))
+    return breaker
+
+
+def breaker_states() -> dict:
+    """Snapshot of every known dependency, for /v1/health."""
+    for name in DEPENDENCY_TIMEOUTS:
+        get_breaker(name)
+    return {name: b.snapshot() for name, b in sorted(_breakers.items())}
+
+
+def boto_config(name: str, **overrides):
+    """BotoConfig with p99-derived read timeout and no SDK-level retries."""
+    from botocore.config import Config as BotoConfig
+    breaker = get_breaker(name)
+    params = {
+        "connect_timeout": breaker.connect_timeout,
+        "read_timeout": breaker.read_timeout(),
+        "retries": {"max_attempts": 1},
+    }
+    params.update(overrides)
+    return BotoConfig(**params)
+
+
+_clients: Dict[tuple, tuple] = {}
+_clients_lock = threading.Lock()
+
+
+def adaptive_client(name: str, service_name: str, region: str):
+    """
+    Shared boto3 client for a dependency, rebuilt when the breaker's
+    recommended read timeout drifts by more than 25% from the one in use.
+    """
+    import boto3
+    key = (name, service_name, region)
+    target = get_breaker(name).read_timeout()
+    entry = _clients.get(key)
+    if entry is not None and abs(entry[1] - target) <= 0.25 * entry[1]:
+        return entry[0]
+    with _clients_lock:
+        entry = _clients.get(key)
+        if entry is None or abs(entry[1] - target) > 0.25 * entry[1]:
+            client = boto3.client(service_name, region_name=region, config=boto_config(name))
+            _clients[key] = (client, target)
+            if entry is not None:
+                logger.info(f"[Resilience] {name} read timeout {entry[1]}s → {target}s")
+            entry = _clients[key]
+    return entry[0]
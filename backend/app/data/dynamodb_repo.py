@@ -14,16 +14,50 @@ Usage:
     # Cache operations
     repo.cache_set(query_hash, response_data, ttl_seconds=3600)
     cached = repo.cache_get(query_hash)
+    found = repo.cache_get_many([(query, "hi"), (query, "en")])   # one BatchGetItem
+
+Cache statistics live in a counter item (QueryHash="__stats__") maintained
+with UpdateItem ADD; hits/misses/sets are buffered in memory and added every
+CACHE_STATS_FLUSH_SECONDS so the read path never waits on a write. Pending
+increments are flushed at interpreter exit, or per invocation on Lambda via
+flush_all_stats() in lambda_handler.
 """
 import os
 import time
+import atexit
+import weakref
 import uuid
 import hashlib
 import json
+import threading
 import boto3
 from botocore.exceptions import ClientError
 from app.core.utils import log_event, logger
 
+STATS_KEY = "__stats__"
+STATS_FLUSH_SECONDS = float(os.getenv("CACHE_STATS_FLUSH_SECONDS", "30"))
+ITEM_COUNT_REFRESH_SECONDS = 300     # DescribeTable ItemCount only changes ~every 6 h
+BATCH_GET_LIMIT = 100                # DynamoDB BatchGetItem maximum keys per request
+BATCH_GET_RETRIES = 5
+_CACHE_PROJECTION = "QueryHash, #r, Sources, HitCount, #t"
+_CACHE_PROJECTION_NAMES = {"#r": "Response", "#t": "ttl"}
+
+_repos = weakref.WeakSet()           # live repos with possibly unflushed counters
+_repos_lock = threading.Lock()
+
+
+def flush_all_stats() -> None:
+    """Flush buffered cache counters of every live DynamoDBRepo."""
+    with _repos_lock:
+        repos = list(_repos)
+    for repo in repos:
+        repo.flush_stats()
+
+
+# Lambda containers are frozen, not exited — lambda_handler flushes per invocation
+if not os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
+    atexit.register(flush_all_stats)
+
 
 class DynamoDBRepo:
     """
@@ -42,6 +76,13 @@ class DynamoDBRepo:
 
         logger.info(f"DynamoDB initialized: {self.conversations_table_name}, {self.cache_table_name}")
 
+        self._stats_lock = threading.Lock()
+        self._pending_stats = {}            # counter name -> increment not yet ADDed
+        self._last_stats_flush = time.monotonic()
+        self._item_count = (0.0, None)      # (fetched_at, ItemCount)
+        with _repos_lock:
+            _repos.add(self)
+
     # ============================================================
     # CONVERSATIONS
     # ============================================================
@@ -104,31 +145,72 @@ class DynamoDBRepo:
         normalized = query.strip().lower()
         return hashlib.sha256(f"{normalized}:{language}".encode()).hexdigest()[:32]
 
+    @staticmethod
+    def _cache_entry(item: dict | None, now: int) -> dict | None:
+        # TTL deletion is eventually consistent, so expired items can still be returned
+        if not item or item.get("ttl", 0) < now:
+            return None
+        return {
+            "response": item.get("Response", ""),
+            "sources": json.loads(item.get("Sources", "[]")),
+            "hit_count": int(item.get("HitCount", 0)),
+        }
+
     def cache_get(self, query: str, language: str = "hi") -> dict | None:
         """Get a cached response. Returns None if expired or not found."""
         key = self._cache_key(query, language)
         try:
             response = self.cache_table.get_item(Key={"QueryHash": key})
-            item = response.get("Item")
-
-            if not item:
-                return None
-
-            # Check if TTL has passed (DynamoDB TTL is eventually consistent)
-            if item.get("ttl", 0) < int(time.time()):
-                return None
-
-            log_event("dynamodb_cache_hit", {"key": str(key)[:8]})
-
-            return {
-                "response": item.get("Response", ""),
-                "sources": json.loads(item.get("Sources", "[]")),
-                "hit_count": int(item.get("HitCount", 0)),
-            }
+            entry = self._cache_entry(response.get("Item"), int(time.time()))
+            self._count("Hits" if entry else "Misses")
+            if entry:
+                log_event("dynamodb_cache_hit", {"key": str(key)[:8]})
+            return entry
         except ClientError as e:
             logger.error(f"DynamoDB cache get error: {e}")
             return None
 
+    def cache_get_many(self, lookups: list) -> dict:
+        """
+        Fetch several (query, language) pairs with BatchGetItem.
+
+        Returns {(query, language): entry} for the pairs that hit; misses and
+        expired items are omitted. Keys are sent in chunks of 100 and
+        UnprocessedKeys are retried with backoff.
+        """
+        keys: dict = {}
+        for query, language in lookups:
+            keys.setdefault(self._cache_key(query, language), []).append((query, language))
+        found: dict = {}
+        now = int(time.time())
+        hashes = list(keys)
+        try:
+            for i in range(0, len(hashes), BATCH_GET_LIMIT):
+                request = {self.cache_table_name: {
+                    "Keys": [{"QueryHash": h} for h in hashes[i:i + BATCH_GET_LIMIT]],
+                    "ProjectionExpression": _CACHE_PROJECTION,
+                    "ExpressionAttributeNames": _CACHE_PROJECTION_NAMES,
+                }}
+                for attempt in range(BATCH_GET_RETRIES):
+                    response = self.dynamodb.batch_get_item(RequestItems=request)
+                    for item in response.get("Responses", {}).get(self.cache_table_name, []):
+                        entry = self._cache_entry(item, now)
+                        if entry:
+                            for pair in keys[item["QueryHash"]]:
+                                found[pair] = entry
+                    request = response.get("UnprocessedKeys") or {}
+                    if not request:
+                        break
+                    time.sleep(min(0.05 * (2 ** attempt), 1.0))
+                else:
+                    logger.warning(f"DynamoDB cache batch get: keys still unprocessed after {BATCH_GET_RETRIES} attempts")
+        except ClientError as e:
+            logger.error(f"DynamoDB cache batch get error: {e}")
+        hits = sum(1 for pair in lookups if pair in found)
+        self._count("Hits", hits)
+        self._count("Misses", len(lookups) - hits)
+        return found
+
     def cache_set(
         self,
         query: str,
@@ -140,7 +222,8 @@ class DynamoDBRepo:
         """Cache a response in DynamoDB with TTL."""
         key = self._cache_key(query, language)
         try:
-            self.cache_table.put_item(
+            response = self.cache_table.put_item(
+                ReturnValues="ALL_OLD",
                 Item={
                     "QueryHash": key,
                     "Query": str(query)[:200],  # Store truncated query for debugging
@@ -152,20 +235,72 @@ class DynamoDBRepo:
                     "CreatedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ"),
                 }
             )
+            self._count("Sets")
+            if not response.get("Attributes"):
+                self._count("Entries")
             log_event("dynamodb_cache_set", {"key": str(key)[:8]})
         except ClientError as e:
             logger.error(f"DynamoDB cache set error: {e}")
 
-    def cache_stats(self) -> dict:
-        """Get basic cache statistics (scan — use sparingly)."""
+    # ── Counters ──────────────────────────────────────────────────────────────
+    def _count(self, name: str, amount: int = 1) -> None:
+        if amount <= 0:
+            return
+        with self._stats_lock:
+            self._pending_stats[name] = self._pending_stats.get(name, 0) + amount
+            due = time.monotonic() - self._last_stats_flush >= STATS_FLUSH_SECONDS
+        if due:
+            self.flush_stats()
+
+    def flush_stats(self) -> None:
+        """ADD buffered counter increments to the stats item in one UpdateItem."""
+        with self._stats_lock:
+            pending, self._pending_stats = self._pending_stats, {}
+            self._last_stats_flush = time.monotonic()
+        if not pending:
+            return
+        names = sorted(pending)
         try:
-            response = self.cache_table.scan(
-                Select="COUNT",
+            self.cache_table.update_item(
+                Key={"QueryHash": STATS_KEY},
+                UpdateExpression="ADD " + ", ".join(f"#c{i} :c{i}" for i in range(len(names))),
+                ExpressionAttributeNames={f"#c{i}": n for i, n in enumerate(names)},
+                ExpressionAttributeValues={f":c{i}": pending[n] for i, n in enumerate(names)},
             )
-            return {
-                "total_entries": response.get("Count", 0),
-                "table": self.cache_table_name,
-                "backend": "dynamodb",
-            }
+        except ClientError as e:
+            logger.error(f"DynamoDB cache stats flush error: {e}")
+            with self._stats_lock:
+                for n, v in pending.items():
+                    self._pending_stats[n] = self._pending_stats.get(n, 0) + v
+
+    def _approximate_item_count(self):
+        fetched_at, count = self._item_count
+        if count is None or time.monotonic() - fetched_at >= ITEM_COUNT_REFRESH_SECONDS:
+            try:
+                table = self.dynamodb.meta.client.describe_table(TableName=self.cache_table_name)["Table"]
+                count = int(table.get("ItemCount", 0))
+                self._item_count = (time.monotonic(), count)
+            except ClientError:
+                pass
+        return count
+
+    def cache_stats(self) -> dict:
+        """Cache statistics from the counter item (one GetItem, no scan)."""
+        self.flush_stats()
+        try:
+            item = self.cache_table.get_item(Key={"QueryHash": STATS_KEY}).get("Item") or {}
         except ClientError:
-            return {"total_entries": 0, "backend": "dynamodb"}
+            item = {}
+        hits, misses = int(item.get("Hits", 0)), int(item.get("Misses", 0))
+        # DescribeTable estimate; the counter item itself is not a cache entry
+        total = max((self._approximate_item_count() or 0) - (1 if item else 0), 0)
+        return {
+            "total_entries": total,
+            "entries_written": int(item.get("Entries", 0)),
+            "sets": int(item.get("Sets", 0)),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "table": self.cache_table_name,
+            "backend": "dynamodb",
+        }
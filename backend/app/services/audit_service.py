@@ -1,21 +1,43 @@
 """
 audit_service.py — Immutable audit log for DPDP / regulatory compliance.
 
-Writes SHA-256-chained JSON records to:
-  - S3 bucket (production)  →  audit/{consent|turns|eligibility|submissions}/{session}_{ts}.json
+Records are queued by the request thread and persisted by a background
+AuditWriter in batches (every AUDIT_FLUSH_SECONDS or AUDIT_BATCH_SIZE
+records, whichever comes first). On Lambda there is no background thread:
+records are written by flush(), which lambda_handler calls at the end of
+every invocation (the container is frozen between invocations and killed
+without running atexit).
+
+  - S3 bucket (production)  →  audit/segments/{date}/{writer_id}/{first_seq}.jsonl
   - Local file (dev)        →  agentic_engine/audit_log.jsonl
 
-Each record contains a SHA-256 integrity digest of (previous_hash + payload)
-to detect tampering (simplified digest chain).
+Each record carries `seq`, `prev_hash` and a SHA-256 `integrity_hash` of
+(prev_hash + record), assigned by the sink while it holds the chain:
+
+  - local: one chain per file — the flush runs under an fcntl lock and the
+    chain head lives in `audit_log.jsonl.head`, so every worker on the host
+    extends the same chain
+  - S3: one chain per writer process (`writer_id`); segment objects carry
+    their first prev_hash / last hash as metadata
+
+Every flushed batch also leaves a checkpoint (local: a line in
+`audit_log.jsonl.ckpt` with its byte offset) for the chain verifier.
 """
 
 import os
 import json
+import time
 import uuid
+import atexit
+import socket
 import hashlib
 import logging
+import threading
+from collections import deque
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional
+
+from app.services.event_log import FileLock
 
 logger = logging.getLogger(__name__)
 
@@ -24,8 +46,19 @@ AUDIT_LOCAL_FILE = os.path.join(
     "agentic_engine", "audit_log.jsonl"
 )
 
-_last_hash = "genesis"           # digest chain seed
+GENESIS_HASH = "genesis"           # digest chain seed
 _audit_bucket = os.getenv("AUDIT_BUCKET", "jansathi-audit")
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", "2.0"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_MAX_QUEUE = int(os.getenv("AUDIT_MAX_QUEUE", "100000"))
+
+
+def _use_s3() -> bool:
+    """AUDIT_SINK=s3|local; otherwise S3 in AWS deployments or when AUDIT_BUCKET is set."""
+    sink = os.getenv("AUDIT_SINK", "").lower()
+    if sink:
+        return sink == "s3"
+    return os.getenv("USE_DYNAMODB", "false").lower() == "true" or "AUDIT_BUCKET" in os.environ
 
 
 def _get_s3():
@@ -40,58 +73,223 @@ def _sha256(data: str) -> str:
     return hashlib.sha256(data.encode("utf-8")).hexdigest()
 
 
-def _write(record_type: str, session_id: str, payload: dict) -> dict:
-    """Core writer: add metadata, compute hash, persist to S3 or local file."""
-    global _last_hash
+def record_hash(prev_hash: str, record: dict) -> str:
+    """Chain digest of a record (everything except its own integrity_hash)."""
+    body = {k: v for k, v in record.items() if k != "integrity_hash"}
+    return _sha256(prev_hash + json.dumps(body, default=str, sort_keys=True))
+
+
+def chain_records(records: List[dict], prev_hash: str, next_seq: int) -> str:
+    """Assign seq / prev_hash / integrity_hash in place; returns the new chain head."""
+    for record in records:
+        record["seq"] = next_seq
+        record["prev_hash"] = prev_hash
+        record["integrity_hash"] = prev_hash = record_hash(prev_hash, record)
+        next_seq += 1
+    return prev_hash
+
+
+# ── Sinks (each owns its chain head) ─────────────────────────────────────────
+
+class LocalAuditSink:
+    """Appends batches to one JSONL file shared by every worker on the host."""
+
+    def __init__(self, path: str = None):
+        self.path = path or AUDIT_LOCAL_FILE
+        self.head_path = self.path + ".head"
+        self.checkpoint_path = self.path + ".ckpt"
+
+    def _read_head(self) -> tuple:
+        try:
+            with open(self.head_path, "r", encoding="utf-8") as f:
+                head = json.load(f)
+            return head["hash"], int(head["seq"])
+        except (OSError, ValueError, KeyError):
+            pass
+        # No head yet: continue from the last line of an existing log
+        last, count = None, 0
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        last, count = line, count + 1
+        if last is None:
+            return GENESIS_HASH, 0
+        try:
+            rec = json.loads(last)
+            return rec.get("integrity_hash") or GENESIS_HASH, int(rec.get("seq", count - 1)) + 1
+        except ValueError:
+            return GENESIS_HASH, count
+
+    def write_batch(self, records: List[dict]):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with FileLock(self.path + ".lock"):
+            prev_hash, seq = self._read_head()
+            head = chain_records(records, prev_hash, seq)
+            data = "".join(json.dumps(r, default=str) + "\n" for r in records).encode("utf-8")
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(data)
+            with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"offset": offset, "length": len(data), "first_seq": seq,
+                                    "count": len(records), "prev_hash": prev_hash, "last_hash": head}) + "\n")
+            tmp = self.head_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"hash": head, "seq": seq + len(records)}, f)
+            os.replace(tmp, self.head_path)
+        logger.info(f"[Audit] Wrote {len(records)} records locally (seq {seq}–{seq + len(records) - 1})")
+
+
+class S3AuditSink:
+    """One KMS-encrypted JSONL object per batch; chain per writer process."""
+
+    def __init__(self, bucket: str = None, prefix: str = "audit/segments"):
+        self.bucket = bucket or _audit_bucket
+        self.prefix = prefix
+        self.writer_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._head = GENESIS_HASH
+        self._seq = 0
+        self._s3 = None
+
+    def write_batch(self, records: List[dict]):
+        if self._s3 is None:
+            self._s3 = _get_s3()
+            if self._s3 is None:
+                raise RuntimeError("boto3 unavailable")
+        for r in records:
+            r["writer_id"] = self.writer_id
+        prev_hash, first_seq = self._head, self._seq
+        head = chain_records(records, prev_hash, first_seq)
+        date = datetime.now(timezone.utc).strftime("%Y/%m/%d")
+        key = f"{self.prefix}/{date}/{self.writer_id}/{first_seq:012d}.jsonl"
+        self._s3.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body="".join(json.dumps(r, default=str) + "\n" for r in records).encode("utf-8"),
+            ContentType="application/x-ndjson",
+            ServerSideEncryption="aws:kms",
+            Metadata={"prev-hash": prev_hash, "last-hash": head,
+                      "first-seq": str(first_seq), "count": str(len(records))},
+        )
+        # Advance only once the segment is durable, so a failed put can be retried
+        self._head, self._seq = head, first_seq + len(records)
+        logger.info(f"[Audit] Written {len(records)} records to s3://{self.bucket}/{key}")
+
+
+# ── Writer (queue + background flusher) ──────────────────────────────────────
+
+class AuditWriter:
+    def __init__(self, sink=None, flush_seconds: float = AUDIT_FLUSH_SECONDS,
+                 batch_size: int = AUDIT_BATCH_SIZE, max_queue: int = AUDIT_MAX_QUEUE,
+                 background: bool = True):
+        self.sink = sink or (S3AuditSink() if _use_s3() else LocalAuditSink())
+        self.fallback = LocalAuditSink() if isinstance(self.sink, S3AuditSink) else None
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+        self.background = background     # False: records are only written by flush()
+        self._queue: deque = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
 
-    ts = datetime.now(timezone.utc).isoformat()
+    def submit(self, record: dict):
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                # Sink is down and the queue is full — drop rather than exhaust memory
+                self.dropped += 1
+                logger.error(f"[Audit] queue full, dropped {record['record_type']} / {record['record_id'][:8]}")
+                return
+            self._queue.append(record)
+            full = len(self._queue) >= self.batch_size
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def flush(self) -> int:
+        """Persist everything queued so far. Returns the number of records written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._queue[i] for i in range(min(self.batch_size, len(self._queue)))]
+                if not batch:
+                    break
+                try:
+                    self.sink.write_batch(batch)
+                except Exception as e:
+                    if self.fallback is None:
+                        raise
+                    logger.warning(f"[Audit] S3 write failed, falling back to local: {e}")
+                    self.fallback.write_batch(batch)
+                with self._lock:
+                    for _ in batch:
+                        self._queue.popleft()
+                written += len(batch)
+        if written:
+            try:
+                from app.services.telemetry_service import get_telemetry
+                get_telemetry().emit("AuditLogWritten", float(written))
+            except Exception:
+                pass
+        return written
+
+    def _ensure_thread(self):
+        if not self.background:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Records stay queued; retried on the next tick
+                logger.error(f"[Audit] flush failed ({self.pending()} queued): {e}")
+                time.sleep(self.flush_seconds)
+
+
+_writer: Optional[AuditWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer() -> AuditWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                on_lambda = bool(os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
+                _writer = AuditWriter(background=not on_lambda)
+                if not on_lambda:
+                    atexit.register(_writer.flush)
+    return _writer
+
+
+def _write(record_type: str, session_id: str, payload: dict) -> dict:
+    """Core writer: add metadata and queue the record (chained at flush time)."""
     record = {
         "record_id": str(uuid.uuid4()),
         "record_type": record_type,
         "session_id": session_id,
-        "ts": ts,
+        "ts": datetime.now(timezone.utc).isoformat(),
         "payload": payload,
     }
-    serialised = json.dumps(record, default=str, sort_keys=True)
-    record["integrity_hash"] = _sha256(_last_hash + serialised)
-    _last_hash = record["integrity_hash"]
-
-    # ── S3 path ───────────────────────────────────────────────────────────────
-    s3_key = f"audit/{record_type}/{session_id}_{record['record_id'][:8]}.json"
-    s3 = _get_s3()
-    if s3:
-        try:
-            s3.put_object(
-                Bucket=_audit_bucket,
-                Key=s3_key,
-                Body=json.dumps(record, default=str),
-                ContentType="application/json",
-                ServerSideEncryption="aws:kms",
-            )
-            logger.info(f"[Audit] Written to s3://{_audit_bucket}/{s3_key}")
-        except Exception as e:
-            logger.warning(f"[Audit] S3 write failed, falling back to local: {e}")
-            _write_local(record)
-    else:
-        _write_local(record)
-
-    # Emit telemetry
-    try:
-        from app.services.telemetry_service import get_telemetry
-        get_telemetry().emit("AuditLogWritten", 1.0, {"record_type": record_type})
-    except Exception:
-        pass
-
+    get_audit_writer().submit(record)
     return record
 
 
-def _write_local(record: dict):
-    os.makedirs(os.path.dirname(AUDIT_LOCAL_FILE), exist_ok=True)
-    with open(AUDIT_LOCAL_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, default=str) + "\n")
-    logger.info(f"[Audit] Written locally: {record['record_type']} / {record['record_id'][:8]}")
-
-
 # ── Public API ────────────────────────────────────────────────────────────────
 
 class AuditService:
@@ -154,6 +352,10 @@ class AuditService:
 
     def get_local_records(self, session_id: Optional[str] = None) -> list:
         """Read audit records from local JSONL file (dev only)."""
+        try:
+            get_audit_writer().flush()
+        except Exception as e:
+            logger.warning(f"[Audit] flush before read failed: {e}")
         records = []
         if not os.path.exists(AUDIT_LOCAL_FILE):
             return records
@@ -0,0 +1,321 @@
+"""
+audit_verifier.py — Streaming, parallel verifier for the audit hash chain.
+
+Local (agentic_engine/audit_log.jsonl):
+  The log is memory-mapped and cut into segments on the batch boundaries
+  recorded in `audit_log.jsonl.ckpt` (or on line boundaries when there is
+  no checkpoint file). Segments are verified in a process pool (CLI) or a
+  thread pool (`processes=False`, used by the admin endpoint so a web worker
+  is never forked) — each record's digest and its link to the previous
+  record — then stitched:
+  every segment must start where the previous one ended, and the last
+  record must match the chain head in `audit_log.jsonl.head`.
+
+S3 (audit/segments/{date}/{writer_id}/{first_seq}.jsonl):
+  Objects are streamed in a thread pool and checked against the prev/last
+  hash in their metadata; each writer's segments are stitched by seq.
+
+Records written before sequencing (no `prev_hash`) are accepted if they
+chain from the previous record or restart from genesis (the old
+per-process seed); they are counted as `legacy_records`.
+
+CLI:  python -m app.services.audit_verifier [--s3 [--prefix P]] [--workers N]
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import argparse
+import logging
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from app.services.audit_service import AUDIT_LOCAL_FILE, GENESIS_HASH, record_hash, _audit_bucket, _get_s3
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_BYTES = int(os.getenv("AUDIT_VERIFY_SEGMENT_BYTES", str(8 * 1024 * 1024)))
+DEFAULT_WORKERS = int(os.getenv("AUDIT_VERIFY_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+
+# ── Segment verification (runs in worker processes) ─────────────────────────
+
+def _verify_lines(lines) -> dict:
+    """
+    Verify an iterable of (offset, raw_line) within one segment.
+    The first record's prev_hash is taken on trust here and checked when
+    segments are stitched.
+    """
+    result = {"count": 0, "legacy": 0, "first_prev_hash": None, "first_seq": None,
+              "last_hash": None, "last_seq": None, "error": None}
+    prev_hash, prev_seq = None, None
+    for offset, raw in lines:
+        if not raw.strip():
+            continue
+        try:
+            rec = json.loads(raw)
+            stored = rec["integrity_hash"]
+        except (ValueError, KeyError, TypeError):
+            result["error"] = {"offset": offset, "reason": "unparseable record"}
+            return result
+        if "prev_hash" in rec:
+            claimed_prev = rec["prev_hash"]
+            if prev_hash is not None and claimed_prev != prev_hash:
+                reason = "prev_hash does not match previous record"
+            elif prev_seq is not None and rec.get("seq") != prev_seq + 1:
+                reason = f"seq gap: expected {prev_seq + 1}, found {rec.get('seq')}"
+            elif record_hash(claimed_prev, rec) != stored:
+                reason = "integrity_hash mismatch"
+            else:
+                reason = None
+            seq = rec.get("seq")
+        else:
+            # Legacy record: chained from the previous one, or a worker restart at genesis
+            claimed_prev = prev_hash if prev_hash is not None else GENESIS_HASH
+            if stored not in (record_hash(claimed_prev, rec), record_hash(GENESIS_HASH, rec)):
+                reason = "integrity_hash mismatch (legacy record)"
+            else:
+                reason = None
+            seq = None
+            result["legacy"] += 1
+        if reason:
+            result["error"] = {"offset": offset, "seq": rec.get("seq"),
+                               "record_id": rec.get("record_id"), "reason": reason}
+            return result
+        if result["count"] == 0:
+            result["first_prev_hash"] = claimed_prev if "prev_hash" in rec else None
+            result["first_seq"] = seq
+        result["count"] += 1
+        prev_hash, prev_seq = stored, seq
+        result["last_hash"], result["last_seq"] = stored, seq
+    return result
+
+
+def _verify_file_range(path: str, start: int, end: int) -> dict:
+    with open(path, "rb") as f:
+        if end <= start:
+            return _verify_lines([])
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            def lines():
+                pos = start
+                while pos < end:
+                    nl = mm.find(b"\n", pos, end)
+                    stop = end if nl == -1 else nl
+                    yield pos, mm[pos:stop].decode("utf-8")
+                    pos = stop + 1
+            return _verify_lines(lines())
+        finally:
+            mm.close()
+
+
+# ── Local log ────────────────────────────────────────────────────────────────
+
+def _load_json_lines(path: str) -> list:
+    out = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    continue
+    return out
+
+
+def _plan_segments(path: str, size: int, segment_bytes: int) -> list:
+    """Byte ranges [(start, end, checkpoint|None)] covering the whole file."""
+    checkpoints = sorted(_load_json_lines(path + ".ckpt"), key=lambda c: c["offset"])
+    ranges, pos = [], 0
+    if checkpoints:
+        if checkpoints[0]["offset"] > 0:
+            ranges.append((0, checkpoints[0]["offset"], None))     # pre-checkpoint (legacy) prefix
+        group = None
+        for c in checkpoints:
+            c_end = c["offset"] + c["length"]
+            if group and group["end"] == c["offset"] and c_end - group["start"] <= segment_bytes:
+                group["end"] = c_end
+                group["count"] += c["count"]
+                group["last_hash"] = c["last_hash"]
+            else:
+                if group:
+                    ranges.append((group["start"], group["end"], group))
+                    if group["end"] < c["offset"]:
+                        ranges.append((group["end"], c["offset"], None))
+                group = {"start": c["offset"], "end": c_end, "count": c["count"],
+                         "prev_hash": c["prev_hash"], "last_hash": c["last_hash"]}
+        ranges.append((group["start"], group["end"], group))
+        pos = group["end"]
+        if pos < size:
+            ranges.append((pos, size, None))                       # written without a checkpoint
+        return ranges
+
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        try:
+            while pos < size:
+                cut = min(pos + segment_bytes, size)
+                if cut < size:
+                    nl = mm.find(b"\n", cut)
+                    cut = size if nl == -1 else nl + 1
+                ranges.append((pos, cut, None))
+                pos = cut
+        finally:
+            if mm is not None:
+                mm.close()
+    return ranges
+
+
+def verify_local(path: str = None, workers: int = DEFAULT_WORKERS,
+                 segment_bytes: int = SEGMENT_BYTES, processes: bool = True) -> dict:
+    path = path or AUDIT_LOCAL_FILE
+    t0 = time.perf_counter()
+    if not os.path.exists(path):
+        return {"ok": True, "source": path, "records": 0, "segments": 0, "legacy_records": 0,
+                "first_break": None, "duration_ms": 0.0}
+    size = os.path.getsize(path)
+    ranges = _plan_segments(path, size, segment_bytes)
+
+    if workers > 1 and len(ranges) > 1:
+        executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with executor(max_workers=workers) as pool:
+            results = list(pool.map(_verify_file_range, [path] * len(ranges),
+                                    [r[0] for r in ranges], [r[1] for r in ranges]))
+    else:
+        results = [_verify_file_range(path, start, end) for start, end, _ in ranges]
+
+    breaks = []
+    for (start, end, ckpt), res in zip(ranges, results):
+        if res["error"]:
+            breaks.append(res["error"])
+        elif ckpt and (res["count"] != ckpt["count"] or res["last_hash"] != ckpt["last_hash"]
+                       or res["first_prev_hash"] != ckpt["prev_hash"]):
+            breaks.append({"offset": start, "seq": res["first_seq"],
+                           "reason": "segment does not match its checkpoint"})
+    stitched = _stitch([(r[0], res) for r, res in zip(ranges, results) if not res["error"]],
+                       require_genesis=not any(r["legacy"] for r in results))
+    if stitched:
+        breaks.append(stitched)
+    first_break = min(breaks, key=lambda b: b["offset"]) if breaks else _check_head(path, results, size)
+
+    return {
+        "ok": first_break is None,
+        "source": path,
+        "records": sum(r["count"] for r in results),
+        "segments": len(ranges),
+        "legacy_records": sum(r["legacy"] for r in results),
+        "head": next((r["last_hash"] for r in reversed(results) if r["last_hash"]), None),
+        "first_break": first_break,
+        "duration_ms": round((time.perf_counter() - t0) * 1000, 2),
+    }
+
+
+def _stitch(segments: list, require_genesis: bool = False) -> Optional[dict]:
+    """
+    Each segment must begin where the previous one ended: [(offset_or_key, result)].
+    The first sequenced segment must start at genesis when it claims seq 0
+    (or always, with require_genesis).
+    """
+    prev_hash, prev_seq = None, None
+    for where, res in segments:
+        if not res["count"]:
+            continue
+        first_prev = res["first_prev_hash"]
+        if first_prev is not None:
+            if prev_hash is None:
+                if (require_genesis or res["first_seq"] == 0) and (first_prev != GENESIS_HASH or res["first_seq"] != 0):
+                    return {"offset": where, "seq": res["first_seq"], "reason": "chain does not start at genesis"}
+            elif first_prev != prev_hash:
+                return {"offset": where, "seq": res["first_seq"],
+                        "reason": "segment does not continue the previous segment's chain"}
+            elif prev_seq is not None and res["first_seq"] != prev_seq + 1:
+                return {"offset": where, "seq": res["first_seq"],
+                        "reason": f"seq gap between segments: expected {prev_seq + 1}"}
+        prev_hash, prev_seq = res["last_hash"], res["last_seq"]
+    return None
+
+
+def _check_head(path: str, results: list, size: int) -> Optional[dict]:
+    """Records deleted from the end of the log leave the head pointing past them."""
+    try:
+        with open(path + ".head", "r", encoding="utf-8") as f:
+            head = json.load(f)
+    except (OSError, ValueError):
+        return None
+    last = next((r for r in reversed(results) if r["count"]), None)
+    if last is None or last["last_hash"] != head.get("hash"):
+        return {"offset": size, "seq": head.get("seq"), "reason": "log ends before the recorded chain head"}
+    return None
+
+
+# ── S3 segments ──────────────────────────────────────────────────────────────
+
+def _verify_s3_object(s3, bucket: str, key: str) -> dict:
+    obj = s3.get_object(Bucket=bucket, Key=key)
+    meta = obj.get("Metadata", {})
+    res = _verify_lines((i, line.decode("utf-8")) for i, line in enumerate(obj["Body"].iter_lines()))
+    res["key"] = key
+    res["writer_id"] = key.rsplit("/", 2)[-2]
+    if not res["error"] and (res["first_prev_hash"] != meta.get("prev-hash")
+                             or res["last_hash"] != meta.get("last-hash")
+                             or str(res["count"]) != meta.get("count")):
+        res["error"] = {"key": key, "seq": res["first_seq"], "reason": "segment does not match its metadata"}
+    elif res["error"]:
+        res["error"] = {**res["error"], "key": key, "line": res["error"].pop("offset", None)}
+    return res
+
+
+def verify_s3(prefix: str = "audit/segments", bucket: str = None, workers: int = DEFAULT_WORKERS,
+              s3=None) -> dict:
+    t0 = time.perf_counter()
+    bucket = bucket or _audit_bucket
+    s3 = s3 or _get_s3()
+    if s3 is None:
+        raise RuntimeError("boto3 unavailable")
+    keys = []
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+        keys += [o["Key"] for o in page.get("Contents", []) if o["Key"].endswith(".jsonl")]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda k: _verify_s3_object(s3, bucket, k), keys))
+
+    by_writer = defaultdict(list)
+    for res in results:
+        by_writer[res["writer_id"]].append(res)
+    breaks = [res["error"] for res in results if res["error"]]
+    for writer_id, segments in by_writer.items():
+        segments.sort(key=lambda r: r["first_seq"] if r["first_seq"] is not None else -1)
+        # A date-scoped prefix may start mid-chain; seq 0 must still start at genesis
+        brk = _stitch([(r["key"], r) for r in segments])
+        if brk:
+            brk["writer_id"] = writer_id
+            breaks.append(brk)
+    breaks.sort(key=lambda b: (b.get("writer_id", ""), b.get("seq") if b.get("seq") is not None else -1))
+
+    return {
+        "ok": not breaks,
+        "source": f"s3://{bucket}/{prefix}",
+        "records": sum(r["count"] for r in results),
+        "segments": len(keys),
+        "writers": len(by_writer),
+        "first_break": breaks[0] if breaks else None,
+        "breaks": len(breaks),
+        "duration_ms": round((time.perf_counter() - t0) * 1000, 2),
+    }
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+    parser = argparse.ArgumentParser(description="Verify the audit hash chain")
+    parser.add_argument("--path", default=AUDIT_LOCAL_FILE)
+    parser.add_argument("--s3", action="store_true", help="verify S3 segments instead of the local log")
+    parser.add_argument("--prefix", default="audit/segments")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    report = verify_s3(args.prefix, workers=args.workers) if args.s3 else verify_local(args.path, args.workers)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
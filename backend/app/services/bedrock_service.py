@@ -6,6 +6,8 @@ import time
 from botocore.exceptions import ClientError, NoCredentialsError
 from dotenv import load_dotenv
 from app.core.utils import log_event, timed
+from app.core.resilience import CircuitOpenError, adaptive_client, get_breaker
+from app.services.token_usage_service import record_usage
 from app.core.security import sanitize_ai_response
 from app.services.cache_service import ResponseCache
 
@@ -40,19 +42,20 @@ class BedrockService:
         # Default to Amazon Nova Lite (replaces Claude)
         self.model_id = os.getenv('BEDROCK_MODEL_ID', NOVA_LITE)
 
-        from botocore.config import Config as BotoConfig
-        _cfg = BotoConfig(connect_timeout=5, read_timeout=10, retries={'max_attempts': 1})
+        # Shared client; read timeout follows the bedrock breaker's observed p99
+        self._breaker = get_breaker("bedrock")
         try:
-            self.bedrock_runtime = boto3.client(
-                service_name='bedrock-runtime',
-                region_name=self.region,
-                config=_cfg,
-            )
+            adaptive_client("bedrock", "bedrock-runtime", self.region)
             self.working = True
         except NoCredentialsError:
             print("Bedrock Init Failed: No Credentials.")
             self.working = False
 
+    @property
+    def bedrock_runtime(self):
+        # Fetched per call — adaptive_client caches it and rebuilds on timeout drift
+        return adaptive_client("bedrock", "bedrock-runtime", self.region)
+
     def _is_scheme_related(self, query: str, intent: str, scheme_hint: str) -> bool:
         it = (intent or "").lower()
         sh = (scheme_hint or "unknown").lower()
@@ -132,6 +135,8 @@ class BedrockService:
         # ── Check Cache ───────────────────────────────────────────────────────
         cached = BedrockQueryCache.get(query, language)
         if cached:
+            record_usage(None, self.model_id, label=f"bedrock_service:{intent}",
+                         cache_status="hit", session_id=session_id)
             try:
                 # Build return dict combining cache result
                 explainability = {
@@ -176,7 +181,8 @@ If the query is clearly about Indian government schemes and verified sources are
         system = [{"text": JANSATHI_SYSTEM_PROMPT}]
 
         try:
-            response = self.bedrock_runtime.converse(
+            response = self._breaker.call(
+                self.bedrock_runtime.converse,
                 modelId=self.model_id,
                 messages=messages,
                 system=system,
@@ -189,6 +195,11 @@ If the query is clearly about Indian government schemes and verified sources are
 
             provenance = "verified_doc" if has_scheme_context else "general_search"
             usage = response.get("usage", {})
+            record_usage(
+                usage, self.model_id, prompt=user_content,
+                label=f"bedrock_service:{provenance}:{intent}",
+                cache_status="miss", session_id=session_id,
+            )
 
             log_event('bedrock_success', {
                 'model': self.model_id,
@@ -218,6 +229,9 @@ If the query is clearly about Indian government schemes and verified sources are
                 "explainability": explainability,
             }
 
+        except CircuitOpenError:
+            # Fail fast during an outage instead of waiting out the read timeout
+            return self._get_context_based_response(query, context_text, language, intent, scheme_hint)
         except ClientError as e:
             error_code = e.response['Error']['Code']
             print(f"Bedrock ClientError ({error_code}): {e}")
@@ -284,7 +298,8 @@ If the query is clearly about Indian government schemes and verified sources are
 
         try:
             # Nova Pro for vision (supports multimodal)
-            response = self.bedrock_runtime.converse(
+            response = self._breaker.call(
+                self.bedrock_runtime.converse,
                 modelId=NOVA_PRO,
                 messages=messages,
                 system=[{"text": JANSATHI_SYSTEM_PROMPT}],
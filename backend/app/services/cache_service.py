@@ -1,18 +1,32 @@
 """
 Response Cache Service — DynamoDB-style caching using SQLite (Free Tier).
 Caches Bedrock AI responses with TTL to reduce API costs by ~80%.
+
+Reads are read-only: hit counts accumulate in memory and are written back in
+one UPDATE batch every CACHE_HIT_FLUSH_SECONDS, and expired rows are removed
+by a set-based DELETE on the ttl index rather than on the read path. Counts
+still pending at shutdown are written by an atexit hook (see flush_on_exit).
 """
 
+import os
+import atexit
 import hashlib
 import json
 import time
 import threading
 from datetime import datetime
+from sqlalchemy import select, update, delete, func, case, bindparam
 from app.models.models import db
 
+HIT_FLUSH_SECONDS = float(os.getenv("CACHE_HIT_FLUSH_SECONDS", "30"))
+HIT_FLUSH_MAX_KEYS = int(os.getenv("CACHE_HIT_FLUSH_MAX_KEYS", "500"))
+CLEANUP_SECONDS = float(os.getenv("CACHE_CLEANUP_SECONDS", "300"))
+
+
 class CacheEntry(db.Model):
     """SQLAlchemy model for cached AI responses."""
     __tablename__ = 'response_cache'
+    __table_args__ = (db.Index('ix_response_cache_ttl', 'ttl'),)
     
     cache_key = db.Column(db.String(64), primary_key=True)
     query = db.Column(db.String(200), nullable=False)
@@ -24,6 +38,22 @@ class CacheEntry(db.Model):
     hit_count = db.Column(db.Integer, default=0)
 
 
+def _upsert_statement(values: dict):
+    """INSERT ... ON CONFLICT (cache_key) DO UPDATE for SQLite / PostgreSQL."""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    stmt = insert(CacheEntry).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=[CacheEntry.cache_key],
+        set_={k: stmt.excluded[k] for k in values if k != 'cache_key'},
+    )
+
+
 class ResponseCache:
     """
     Application-level response cache.
@@ -44,15 +74,37 @@ class ResponseCache:
         cache.set(query, language, response, sources)
     """
     
-    def __init__(self, ttl_seconds=3600):
+    def __init__(self, ttl_seconds=3600, hit_flush_seconds=HIT_FLUSH_SECONDS,
+                 cleanup_seconds=CLEANUP_SECONDS):
         self.ttl_seconds = ttl_seconds
+        self.hit_flush_seconds = hit_flush_seconds
+        self.cleanup_seconds = cleanup_seconds
         self._cleanup_lock = threading.Lock()
+        self._hits_lock = threading.Lock()
+        self._pending_hits = {}          # cache_key -> hits not yet written
+        self._last_flush = time.monotonic()
+        self._last_cleanup = time.monotonic()
+        self._index_checked = False
+        self._exit_app = None            # Flask app used by the atexit flush
+        self.hits = 0
+        self.misses = 0
     
     def _cache_key(self, query: str, language: str) -> str:
         """Generate deterministic cache key using SHA-256."""
         normalized = f"{query.lower().strip()}:{language.lower()}"
         return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
     
+    def _ensure_index(self):
+        """create_all() skips indexes on an existing table, so add the ttl index once."""
+        if self._index_checked:
+            return
+        self._index_checked = True
+        try:
+            for index in CacheEntry.__table__.indexes:
+                index.create(bind=db.engine, checkfirst=True)
+        except Exception as e:
+            print(f"Cache index check error: {e}")
+    
     def get(self, query: str, language: str = 'hi') -> dict | None:
         """
         Retrieve cached response if exists and not expired.
@@ -64,35 +116,41 @@ class ResponseCache:
         now = int(time.time())
         
         try:
-            entry = CacheEntry.query.get(cache_key)
+            row = db.session.execute(
+                select(CacheEntry.response, CacheEntry.sources_json,
+                       CacheEntry.created_at, CacheEntry.hit_count)
+                .where(CacheEntry.cache_key == cache_key, CacheEntry.ttl > now)
+            ).first()
             
-            if entry and entry.ttl > now:
-                # Cache HIT — increment hit counter
-                entry.hit_count += 1
-                db.session.commit()
+            if row:
+                # Cache HIT — counted in memory, written on the next flush
+                with self._hits_lock:
+                    pending = self._pending_hits.get(cache_key, 0) + 1
+                    self._pending_hits[cache_key] = pending
+                    self.hits += 1
                 
                 sources = []
-                if entry.sources_json:
+                if row.sources_json:
                     try:
-                        sources = json.loads(entry.sources_json)
+                        sources = json.loads(row.sources_json)
                     except json.JSONDecodeError:
                         pass
                 
+                self._maybe_maintain()
                 return {
-                    'response': entry.response,
+                    'response': row.response,
                     'sources': sources,
-                    'cached_at': entry.created_at.isoformat() if entry.created_at else None,
-                    'hit_count': entry.hit_count
+                    'cached_at': row.created_at.isoformat() if row.created_at else None,
+                    'hit_count': (row.hit_count or 0) + pending
                 }
-            
-            # Expired entry — delete it
-            if entry:
-                db.session.delete(entry)
-                db.session.commit()
                 
         except Exception as e:
+            db.session.rollback()
             print(f"Cache GET error: {e}")
         
+        with self._hits_lock:
+            self.misses += 1
+        self._maybe_maintain()
         return None  # Cache MISS
     
     def set(self, query: str, language: str, response: str, sources: list = None):
@@ -107,42 +165,93 @@ class ResponseCache:
         """
         cache_key = self._cache_key(query, language)
         ttl_timestamp = int(time.time()) + self.ttl_seconds
+        values = {
+            'cache_key': cache_key,
+            'query': query[:200],
+            'language': language,
+            'response': response,
+            'sources_json': json.dumps(sources) if sources else None,
+            'ttl': ttl_timestamp,
+            'created_at': datetime.utcnow(),
+            'hit_count': 0,
+        }
         
         try:
-            sources_json = json.dumps(sources) if sources else None
-            
-            # Upsert: delete existing then insert
-            existing = CacheEntry.query.get(cache_key)
-            if existing:
-                db.session.delete(existing)
-                db.session.flush()
-            
-            entry = CacheEntry(
-                cache_key=cache_key,
-                query=query[:200],
-                language=language,
-                response=response,
-                sources_json=sources_json,
-                ttl=ttl_timestamp,
-                hit_count=0
-            )
-            db.session.add(entry)
+            self._ensure_index()
+            with self._hits_lock:
+                self._pending_hits.pop(cache_key, None)
+            stmt = _upsert_statement(values)
+            if stmt is not None:
+                db.session.execute(stmt)
+            else:
+                db.session.merge(CacheEntry(**values))
             db.session.commit()
             
         except Exception as e:
             db.session.rollback()
             print(f"Cache SET error: {e}")
     
+    def flush_hits(self) -> int:
+        """Write accumulated hit counts in one transaction. Returns rows updated."""
+        with self._hits_lock:
+            pending, self._pending_hits = self._pending_hits, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        try:
+            db.session.connection().execute(
+                update(CacheEntry.__table__)
+                .where(CacheEntry.__table__.c.cache_key == bindparam('key'))
+                .values(hit_count=func.coalesce(CacheEntry.__table__.c.hit_count, 0) + bindparam('hits')),
+                [{'key': k, 'hits': n} for k, n in pending.items()],
+            )
+            db.session.commit()
+            return len(pending)
+        except Exception as e:
+            db.session.rollback()
+            with self._hits_lock:
+                for k, n in pending.items():
+                    self._pending_hits[k] = self._pending_hits.get(k, 0) + n
+            print(f"Cache hit flush error: {e}")
+            return 0
+    
+    def flush_on_exit(self, app):
+        """Write pending hit counts at interpreter exit, inside an app context of `app`."""
+        first = self._exit_app is None
+        self._exit_app = app
+        if first:
+            atexit.register(self._flush_at_exit)
+
+    def _flush_at_exit(self):
+        try:
+            with self._exit_app.app_context():
+                self.flush_hits()
+        except Exception as e:
+            print(f"Cache hit flush at exit error: {e}")
+    
+    def _maybe_maintain(self):
+        """Flush hit counts / purge expired rows when their interval has elapsed."""
+        now = time.monotonic()
+        with self._hits_lock:
+            due = (now - self._last_flush >= self.hit_flush_seconds
+                   or len(self._pending_hits) >= HIT_FLUSH_MAX_KEYS)
+        if due:
+            self.flush_hits()
+        if now - self._last_cleanup >= self.cleanup_seconds:
+            self.cleanup_expired()
+    
     def cleanup_expired(self):
-        """Remove expired entries (background task)."""
+        """Remove expired entries with one DELETE on the ttl index."""
         with self._cleanup_lock:
+            self._last_cleanup = time.monotonic()
             try:
+                self._ensure_index()
                 now = int(time.time())
-                expired = CacheEntry.query.filter(CacheEntry.ttl < now).all()
-                for entry in expired:
-                    db.session.delete(entry)
+                result = db.session.execute(
+                    delete(CacheEntry).where(CacheEntry.ttl < now),
+                    execution_options={"synchronize_session": False})
                 db.session.commit()
-                return len(expired)
+                return result.rowcount
             except Exception as e:
                 db.session.rollback()
                 print(f"Cache cleanup error: {e}")
@@ -151,18 +260,21 @@ class ResponseCache:
     def stats(self) -> dict:
         """Return cache statistics."""
         try:
-            total = CacheEntry.query.count()
+            self.flush_hits()
             now = int(time.time())
-            active = CacheEntry.query.filter(CacheEntry.ttl > now).count()
-            total_hits = db.session.query(
-                db.func.sum(CacheEntry.hit_count)
-            ).scalar() or 0
+            total, active, total_hits = db.session.execute(
+                select(func.count(),
+                       func.coalesce(func.sum(case((CacheEntry.ttl > now, 1), else_=0)), 0),
+                       func.coalesce(func.sum(CacheEntry.hit_count), 0))
+            ).one()
+            lookups = self.hits + self.misses
             
             return {
                 'total_entries': total,
                 'active_entries': active,
                 'expired_entries': total - active,
                 'total_hits': total_hits,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
                 'ttl_seconds': self.ttl_seconds
             }
         except Exception as e:
@@ -13,11 +13,12 @@ Hackathon-grade civic infrastructure service layer for:
 
 from __future__ import annotations
 
-import json
 import os
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
 
 from app.models.models import (
     CommunityPost,
@@ -29,6 +30,8 @@ from app.models.models import (
     UserProfile,
     db,
 )
+from app.services.eligibility_matrix import ProfileColumns, profile_record
+from app.services.event_log import EventLog
 
 
 _LIFE_EVENT_FLOWS: Dict[str, Dict[str, Any]] = {
@@ -71,13 +74,93 @@ _LIFE_EVENT_FLOWS: Dict[str, Dict[str, Any]] = {
 }
 
 
+# ── Proactive scheme discovery rules ─────────────────────────────────────────
+# Each "match" takes ProfileColumns and returns a boolean array, so one call
+# covers every profile in the batch (single user or nightly outreach run).
+_PROACTIVE_SCHEMES: List[Dict[str, Any]] = [
+    {
+        "id": "pm_kisan",
+        "title": "PM-KISAN Samman Nidhi",
+        "benefit": "₹6,000/year (₹2,000 × 3 installments)",
+        "action": "apply pm kisan",
+        "link": "https://pmkisan.gov.in",
+        "priority": "high",
+        "match": lambda c: c.has("occupation", "farmer", "agri", "kisan") | (c.num("land_acres") > 0),
+        "sms_hi": "JanSathi Alert: आप PM-KISAN के लिए पात्र हैं। ₹6,000/वर्ष मिल सकते हैं। कहें: 'pm kisan apply'",
+        "sms_en": "JanSathi Alert: You qualify for PM-KISAN ₹6,000/yr. Say: apply pm kisan",
+    },
+    {
+        "id": "solar_pump",
+        "title": "Solar Pump Subsidy (PM-KUSUM)",
+        "benefit": "90% subsidy on solar irrigation pump",
+        "action": "apply solar pump",
+        "link": "https://pmkusum.mnre.gov.in",
+        "priority": "high",
+        "match": lambda c: c.has("occupation", "farmer", "agri") & (c.num("land_acres") > 0),
+        "sms_hi": "JanSathi Alert: Solar Pump पर 90% सब्सिडी मिल सकती है। कहें: 'solar pump apply'",
+        "sms_en": "JanSathi Alert: 90% solar pump subsidy available. Say: apply solar pump",
+    },
+    {
+        "id": "e_shram",
+        "title": "e-Shram Card (₹2L Insurance Free)",
+        "benefit": "₹2 lakh accident insurance, scheme priority access",
+        "action": "register eshram",
+        "link": "https://eshram.gov.in",
+        "priority": "medium",
+        "match": lambda c: (c.num("income") < 500000) & c.has("occupation", "labour", "worker", "daily", "farmer", "mason"),
+        "sms_hi": "JanSathi Alert: e-Shram कार्ड बनवाएं — ₹2 लाख बीमा मुफ्त। कहें: 'eshram register'",
+        "sms_en": "JanSathi Alert: Get e-Shram card — ₹2L insurance free. Say: register eshram",
+    },
+    {
+        "id": "ayushman",
+        "title": "Ayushman Bharat PM-JAY",
+        "benefit": "₹5 lakh/year free hospital treatment",
+        "action": "apply ayushman",
+        "link": "https://pmjay.gov.in",
+        "priority": "high",
+        "match": lambda c: c.num("income") < 300000,
+        "sms_hi": "JanSathi Alert: Ayushman Bharat — ₹5 लाख मुफ्त इलाज। कहें: 'ayushman apply'",
+        "sms_en": "JanSathi Alert: Ayushman Bharat ₹5L free treatment. Say: apply ayushman",
+    },
+    {
+        "id": "pmay_gramin",
+        "title": "PM Awas Yojana – Gramin",
+        "benefit": "₹1.2 lakh house construction grant",
+        "action": "apply pmay gramin",
+        "link": "https://pmayg.nic.in",
+        "priority": "medium",
+        "match": lambda c: (c.num("income") < 200000) & (c.has("state", "rural", "village", "gramin")
+                                                   | c.isin("state", ["", "uttar pradesh", "bihar", "madhya pradesh", "rajasthan", "odisha"])),
+        "sms_hi": "JanSathi Alert: PM Awas Yojana — ₹1.2 लाख घर बनाने के लिए। कहें: 'pmay apply'",
+        "sms_en": "JanSathi Alert: PM Awas Yojana ₹1.2L house grant. Say: apply pmay gramin",
+    },
+    {
+        "id": "tn_farmer",
+        "title": "Tamil Nadu CM Farmer Support Scheme",
+        "benefit": "Additional ₹2,000/yr state top-up for small farmers",
+        "action": "apply tn farmer scheme",
+        "link": "https://www.tn.gov.in/scheme",
+        "priority": "medium",
+        "match": lambda c: c.has("occupation", "farm", "kisan") & c.has("state", "tamil", "tn", "puducherry"),
+        "sms_hi": "JanSathi: तमिलनाडु किसान सहायता — ₹2,000 अतिरिक्त। कहें: 'tn farmer apply'",
+        "sms_en": "JanSathi: Tamil Nadu farmer extra ₹2,000/yr. Say: apply tn farmer scheme",
+    },
+]
+
+
 class CivicInfraService:
     def __init__(self) -> None:
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self._data_dir = os.path.join(base_dir, "data")
         os.makedirs(self._data_dir, exist_ok=True)
-        self._fraud_file = os.path.join(self._data_dir, "fraud_reports.json")
-        self._alerts_file = os.path.join(self._data_dir, "proactive_alerts.json")
+        self._fraud_log = EventLog(
+            os.path.join(self._data_dir, "fraud_reports.jsonl"),
+            legacy_json_path=os.path.join(self._data_dir, "fraud_reports.json"),
+        )
+        self._alerts_log = EventLog(
+            os.path.join(self._data_dir, "proactive_alerts.jsonl"),
+            legacy_json_path=os.path.join(self._data_dir, "proactive_alerts.json"),
+        )
 
     def get_life_workflow(self, event: str, user_id: str | None = None) -> Dict[str, Any]:
         key = (event or "").strip().lower().replace(" ", "_")
@@ -165,97 +248,15 @@ class CivicInfraService:
         state       = (profile.get("state") or "").lower()
         occupation  = (profile.get("occupation") or "").lower()
         income      = int(profile.get("income") or 0)
-        land_acres  = float(profile.get("land_acres") or 0)
         language    = profile.get("preferred_language", "hi")
 
         # ── Rule-based eligibility engine (offline, no LLM) ──────────────────
-        _SCHEME_RULES = [
-            {
-                "id": "pm_kisan",
-                "title": "PM-KISAN Samman Nidhi",
-                "benefit": "₹6,000/year (₹2,000 × 3 installments)",
-                "action": "apply pm kisan",
-                "link": "https://pmkisan.gov.in",
-                "priority": "high",
-                "match": lambda o, i, l, s: "farmer" in o or "agri" in o or "kisan" in o or l > 0,
-                "sms_hi": "JanSathi Alert: आप PM-KISAN के लिए पात्र हैं। ₹6,000/वर्ष मिल सकते हैं। कहें: 'pm kisan apply'",
-                "sms_en": "JanSathi Alert: You qualify for PM-KISAN ₹6,000/yr. Say: apply pm kisan",
-            },
-            {
-                "id": "solar_pump",
-                "title": "Solar Pump Subsidy (PM-KUSUM)",
-                "benefit": "90% subsidy on solar irrigation pump",
-                "action": "apply solar pump",
-                "link": "https://pmkusum.mnre.gov.in",
-                "priority": "high",
-                "match": lambda o, i, l, s: ("farmer" in o or "agri" in o) and l > 0,
-                "sms_hi": "JanSathi Alert: Solar Pump पर 90% सब्सिडी मिल सकती है। कहें: 'solar pump apply'",
-                "sms_en": "JanSathi Alert: 90% solar pump subsidy available. Say: apply solar pump",
-            },
-            {
-                "id": "e_shram",
-                "title": "e-Shram Card (₹2L Insurance Free)",
-                "benefit": "₹2 lakh accident insurance, scheme priority access",
-                "action": "register eshram",
-                "link": "https://eshram.gov.in",
-                "priority": "medium",
-                "match": lambda o, i, l, s: i < 500000 and ("labour" in o or "worker" in o or "daily" in o or "farmer" in o or "mason" in o),
-                "sms_hi": "JanSathi Alert: e-Shram कार्ड बनवाएं — ₹2 लाख बीमा मुफ्त। कहें: 'eshram register'",
-                "sms_en": "JanSathi Alert: Get e-Shram card — ₹2L insurance free. Say: register eshram",
-            },
-            {
-                "id": "ayushman",
-                "title": "Ayushman Bharat PM-JAY",
-                "benefit": "₹5 lakh/year free hospital treatment",
-                "action": "apply ayushman",
-                "link": "https://pmjay.gov.in",
-                "priority": "high",
-                "match": lambda o, i, l, s: i < 300000,
-                "sms_hi": "JanSathi Alert: Ayushman Bharat — ₹5 लाख मुफ्त इलाज। कहें: 'ayushman apply'",
-                "sms_en": "JanSathi Alert: Ayushman Bharat ₹5L free treatment. Say: apply ayushman",
-            },
-            {
-                "id": "pmay_gramin",
-                "title": "PM Awas Yojana – Gramin",
-                "benefit": "₹1.2 lakh house construction grant",
-                "action": "apply pmay gramin",
-                "link": "https://pmayg.nic.in",
-                "priority": "medium",
-                "match": lambda o, i, l, s: i < 200000 and ("rural" in s or "village" in s or "gramin" in s or s in ["", "uttar pradesh", "bihar", "madhya pradesh", "rajasthan", "odisha"]),
-                "sms_hi": "JanSathi Alert: PM Awas Yojana — ₹1.2 लाख घर बनाने के लिए। कहें: 'pmay apply'",
-                "sms_en": "JanSathi Alert: PM Awas Yojana ₹1.2L house grant. Say: apply pmay gramin",
-            },
-            {
-                "id": "tn_farmer",
-                "title": "Tamil Nadu CM Farmer Support Scheme",
-                "benefit": "Additional ₹2,000/yr state top-up for small farmers",
-                "action": "apply tn farmer scheme",
-                "link": "https://www.tn.gov.in/scheme",
-                "priority": "medium",
-                "match": lambda o, i, l, s: ("farm" in o or "kisan" in o) and ("tamil" in s or "tn" in s or "puducherry" in s),
-                "sms_hi": "JanSathi: तमिलनाडु किसान सहायता — ₹2,000 अतिरिक्त। कहें: 'tn farmer apply'",
-                "sms_en": "JanSathi: Tamil Nadu farmer extra ₹2,000/yr. Say: apply tn farmer scheme",
-            },
+        row = self.proactive_matrix([profile])[0]
+        matched: List[Dict[str, Any]] = [
+            self._alert_card(rule, language) for rule, hit in zip(_PROACTIVE_SCHEMES, row) if hit
         ]
 
-        matched: List[Dict[str, Any]] = []
-        for rule in _SCHEME_RULES:
-            try:
-                if rule["match"](occupation, income, land_acres, state):
-                    sms_msg = rule["sms_hi"] if language in ("hi", "mr", "gu") else rule["sms_en"]
-                    matched.append({
-                        "id":      rule["id"],
-                        "title":   rule["title"],
-                        "benefit": rule["benefit"],
-                        "sms_alert": sms_msg,
-                        "action":  rule["action"],
-                        "link":    rule["link"],
-                        "priority": rule["priority"],
-                    })
-            except Exception:
-                pass
-
-        self._append_json(self._alerts_file, {
+        self._alerts_log.append({
             "ts": datetime.now(timezone.utc).isoformat(),
             "user_id": user_id or "anonymous",
             "count": len(matched),
@@ -271,6 +272,57 @@ class CivicInfraService:
             "last_refresh": datetime.now(timezone.utc).isoformat(),
         }
 
+    @staticmethod
+    def proactive_matrix(profiles: List[Dict[str, Any]]) -> np.ndarray:
+        """(N profiles × M proactive schemes) boolean matrix, one vectorised rule per column."""
+        columns = ProfileColumns(profiles)
+        matrix = np.zeros((columns.n, len(_PROACTIVE_SCHEMES)), dtype=bool)
+        for j, rule in enumerate(_PROACTIVE_SCHEMES):
+            matrix[:, j] = rule["match"](columns)
+        return matrix
+
+    @staticmethod
+    def _alert_card(rule: Dict[str, Any], language: str | None) -> Dict[str, Any]:
+        return {
+            "id":      rule["id"],
+            "title":   rule["title"],
+            "benefit": rule["benefit"],
+            "sms_alert": rule["sms_hi"] if language in ("hi", "mr", "gu") else rule["sms_en"],
+            "action":  rule["action"],
+            "link":    rule["link"],
+            "priority": rule["priority"],
+        }
+
+    def outreach_alerts(self, batch_size: int = 5000) -> Iterator[Dict[str, Any]]:
+        """
+        Nightly outreach: proactive alerts for every stored profile.
+        Profiles are streamed in batches and each batch is matched in one
+        matrix pass; yields one entry per user with at least one match.
+        """
+        query = db.session.query(UserProfile).order_by(UserProfile.id).yield_per(batch_size)
+        batch: List[Dict[str, Any]] = []
+        for profile in query:
+            batch.append(profile_record(profile))
+            if len(batch) >= batch_size:
+                yield from self._outreach_batch(batch)
+                batch = []
+        if batch:
+            yield from self._outreach_batch(batch)
+
+    def _outreach_batch(self, records: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        matrix = self.proactive_matrix(records)
+        for record, row in zip(records, matrix):
+            hits = np.flatnonzero(row)
+            if not len(hits):
+                continue
+            language = record.get("preferred_language") or "hi"
+            yield {
+                "user_id": record["user_id"],
+                "phone": record.get("phone"),
+                "language": language,
+                "alerts": [self._alert_card(_PROACTIVE_SCHEMES[j], language) for j in hits],
+            }
+
     def get_community_insights(self, location: str = "India") -> Dict[str, Any]:
         """
         Village / District Civic Intelligence.
@@ -468,7 +520,7 @@ class CivicInfraService:
             "amount": payload.get("amount", 0),
             "contact": payload.get("contact", ""),
         }
-        self._append_json(self._fraud_file, report)
+        self._fraud_log.append(report)
         return report
 
     def _dynamo_item_count(self, table_name: str) -> int:
@@ -484,7 +536,7 @@ class CivicInfraService:
 
     def get_impact_metrics(self) -> Dict[str, Any]:
         use_dynamo = os.getenv("USE_DYNAMODB", "false").lower() == "true"
-        fraud_reports = len(self._read_json(self._fraud_file))
+        fraud_reports = self._fraud_log.count()
 
         if use_dynamo:
             # Use DynamoDB table item counts (describe_table is free and non-blocking)
@@ -527,22 +579,6 @@ class CivicInfraService:
             "preferred_language": profile.preferred_language,
         }
 
-    def _read_json(self, path: str) -> List[Dict[str, Any]]:
-        try:
-            if not os.path.exists(path):
-                return []
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data if isinstance(data, list) else []
-        except Exception:
-            return []
-
-    def _append_json(self, path: str, item: Dict[str, Any]) -> None:
-        data = self._read_json(path)
-        data.append(item)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data[-500:], f, ensure_ascii=False, indent=2)
-
     def _advance_case_progress(self, case: LifeEventCase) -> None:
         now = datetime.now(timezone.utc)
         created = case.created_at.replace(tzinfo=timezone.utc) if case.created_at and case.created_at.tzinfo is None else case.created_at
@@ -0,0 +1,215 @@
+"""
+eligibility_matrix.py — Vectorised N profiles × M schemes eligibility.
+
+Profiles are loaded once into columns (ProfileColumns): each field becomes a
+float64 array (NaN where the value has no leading number) plus, on demand, a
+lower-cased text array. Every compiled rule is then one NumPy comparison over
+all N profiles, so the cost grows with the number of rules, not N × M Python
+calls to RulesEngine.evaluate.
+
+  eligibility_matrix(profiles, rule_sets)  → EligibilityMatrix(eligible, score, complete)
+
+Values that are not numeric for a numeric rule (None, "yes", lists) fall back
+to the scalar operator, memoised per distinct value, which keeps the verdicts
+identical to CompiledRules.check.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.services.rules_engine import CompiledRules, compile_rules, to_number
+
+# numpy equivalents of RulesEngine operators for numeric targets
+# ("in" with a scalar target is equality; "contains" never matches a number)
+_NUMERIC_UFUNCS = {
+    "eq": np.equal,
+    "ne": np.not_equal,
+    "lt": np.less,
+    "lte": np.less_equal,
+    "gt": np.greater,
+    "gte": np.greater_equal,
+    "in": np.equal,
+}
+
+_ACRES_TO_HECTARES = 0.404686
+
+
+def profile_record(profile: Any) -> Dict[str, Any]:
+    """
+    Map a UserProfile row (or profile dict) onto the field names used by
+    scheme rules in schemes_config.yaml, the agents' SCHEME_RULES / slots
+    and the proactive-alert rules.
+    """
+    get = profile.get if isinstance(profile, dict) else lambda k, d=None: getattr(profile, k, d)
+    income = get("annual_income", get("income"))
+    acres = get("land_holding_acres", get("land_area_acres", get("land_acres")))
+    return {
+        "user_id": get("id", get("user_id")),
+        "state": get("location_state", get("state")),
+        "occupation": get("occupation"),
+        "age": get("age"),
+        "income": income,
+        "annual_income": income,
+        "income_annual": income,
+        "family_income": income,
+        "land_acres": acres,
+        "land_area_acres": acres,
+        "land_hectares": round(acres * _ACRES_TO_HECTARES, 4) if isinstance(acres, (int, float)) else None,
+        "bank_account_linked": get("has_bank_account", get("bank_account_linked")),
+        "preferred_language": get("preferred_language"),
+        "phone": get("phone_e164"),
+    }
+
+
+class ProfileColumns:
+    """Columnar view of a list of profile dicts; each column is built once."""
+
+    def __init__(self, profiles: List[Dict[str, Any]]):
+        self.profiles = profiles
+        self.n = len(profiles)
+        self._raw: Dict[str, np.ndarray] = {}
+        self._num: Dict[str, np.ndarray] = {}
+        self._text: Dict[str, np.ndarray] = {}
+
+    def raw(self, field: str) -> np.ndarray:
+        col = self._raw.get(field)
+        if col is None:
+            col = np.empty(self.n, dtype=object)
+            col[:] = [p.get(field) for p in self.profiles]
+            self._raw[field] = col
+        return col
+
+    def numbers(self, field: str) -> np.ndarray:
+        """Leading number of each value (to_number), NaN where there is none."""
+        col = self._num.get(field)
+        if col is None:
+            raw = self.raw(field)
+            if all(v is None or (type(v) in (int, float)) for v in raw):
+                col = raw.astype(float)                      # fast path: None → NaN
+            else:
+                col = np.fromiter(
+                    (np.nan if (x := to_number(v)) is None else x for v in raw), dtype=float, count=self.n)
+            self._num[field] = col
+        return col
+
+    def num(self, field: str, default: float = 0.0) -> np.ndarray:
+        col = self.numbers(field)
+        return np.where(np.isnan(col), default, col)
+
+    def text(self, field: str) -> np.ndarray:
+        col = self._text.get(field)
+        if col is None:
+            col = np.array([str(v or "").lower() for v in self.raw(field)], dtype=str)
+            self._text[field] = col
+        return col
+
+    def has(self, field: str, *needles: str) -> np.ndarray:
+        """Substring match of any needle in the lower-cased text column."""
+        text = self.text(field)
+        out = np.zeros(self.n, dtype=bool)
+        for needle in needles:
+            out |= np.char.find(text, needle) >= 0
+        return out
+
+    def isin(self, field: str, values: Iterable[str]) -> np.ndarray:
+        return np.isin(self.text(field), list(values))
+
+    def present(self, field: str) -> np.ndarray:
+        return np.fromiter((v is not None for v in self.raw(field)), dtype=bool, count=self.n)
+
+
+def _scalar(op_func, values: np.ndarray, target) -> tuple:
+    """(match, error) for values through the scalar operator, memoised per distinct value."""
+    match = np.zeros(len(values), dtype=bool)
+    error = np.zeros(len(values), dtype=bool)
+    memo: dict = {}
+    for i, v in enumerate(values):
+        try:
+            key = (type(v), v)
+            hit = memo.get(key)
+        except TypeError:                      # unhashable value
+            key, hit = None, None
+        if hit is None:
+            try:
+                hit = (bool(op_func(v, target)), False)
+            except Exception:
+                hit = (False, True)
+            if key is not None:
+                memo[key] = hit
+        match[i], error[i] = hit
+    return match, error
+
+
+def _apply(columns: ProfileColumns, spec: tuple) -> tuple:
+    field, op_name, op_func, target, numeric_target, _, _ = spec
+    raw = columns.raw(field)
+    if numeric_target is None:
+        return _scalar(op_func, raw, target)
+    numbers = columns.numbers(field)
+    numeric = ~np.isnan(numbers)
+    match = np.zeros(columns.n, dtype=bool)
+    error = np.zeros(columns.n, dtype=bool)
+    ufunc = _NUMERIC_UFUNCS.get(op_name)
+    if ufunc is not None:
+        match[numeric] = ufunc(numbers[numeric], numeric_target)
+    rest = ~numeric
+    if rest.any():
+        match[rest], error[rest] = _scalar(op_func, raw[rest], target)
+    return match, error
+
+
+class EligibilityMatrix:
+    """eligible / score / complete are (N, M) arrays; rows follow the profiles, columns `scheme_ids`."""
+
+    def __init__(self, scheme_ids: List[str], eligible: np.ndarray, score: np.ndarray, complete: np.ndarray):
+        self.scheme_ids = scheme_ids
+        self.eligible = eligible
+        self.score = score
+        self.complete = complete      # every field the scheme's rules read is present
+
+    def eligible_schemes(self, row: int) -> List[str]:
+        return [self.scheme_ids[j] for j in np.flatnonzero(self.eligible[row])]
+
+    def cell(self, row: int, scheme_id: str) -> dict:
+        j = self.scheme_ids.index(scheme_id)
+        return {"eligible": bool(self.eligible[row, j]), "score": float(self.score[row, j]),
+                "complete": bool(self.complete[row, j])}
+
+
+def eligibility_matrix(profiles, rule_sets: Dict[str, Any]) -> EligibilityMatrix:
+    """
+    Evaluate M rule sets (rules dicts or CompiledRules) against N profiles.
+    Matches CompiledRules.check cell for cell.
+    """
+    columns = profiles if isinstance(profiles, ProfileColumns) else ProfileColumns(list(profiles))
+    scheme_ids = list(rule_sets)
+    n, m = columns.n, len(scheme_ids)
+    eligible = np.ones((n, m), dtype=bool)
+    score = np.ones((n, m), dtype=float)
+    complete = np.ones((n, m), dtype=bool)
+    for j, sid in enumerate(scheme_ids):
+        compiled = rule_sets[sid]
+        if not isinstance(compiled, CompiledRules):
+            compiled = compile_rules(compiled)
+        if not compiled.has_rules:
+            continue
+        matched = np.zeros(n, dtype=np.int32)
+        for spec in compiled.specs:
+            if spec[2] is None:
+                continue               # unknown operator: counted in total, never matched
+            match, error = _apply(columns, spec)
+            matched += match
+            eligible[:, j] &= match & ~error
+            complete[:, j] &= columns.present(spec[0])
+        if compiled.total:
+            score[:, j] = matched / compiled.total
+    return EligibilityMatrix(scheme_ids, eligible, score, complete)
+
+
+def catalog_eligibility(profiles, scheme_ids: Optional[List[str]] = None) -> EligibilityMatrix:
+    """Matrix over the scheme catalog's compiled rules (all schemes by default)."""
+    from app.services.scheme_catalog import get_scheme_catalog
+    catalog = get_scheme_catalog()
+    ids = scheme_ids if scheme_ids is not None else list(catalog.schemes())
+    return eligibility_matrix(profiles, {sid: catalog.compiled_rules(sid) for sid in ids})
@@ -0,0 +1,209 @@
+"""
+event_log.py — Append-only JSONL logs for low-value, high-volume records.
+
+Used for proactive-alert impressions and fraud reports, which used to be
+kept as a JSON array that was read, appended to and rewritten in full on
+every request. Here:
+
+  - `append()` only enqueues the record and bumps an in-memory counter; a
+    background thread flushes the queue every EVENT_LOG_FLUSH_SECONDS
+    (one open + write per batch, never a rewrite)
+  - the active file `<name>.jsonl` rotates to `<name>.jsonl.1 … .N` once it
+    exceeds EVENT_LOG_MAX_BYTES; the oldest segment is dropped
+  - `<name>.jsonl.idx` holds the running record count, so `count()` is O(1)
+    instead of parsing the log
+  - a legacy JSON array file is imported once when no log exists yet
+
+Flushes hold an fcntl lock (where available) so gunicorn workers sharing the
+data dir neither interleave rotations nor lose counter increments.
+"""
+
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows dev boxes — single process, no lock needed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES = int(os.getenv("EVENT_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+BACKUPS = int(os.getenv("EVENT_LOG_BACKUPS", "5"))
+FLUSH_SECONDS = float(os.getenv("EVENT_LOG_FLUSH_SECONDS", "1.0"))
+
+
+class EventLog:
+    def __init__(self, path: str, legacy_json_path: Optional[str] = None,
+                 max_bytes: int = MAX_BYTES, backups: int = BACKUPS,
+                 flush_seconds: float = FLUSH_SECONDS):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_seconds = flush_seconds
+        self._pending: deque = deque()
+        self._lock = threading.Lock()           # guards _pending / _flushed_count
+        self._flush_lock = threading.Lock()     # one flush at a time per process
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if legacy_json_path:
+            self._import_legacy(legacy_json_path)
+        self._flushed_count = self._read_index()
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def append(self, item: Dict) -> None:
+        """Queue one record; it reaches disk on the next background flush."""
+        with self._lock:
+            self._pending.append(item)
+        self._ensure_flusher()
+
+    def count(self) -> int:
+        """Records ever appended (including rotated-out segments and unflushed ones)."""
+        with self._lock:
+            return self._flushed_count + len(self._pending)
+
+    def tail(self, n: int = 50) -> List[Dict]:
+        """Last `n` records of the active segment plus anything still queued."""
+        with self._lock:
+            pending = list(self._pending)
+        lines: deque = deque(maxlen=n)
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines.extend(f)
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return (records + pending)[-n:]
+
+    def flush(self) -> int:
+        """Write queued records now. Returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending)
+            if not batch:
+                return 0
+            data = "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in batch)
+            with self._file_lock():
+                total = self._read_index() + len(batch)
+                self._rotate_if_needed()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(data)
+                self._write_index(total)
+            with self._lock:
+                for _ in batch:
+                    self._pending.popleft()
+                self._flushed_count = total
+            return len(batch)
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _ensure_flusher(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name=f"event-log-{os.path.basename(self.path)}", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.flush()
+            except Exception as e:
+                # Records stay queued and are retried on the next tick
+                logger.warning(f"[EventLog] flush of {self.path} failed: {e}")
+
+    def _file_lock(self):
+        return FileLock(self.path + ".lock")
+
+    def _rotate_if_needed(self):
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except OSError:
+            return
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def _read_index(self) -> int:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return int(json.load(f).get("count", 0))
+        except (OSError, ValueError):
+            return self._recount()
+
+    def _write_index(self, count: int):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"count": count}, f)
+        os.replace(tmp, self.index_path)
+
+    def _recount(self) -> int:
+        """Rebuild a missing index from the segments still on disk."""
+        total = 0
+        for p in [self.path] + [f"{self.path}.{i}" for i in range(1, self.backups + 1)]:
+            if os.path.exists(p):
+                with open(p, "rb") as f:
+                    total += sum(1 for _ in f)
+        return total
+
+    def _import_legacy(self, legacy_path: str):
+        if os.path.exists(self.path) or not os.path.exists(legacy_path):
+            return
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[EventLog] could not import {legacy_path}: {e}")
+            return
+        if not isinstance(records, list):
+            return
+        with self._file_lock():
+            if os.path.exists(self.path):
+                return
+            with open(self.path, "w", encoding="utf-8") as f:
+                for r in records:
+                    f.write(json.dumps(r, ensure_ascii=False, default=str) + "\n")
+            self._write_index(len(records))
+        logger.info(f"[EventLog] Imported {len(records)} records from {legacy_path}")
+
+
+class FileLock:
+    """Exclusive advisory lock on a sidecar file (no-op without fcntl)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._fh = open(self.path, "a")
+            fcntl.flock(self._fh, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._fh is not None:
+            fcntl.flock(self._fh, fcntl.LOCK_UN)
+            self._fh.close()
+            self._fh = None
+        return False
@@ -2,42 +2,51 @@
 hitl_service.py – Human-in-the-Loop ticket management.
 
 Write path:  DynamoDB → SQS FIFO → EventBridge
-Read path:   DynamoDB (or local JSON in dev)
+Read path:   DynamoDB StatusIndex GSI (or local SQLite in dev)
+
+The admin review queue is read with keyset pagination on (status,
+created_at): `list_cases` returns a page plus an opaque `next_cursor`, so
+loading the queue costs the same however many resolved cases pile up.
 """
 
 import os
 import json
 import uuid
+import base64
+import sqlite3
 import logging
+import threading
 from datetime import datetime, timezone
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
-HITL_LOCAL_FILE = os.path.join(
+_AGENTIC_DIR = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-    "agentic_engine", "hitl_cases.json"
+    "agentic_engine",
 )
+HITL_LOCAL_FILE = os.path.join(_AGENTIC_DIR, "hitl_cases.json")     # legacy, imported once
+HITL_DB_PATH = os.getenv("HITL_DB_PATH", os.path.join(_AGENTIC_DIR, "hitl_cases.db"))
 HITL_TABLE = os.getenv("HITL_TABLE", "JanSathi-HITL-Cases")
+HITL_STATUS_INDEX = os.getenv("HITL_STATUS_INDEX", "StatusIndex")
 AWS_REGION  = os.getenv("AWS_REGION", "us-east-1")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
 
 
-# ── Storage helpers ────────────────────────────────────────────────────────────
-
-def _load_local() -> dict:
-    if not os.path.exists(HITL_LOCAL_FILE):
-        return {}
-    with open(HITL_LOCAL_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
-
+def _use_dynamo() -> bool:
+    """HITL_STORE=dynamodb|local; otherwise DynamoDB wherever the table is configured."""
+    store = os.getenv("HITL_STORE", "").lower()
+    if store:
+        return store == "dynamodb"
+    return os.getenv("USE_DYNAMODB", "false").lower() == "true" or "HITL_TABLE" in os.environ
 
-def _save_local(data: dict) -> None:
-    os.makedirs(os.path.dirname(HITL_LOCAL_FILE), exist_ok=True)
-    with open(HITL_LOCAL_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, default=str)
 
+# ── Storage helpers ────────────────────────────────────────────────────────────
 
 def _get_dynamo_table():
+    if not _use_dynamo():
+        return None
     try:
         import boto3
         ddb = boto3.resource("dynamodb", region_name=AWS_REGION)
@@ -47,13 +56,161 @@ def _get_dynamo_table():
         return None
 
 
+def _encode_cursor(key: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode()
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[dict]:
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, dict):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+class LocalCaseStore:
+    """
+    SQLite (WAL) HITL store for dev / single-node deployments.
+
+    One row per case; the (status, created_at, case_id) index serves the
+    review queue in created order, and the case document itself is kept as
+    JSON in `payload`.
+    """
+    BUSY_TIMEOUT_MS = int(os.getenv("HITL_DB_BUSY_TIMEOUT_MS", "5000"))
+
+    def __init__(self, db_path: str = None, legacy_json_path: str = None):
+        self.db_path = db_path or HITL_DB_PATH
+        self.legacy_json_path = legacy_json_path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=self.BUSY_TIMEOUT_MS / 1000.0,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self._initialize(conn)
+                    self._initialized = True
+        return conn
+
+    def _initialize(self, conn: sqlite3.Connection):
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS hitl_cases ("
+            " case_id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " created_at TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL,"
+            " session_id TEXT,"
+            " payload TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_hitl_status_created"
+                     " ON hitl_cases(status, created_at, case_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_hitl_session ON hitl_cases(session_id)")
+        if self.legacy_json_path and os.path.exists(self.legacy_json_path):
+            if conn.execute("SELECT 1 FROM hitl_cases LIMIT 1").fetchone() is None:
+                with open(self.legacy_json_path, "r", encoding="utf-8") as f:
+                    legacy = json.load(f)
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for case in legacy.values():
+                        self._upsert(conn, case)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                logger.info(f"[HITLService] Imported {len(legacy)} cases from {self.legacy_json_path}")
+
+    @staticmethod
+    def _upsert(conn: sqlite3.Connection, case: dict):
+        conn.execute(
+            "INSERT INTO hitl_cases (case_id, status, created_at, updated_at, session_id, payload)"
+            " VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(case_id) DO UPDATE SET status = excluded.status,"
+            " updated_at = excluded.updated_at, payload = excluded.payload",
+            (case["case_id"], case.get("status", "pending_review"), case.get("created_at", ""),
+             case.get("updated_at") or case.get("created_at", ""), case.get("session_id", ""),
+             json.dumps(case, default=str, ensure_ascii=False)),
+        )
+
+    def put(self, case: dict):
+        self._upsert(self._conn(), case)
+
+    def get(self, case_id: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT payload FROM hitl_cases WHERE case_id = ?", (case_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def page(self, status: str, limit: int, after: Optional[tuple] = None) -> tuple:
+        """Up to `limit` cases with `status`, oldest first, after the (created_at, case_id) key."""
+        sql = "SELECT payload, created_at, case_id FROM hitl_cases WHERE status = ?"
+        args: list = [status]
+        if after:
+            sql += " AND (created_at, case_id) > (?, ?)"
+            args += list(after)
+        sql += " ORDER BY created_at, case_id LIMIT ?"
+        rows = self._conn().execute(sql, args + [limit + 1]).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        last = (rows[-1][1], rows[-1][2]) if more and rows else None
+        return [json.loads(r[0]) for r in rows], last
+
+    def count(self, status: str) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM hitl_cases WHERE status = ?", (status,)).fetchone()[0]
+
+    def update_status(self, case_id: str, status: str, updated_at: str, reason: str) -> bool:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            case = self.get(case_id)
+            if case is None:
+                conn.execute("ROLLBACK")
+                return False
+            case.update(status=status, updated_at=updated_at, resolution_reason=reason)
+            self._upsert(conn, case)
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete_resolved(self, before_iso: str, limit: int) -> int:
+        cur = self._conn().execute(
+            "DELETE FROM hitl_cases WHERE case_id IN ("
+            " SELECT case_id FROM hitl_cases"
+            " WHERE status IN ('approved', 'rejected') AND updated_at < ? LIMIT ?)",
+            (before_iso, limit),
+        )
+        return cur.rowcount
+
+
+_local_store: Optional[LocalCaseStore] = None
+
+
+def _get_local_store() -> LocalCaseStore:
+    global _local_store
+    if _local_store is None:
+        _local_store = LocalCaseStore(HITL_DB_PATH, legacy_json_path=HITL_LOCAL_FILE)
+    return _local_store
+
+
 # ── Public service class ───────────────────────────────────────────────────────
 
 class HITLService:
     """
     Manages the Human-in-the-Loop review queue.
     Write path: DynamoDB → SQS FIFO → EventBridge (fire-and-forget, non-blocking).
-    Read path:  DynamoDB (dev: local JSON fallback).
+    Read path:  DynamoDB StatusIndex GSI (dev: local SQLite fallback).
     """
 
     def enqueue_case(
@@ -98,9 +255,7 @@ class HITLService:
         if table:
             table.put_item(Item=case)
         else:
-            store = _load_local()
-            store[case_id] = case
-            _save_local(store)
+            _get_local_store().put(case)
 
         # 2 — SQS FIFO (async HITL worker pickup)
         try:
@@ -133,19 +288,62 @@ class HITLService:
         return case
 
     def get_cases(self, status: str = "pending_review") -> list:
-        """Return all HITL cases with the given status."""
+        """Return all HITL cases with the given status (oldest first)."""
+        cases, cursor = [], None
+        while True:
+            page = self.list_cases(status, limit=MAX_PAGE_SIZE, cursor=cursor)
+            cases.extend(page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                return cases
+
+    def list_cases(self, status: str = "pending_review", limit: int = DEFAULT_PAGE_SIZE,
+                   cursor: Optional[str] = None) -> dict:
+        """
+        One page of the review queue: {"items": [...], "next_cursor": str | None}.
+        Raises ValueError for a malformed cursor.
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        start = _decode_cursor(cursor)
         table = _get_dynamo_table()
         if table:
             try:
-                from boto3.dynamodb.conditions import Attr
-                response = table.scan(FilterExpression=Attr("status").eq(status))
-                return response.get("Items", [])
+                from boto3.dynamodb.conditions import Key
+                kwargs = {
+                    "IndexName": HITL_STATUS_INDEX,
+                    "KeyConditionExpression": Key("status").eq(status),
+                    "Limit": limit,
+                }
+                if start:
+                    kwargs["ExclusiveStartKey"] = start
+                response = table.query(**kwargs)
+                last = response.get("LastEvaluatedKey")
+                return {"items": response.get("Items", []),
+                        "next_cursor": _encode_cursor(last) if last else None}
             except Exception as e:
-                logger.error(f"[HITLService] DynamoDB scan failed: {e}")
-                return []
-        else:
-            store = _load_local()
-            return [c for c in store.values() if c.get("status") == status]
+                logger.error(f"[HITLService] DynamoDB query failed: {e}")
+                return {"items": [], "next_cursor": None}
+
+        after = (start["created_at"], start["case_id"]) if start else None
+        items, last = _get_local_store().page(status, limit, after)
+        return {"items": items,
+                "next_cursor": _encode_cursor({"created_at": last[0], "case_id": last[1]}) if last else None}
+
+    def count_cases(self, status: str = "pending_review") -> int:
+        """Number of cases with `status` (index-only on both stores)."""
+        table = _get_dynamo_table()
+        if table:
+            from boto3.dynamodb.conditions import Key
+            kwargs = {"IndexName": HITL_STATUS_INDEX, "Select": "COUNT",
+                      "KeyConditionExpression": Key("status").eq(status)}
+            total = 0
+            while True:
+                response = table.query(**kwargs)
+                total += response.get("Count", 0)
+                if "LastEvaluatedKey" not in response:
+                    return total
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        return _get_local_store().count(status)
 
     def resolve_case(self, case_id: str, action: str, reason: Optional[str] = None) -> dict:
         """
@@ -176,13 +374,8 @@ class HITLService:
                 logger.error(f"[HITLService] DynamoDB update failed: {e}")
                 return {"error": str(e)}
         else:
-            store = _load_local()
-            if case_id not in store:
+            if not _get_local_store().update_status(case_id, new_status, now, reason or ""):
                 return {"error": "Case not found"}
-            store[case_id]["status"] = new_status
-            store[case_id]["updated_at"] = now
-            store[case_id]["resolution_reason"] = reason or ""
-            _save_local(store)
             return {"id": case_id, "status": new_status}
 
     def get_case(self, case_id: str) -> Optional[dict]:
@@ -190,15 +383,26 @@ class HITLService:
         table = _get_dynamo_table()
         if table:
             try:
-                # Scan by case_id (PK); we don't know created_at for get_item
-                from boto3.dynamodb.conditions import Attr
-                resp = table.scan(FilterExpression=Attr("case_id").eq(case_id))
+                # Query on the case_id partition; we don't know created_at for get_item
+                from boto3.dynamodb.conditions import Key
+                resp = table.query(KeyConditionExpression=Key("case_id").eq(case_id), Limit=1)
                 items = resp.get("Items", [])
                 return items[0] if items else None
             except Exception:
                 return None
         else:
-            return _load_local().get(case_id)
+            return _get_local_store().get(case_id)
+
+    def prune_resolved(self, older_than_s: float, limit: int = 500) -> int:
+        """
+        Drop approved/rejected cases last updated more than `older_than_s`
+        ago from the local store (pending cases are never pruned). DynamoDB
+        deployments should rely on a table TTL instead; returns 0 there.
+        """
+        if _get_dynamo_table():
+            return 0
+        cutoff = datetime.fromtimestamp(datetime.now(timezone.utc).timestamp() - older_than_s, timezone.utc)
+        return _get_local_store().delete_resolved(cutoff.isoformat(), limit)
 
     def _get_created_at(self, case_id: str) -> Optional[str]:
         """Retrieve created_at sort key for update_item."""
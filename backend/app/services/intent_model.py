@@ -0,0 +1,244 @@
+"""
+intent_model.py — Trainable local intent model (multinomial naive Bayes).
+
+Hashed word uni/bi-grams + char 2–4-grams → per-class log-likelihoods stored
+as plain NumPy arrays (.npz). Inference is a column gather + row sum, so a
+single utterance scores well under a millisecond and `classify_many` scores
+a whole batch with one vectorised reduction.
+
+Training labels are bootstrapped from:
+  - rule keyword lists (seed, so a fresh checkout works offline)
+  - audit `turn` records   (agentic_engine/audit_log.jsonl)
+  - BedrockIntentClassifier outputs for unlabelled utterances (optional)
+
+CLI:
+    python -m app.services.intent_model --out app/data/intent_model.npz [--bedrock]
+"""
+
+import os
+import re
+import sys
+import json
+import zlib
+import logging
+import argparse
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 1 << 15
+MODEL_PATH = os.getenv(
+    "INTENT_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "intent_model.npz"),
+)
+
+# Supervisor-normalised audit intents → classifier labels
+AUDIT_INTENT_MAP = {
+    "APPLY_SCHEME": "apply",
+    "INFORMATION": "info",
+    "CHECK_STATUS": "track",
+    "GRIEVANCE": "grievance",
+    "LIFE_EVENT": "life_event",
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _features(text: str) -> np.ndarray:
+    """Hashed feature indices for one utterance (duplicates = counts)."""
+    words = _TOKEN_RE.findall(text.lower())
+    grams = [f"w:{w}" for w in words]
+    grams += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f" {w} "
+        for n in (2, 3, 4):
+            grams += [f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1)]
+    return np.fromiter(
+        (zlib.crc32(g.encode("utf-8")) & (N_FEATURES - 1) for g in grams),
+        dtype=np.int64, count=len(grams),
+    )
+
+
+class NaiveBayesIntentModel:
+    """
+    Multinomial NB over hashed n-grams. Immutable once fitted/loaded.
+
+    Raw NB posteriors saturate at ~1.0, which makes them useless as a
+    two-stage threshold. Scores use the per-feature mean log-likelihood
+    times `scale` (a temperature) so confidence tracks evidence quality.
+    """
+
+    def __init__(self, labels: np.ndarray, log_prior: np.ndarray, log_likelihood: np.ndarray,
+                 scale: float = 4.0):
+        self.labels = labels
+        self.scale = float(scale)
+        self.log_prior = log_prior.astype(np.float32)
+        # Column-major so gathering feature columns is contiguous
+        self.log_likelihood = np.asfortranarray(log_likelihood.astype(np.float32))
+
+    # ── Training ──────────────────────────────────────────────────────────────
+
+    @classmethod
+    def fit(cls, texts: List[str], labels: List[str], alpha: float = 0.5,
+            fit_prior: bool = False, scale: float = 4.0) -> "NaiveBayesIntentModel":
+        classes = np.array(sorted(set(labels)))
+        index = {c: i for i, c in enumerate(classes)}
+        counts = np.zeros((len(classes), N_FEATURES), dtype=np.float64)
+        doc_counts = np.zeros(len(classes), dtype=np.float64)
+        for text, label in zip(texts, labels):
+            row = index[label]
+            np.add.at(counts[row], _features(text), 1.0)
+            doc_counts[row] += 1
+        smoothed = counts + alpha
+        log_likelihood = np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+        # Seed keyword lists are heavily skewed towards "apply"; uniform prior by default
+        if fit_prior:
+            log_prior = np.log(doc_counts / doc_counts.sum())
+        else:
+            log_prior = np.full(len(classes), -np.log(len(classes)))
+        return cls(classes, log_prior, log_likelihood, scale)
+
+    # ── Persistence ───────────────────────────────────────────────────────────
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path,
+            labels=self.labels,
+            log_prior=self.log_prior,
+            log_likelihood=np.ascontiguousarray(self.log_likelihood),
+            n_features=np.array([N_FEATURES]),
+            scale=np.array([self.scale]),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "NaiveBayesIntentModel":
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["n_features"][0]) != N_FEATURES:
+                raise ValueError(f"Feature space mismatch in {path}")
+            return cls(data["labels"], data["log_prior"], data["log_likelihood"], float(data["scale"][0]))
+
+    # ── Inference ─────────────────────────────────────────────────────────────
+
+    def _posteriors(self, scores: np.ndarray) -> np.ndarray:
+        scores = scores - scores.max(axis=-1, keepdims=True)
+        probs = np.exp(scores)
+        return probs / probs.sum(axis=-1, keepdims=True)
+
+    def predict_proba_many(self, texts: Iterable[str]) -> np.ndarray:
+        feats = [_features(t) for t in texts]
+        if not feats:
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+        lengths = np.array([len(f) for f in feats])
+        flat = np.concatenate(feats) if lengths.sum() else np.zeros(0, dtype=np.int64)
+        scores = np.tile(self.log_prior, (len(feats), 1))
+        if flat.size:
+            gathered = self.log_likelihood[:, flat]                    # (C, total_feats)
+            nonempty = lengths > 0
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+            sums = np.add.reduceat(gathered, offsets, axis=1).T
+            scores[nonempty] += self.scale * sums / lengths[nonempty, None]
+        return self._posteriors(scores)
+
+    def classify_many(self, texts: List[str]) -> List[Tuple[str, float]]:
+        probs = self.predict_proba_many(texts)
+        best = probs.argmax(axis=1)
+        return [(str(self.labels[i]), float(probs[row, i])) for row, i in enumerate(best)]
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        return self.classify_many([text])[0]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LABEL BOOTSTRAPPING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def seed_examples() -> List[Tuple[str, str]]:
+    """Keyword lists from the rule classifier as weak single-phrase labels."""
+    from app.services.intent_service import RuleBasedIntentClassifier as R
+    examples = [(k, "apply") for k in R.SCHEME_APPLY_KEYWORDS + R.APPLY_KEYWORDS]
+    examples += [(k, "info") for k in R.INFO_KEYWORDS]
+    examples += [(k, "grievance") for k in R.GRIEVANCE_KEYWORDS]
+    examples += [(k, "track") for k in R.TRACK_KEYWORDS]
+    for terms in R.LIFE_EVENT_KEYWORDS.values():
+        examples += [(k.strip(), "life_event") for k in terms]
+    return examples
+
+
+def audit_examples(path: Optional[str] = None, min_confidence: float = 0.75) -> List[Tuple[str, str]]:
+    """Confident `turn` records from the local audit log."""
+    from app.services.audit_service import AUDIT_LOCAL_FILE
+    path = path or AUDIT_LOCAL_FILE
+    examples = []
+    if not os.path.exists(path):
+        return examples
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if rec.get("record_type") != "turn":
+                continue
+            payload = rec.get("payload", {})
+            label = AUDIT_INTENT_MAP.get(str(payload.get("intent", "")).upper(), payload.get("intent"))
+            text = payload.get("transcript", "")
+            if text and label in AUDIT_INTENT_MAP.values() and float(payload.get("intent_confidence", 0)) >= min_confidence:
+                examples.append((text, label))
+    return examples
+
+
+def bedrock_examples(utterances: Iterable[str], min_confidence: float = 0.8) -> List[Tuple[str, str]]:
+    """Label raw utterances with Nova Micro (teacher) — used offline only."""
+    from app.services.intent_service import BedrockIntentClassifier
+    teacher = BedrockIntentClassifier()
+    examples = []
+    for text in utterances:
+        result = teacher.classify(text)
+        if result.get("intent") in AUDIT_INTENT_MAP.values() and float(result.get("confidence", 0)) >= min_confidence:
+            examples.append((text, result["intent"]))
+    return examples
+
+
+def train_default(use_bedrock: bool = False) -> NaiveBayesIntentModel:
+    examples = seed_examples() + audit_examples()
+    if use_bedrock:
+        examples += bedrock_examples(text for text, _ in audit_examples(min_confidence=0.0))
+    texts, labels = zip(*examples)
+    return NaiveBayesIntentModel.fit(list(texts), list(labels))
+
+
+# ── Shared model (loaded once per process) ────────────────────────────────────
+
+_model: Optional[NaiveBayesIntentModel] = None
+_model_lock = threading.Lock()
+
+
+def get_intent_model() -> NaiveBayesIntentModel:
+    """Load the serialized model, or train from bootstrap labels if absent."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                if os.path.exists(MODEL_PATH):
+                    _model = NaiveBayesIntentModel.load(MODEL_PATH)
+                    logger.info(f"[IntentModel] Loaded {MODEL_PATH} labels={list(_model.labels)}")
+                else:
+                    _model = train_default()
+                    logger.info("[IntentModel] No model file, trained from bootstrap labels")
+    return _model
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+    parser = argparse.ArgumentParser(description="Train the local intent model")
+    parser.add_argument("--out", default=MODEL_PATH)
+    parser.add_argument("--bedrock", action="store_true", help="relabel audit turns with Nova Micro")
+    args = parser.parse_args()
+
+    model = train_default(use_bedrock=args.bedrock)
+    model.save(args.out)
+    print(f"Saved {args.out} labels={list(model.labels)}")
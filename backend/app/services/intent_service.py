@@ -1,6 +1,9 @@
 import os
 import json
 import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -78,12 +81,52 @@ class RuleBasedIntentClassifier(BaseIntentClassifier):
         ],
     }
 
+    @staticmethod
+    def detect_scheme(msg: str) -> str:
+        if any(k in msg for k in ("kisan", "किसान", "samman nidhi", "pmkisan")):
+            return "pm_kisan"
+        if any(k in msg for k in ("awas", "आवास", "housing")):
+            return "pm_awas_urban"
+        if any(k in msg for k in ("shram", "श्रम", "labour")):
+            return "e_shram"
+        return "unknown"
+
     def _detect_life_event(self, msg: str) -> str:
         for event_key, terms in self.LIFE_EVENT_KEYWORDS.items():
             if any(term in msg for term in terms):
                 return event_key
         return "unknown"
 
+    # Calibration: base confidence is nudged up by corroborating keyword hits
+    # and pulled down for every rival intent that also matched.
+    HIT_BONUS = 0.02
+    MAX_BONUS = 0.06
+    RIVAL_PENALTY = 0.10
+    MIN_CONFIDENCE = 0.50
+
+    def _hits(self, msg: str) -> dict:
+        return {
+            "scheme_apply": sum(1 for k in self.SCHEME_APPLY_KEYWORDS if k in msg),
+            "grievance": sum(1 for k in self.GRIEVANCE_KEYWORDS if k in msg),
+            "track": sum(1 for k in self.TRACK_KEYWORDS if k in msg),
+            "apply": sum(1 for k in self.APPLY_KEYWORDS if k in msg),
+            "info": sum(1 for k in self.INFO_KEYWORDS if k in msg),
+        }
+
+    def _calibrate(self, base: float, intent: str, hits: dict) -> float:
+        """Turn fixed per-rule confidences into evidence-weighted ones."""
+        by_intent = {
+            "apply": hits["scheme_apply"] + hits["apply"],
+            "grievance": hits["grievance"],
+            "track": hits["track"],
+            "info": hits["info"],
+        }
+        support = by_intent.get(intent, 0)
+        rivals = sum(1 for k, v in by_intent.items() if k != intent and v)
+        bonus = min(self.MAX_BONUS, self.HIT_BONUS * max(0, support - 1))
+        conf = base + bonus - self.RIVAL_PENALTY * rivals
+        return round(max(self.MIN_CONFIDENCE, min(0.97, conf)), 2)
+
     def classify(self, query: str, language: str = "hi") -> dict:
         msg = query.lower()
         detected_event = self._detect_life_event(msg)
@@ -96,25 +139,29 @@ class RuleBasedIntentClassifier(BaseIntentClassifier):
                 "event_key": detected_event,
             }
 
+        hits = self._hits(msg)
+
+        def _result(intent: str, base: float, scheme_hint: str = "unknown") -> dict:
+            return {
+                "intent": intent,
+                "confidence": self._calibrate(base, intent, hits),
+                "language_detected": language,
+                "scheme_hint": scheme_hint,
+            }
+
         # Scheme-specific apply keywords take HIGHEST priority
-        if any(k in msg for k in self.SCHEME_APPLY_KEYWORDS):
-            # Detect which scheme
-            if any(k in msg for k in ("kisan", "किसान", "samman nidhi", "pmkisan")):
-                return {"intent": "apply", "confidence": 0.90, "language_detected": language, "scheme_hint": "pm_kisan"}
-            if any(k in msg for k in ("awas", "आवास", "housing")):
-                return {"intent": "apply", "confidence": 0.90, "language_detected": language, "scheme_hint": "pm_awas_urban"}
-            if any(k in msg for k in ("shram", "श्रम", "labour")):
-                return {"intent": "apply", "confidence": 0.90, "language_detected": language, "scheme_hint": "e_shram"}
-            return {"intent": "apply", "confidence": 0.85, "language_detected": language, "scheme_hint": "unknown"}
-
-        if any(k in msg for k in self.GRIEVANCE_KEYWORDS):
-            return {"intent": "grievance", "confidence": 0.85, "language_detected": language, "scheme_hint": "unknown"}
-        if any(k in msg for k in self.TRACK_KEYWORDS):
-            return {"intent": "track", "confidence": 0.82, "language_detected": language, "scheme_hint": "unknown"}
-        if any(k in msg for k in self.APPLY_KEYWORDS):
-            return {"intent": "apply", "confidence": 0.80, "language_detected": language, "scheme_hint": "unknown"}
-        if any(k in msg for k in self.INFO_KEYWORDS):
-            return {"intent": "info", "confidence": 0.78, "language_detected": language, "scheme_hint": "unknown"}
+        if hits["scheme_apply"]:
+            scheme_hint = self.detect_scheme(msg)
+            return _result("apply", 0.90 if scheme_hint != "unknown" else 0.85, scheme_hint)
+
+        if hits["grievance"]:
+            return _result("grievance", 0.85)
+        if hits["track"]:
+            return _result("track", 0.82)
+        if hits["apply"]:
+            return _result("apply", 0.80)
+        if hits["info"]:
+            return _result("info", 0.78)
 
         return {"intent": "info", "confidence": 0.60, "language_detected": language, "scheme_hint": "unknown"}
 
@@ -152,33 +199,50 @@ INTENT DEFINITIONS:
 USER UTTERANCE: {query}"""
 
     def __init__(self):
-        self._bedrock = None
+        self._region = os.getenv("AWS_REGION", "ap-south-1")
+        self._available = False
         self._fallback = RuleBasedIntentClassifier()
         self._init_bedrock()
 
     def _init_bedrock(self):
         try:
-            import boto3
-            region = os.getenv("AWS_REGION", "ap-south-1")
-            self._bedrock = boto3.client("bedrock-runtime", region_name=region)
+            from app.core.resilience import adaptive_client
+            adaptive_client("bedrock", "bedrock-runtime", self._region)
+            self._available = True
             logger.info("[BedrockIntentClassifier] Nova Micro client initialised")
         except Exception as e:
             logger.warning(f"[BedrockIntentClassifier] Bedrock unavailable, will use rule-based: {e}")
-            self._bedrock = None
+
+    @property
+    def _bedrock(self):
+        # Resolved per call so the client follows the breaker's adaptive timeout
+        if not self._available:
+            return None
+        from app.core.resilience import adaptive_client
+        return adaptive_client("bedrock", "bedrock-runtime", self._region)
+
+    def _rules_fallback(self, query: str, language: str) -> dict:
+        # Flagged so the two-stage classifier neither caches nor counts it as a Bedrock answer
+        return {**self._fallback.classify(query, language), "source": "rules_fallback"}
 
     def classify(self, query: str, language: str = "hi") -> dict:
         if not self._bedrock:
-            return self._fallback.classify(query, language)
+            return self._rules_fallback(query, language)
 
         prompt = self.CLASSIFY_PROMPT.format(query=query)
 
-        # Nova Micro via Converse API (NOT invoke_model)
+        # Nova Micro via Converse API (NOT invoke_model), behind the bedrock breaker
         try:
-            response = self._bedrock.converse(
+            from app.core.resilience import get_breaker
+            response = get_breaker("bedrock").call(
+                self._bedrock.converse,
                 modelId=self.NOVA_MICRO_MODEL,
                 messages=[{"role": "user", "content": [{"text": prompt}]}],
                 inferenceConfig={"maxTokens": 256, "temperature": 0.0},
             )
+            from app.services.token_usage_service import record_usage
+            record_usage(response.get("usage"), self.NOVA_MICRO_MODEL,
+                         prompt=prompt, label="intent:classify")
             text = response["output"]["message"]["content"][0]["text"].strip()
 
             # Strip markdown fences if present
@@ -201,20 +265,169 @@ USER UTTERANCE: {query}"""
             }
         except Exception as e:
             logger.warning(f"[BedrockIntentClassifier] Nova Micro call failed, falling back: {e}")
-            return self._fallback.classify(query, language)
+            return self._rules_fallback(query, language)
+
+
+class LocalModelIntentClassifier(BaseIntentClassifier):
+    """
+    Trained naive Bayes model (app/services/intent_model.py) for the intent;
+    scheme_hint / event_key still come from the rule keyword tables.
+    """
+
+    def __init__(self, model=None):
+        from app.services.intent_model import get_intent_model
+        self._model = model or get_intent_model()
+        self._rules = RuleBasedIntentClassifier()
+
+    def _shape(self, query: str, language: str, intent: str, confidence: float) -> dict:
+        msg = query.lower()
+        return {
+            "intent": intent,
+            "confidence": round(confidence, 4),
+            "language_detected": language,
+            "scheme_hint": self._rules.detect_scheme(msg),
+            "event_key": self._rules._detect_life_event(msg) if intent == "life_event" else "unknown",
+        }
+
+    def classify(self, query: str, language: str = "hi") -> dict:
+        intent, confidence = self._model.classify(query)
+        return self._shape(query, language, intent, confidence)
+
+    def classify_many(self, queries: list, language: str = "hi") -> list:
+        """Batch path — one vectorised scoring pass for all utterances."""
+        return [
+            self._shape(q, language, intent, conf)
+            for q, (intent, conf) in zip(queries, self._model.classify_many(queries))
+        ]
+
+
+class TwoStageIntentClassifier(BaseIntentClassifier):
+    """
+    Rules first, Nova Micro only for ambiguous utterances.
+
+    The calibrated rule confidence short-circuits at INTENT_RULE_THRESHOLD;
+    everything below goes to BedrockIntentClassifier. Results are memoised
+    in a bounded LRU keyed by normalised utterance + language, and the
+    rules/bedrock/bedrock_fallback/cache split is emitted as the
+    IntentClassified metric. Rule answers returned while Bedrock is down
+    (source "rules_fallback") are not cached, so they don't outlive the outage.
+    """
+
+    def __init__(self, threshold: float = None, cache_size: int = None, bedrock=None, first_stage=None):
+        self.threshold = (
+            threshold if threshold is not None
+            else float(os.getenv("INTENT_RULE_THRESHOLD", "0.85"))
+        )
+        self._cache_size = cache_size or int(os.getenv("INTENT_CACHE_SIZE", "2048"))
+        self._rules = first_stage or RuleBasedIntentClassifier()
+        self._bedrock = bedrock
+        self._cache: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"rules": 0, "bedrock": 0, "bedrock_fallback": 0, "cache": 0}
+
+    def _bedrock_stage(self) -> BaseIntentClassifier:
+        # Lazy: the boto3 client is only built once an ambiguous utterance arrives.
+        if self._bedrock is None:
+            self._bedrock = BedrockIntentClassifier()
+        return self._bedrock
+
+    @staticmethod
+    def _key(query: str, language: str) -> tuple:
+        from app.core.utils import normalize_query
+        return (normalize_query(query).lower(), language)
+
+    def _record(self, stage: str) -> None:
+        with self._lock:
+            self._counts[stage] += 1
+        try:
+            from app.services.telemetry_service import get_telemetry
+            get_telemetry().emit("IntentClassified", 1.0, {"stage": stage})
+        except Exception:
+            pass
+
+    def classify(self, query: str, language: str = "hi") -> dict:
+        key = self._key(query, language)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None:
+            self._record("cache")
+            return dict(cached)
+
+        result = self._rules.classify(query, language)
+        stage = "rules"
+        if float(result.get("confidence", 0.0)) < self.threshold:
+            result = self._bedrock_stage().classify(query, language)
+            stage = "bedrock_fallback" if result.get("source") == "rules_fallback" else "bedrock"
+        self._record(stage)
+        if stage == "bedrock_fallback":
+            return result
+
+        with self._lock:
+            self._cache[key] = dict(result)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            size = len(self._cache)
+        total = sum(counts.values())
+        return {
+            **counts,
+            "total": total,
+            "cache_size": size,
+            "threshold": self.threshold,
+            "bedrock_ratio": round(counts["bedrock"] / total, 4) if total else 0.0,
+        }
+
+
+# One shared instance per first stage so the cache and split counters survive
+# the per-request IntentService() construction used across the codebase.
+_two_stage: dict = {}
+_two_stage_lock = threading.Lock()
+
+
+def get_two_stage_classifier(first_stage: str = "rules") -> TwoStageIntentClassifier:
+    """first_stage: 'rules' (keyword tables) or 'model' (trained local model)."""
+    clf = _two_stage.get(first_stage)
+    if clf is None:
+        with _two_stage_lock:
+            clf = _two_stage.get(first_stage)
+            if clf is None:
+                stage = LocalModelIntentClassifier() if first_stage == "model" else None
+                clf = _two_stage[first_stage] = TwoStageIntentClassifier(first_stage=stage)
+    return clf
+
+
+# INTENT_CLASSIFIER values served by a two-stage classifier → its first stage
+_TWO_STAGE_MODES = {"bedrock": "rules", "local_model": "model"}
+
+
+def get_active_intent_classifier() -> Optional[TwoStageIntentClassifier]:
+    """The shared two-stage classifier IntentService uses under INTENT_CLASSIFIER, or None (rule_based, bedrock_only)."""
+    first_stage = _TWO_STAGE_MODES.get(os.getenv("INTENT_CLASSIFIER", "rule_based"))
+    return get_two_stage_classifier(first_stage) if first_stage else None
 
 
 class IntentService:
     """
     Modular intent classification — rule_based (default) or bedrock.
-    Controlled via INTENT_CLASSIFIER env var.
+    Controlled via INTENT_CLASSIFIER env var:
+      bedrock       → two-stage (rules fast-path, Nova Micro when ambiguous)
+      bedrock_only  → every utterance goes to Nova Micro
+      local_model   → two-stage with the trained NumPy model as first stage
     """
 
     def __init__(self):
         classifier_type = os.getenv("INTENT_CLASSIFIER", "rule_based")
         logger.info(f"[IntentService] Using classifier: {classifier_type}")
 
-        if classifier_type == "bedrock":
+        if classifier_type in _TWO_STAGE_MODES:
+            self.classifier = get_two_stage_classifier(_TWO_STAGE_MODES[classifier_type])
+        elif classifier_type == "bedrock_only":
             self.classifier = BedrockIntentClassifier()
         elif classifier_type == "rule_based":
             self.classifier = RuleBasedIntentClassifier()
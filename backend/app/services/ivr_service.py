@@ -82,6 +82,7 @@ class IVRService:
             return {"prompt": "I couldn't find details for that scheme. Please try again.", "done": False}
 
         _active_sessions.setdefault(session_id, {})
+        _active_sessions[session_id]["last_seen"] = datetime.now(timezone.utc).isoformat()
         _active_sessions[session_id]["pending_slots"] = [s["key"] for s in slots]
         _active_sessions[session_id]["slot_schemas"] = {s["key"]: s for s in slots}
         _active_sessions[session_id]["collected"] = {}
@@ -170,6 +171,23 @@ class IVRService:
         """Return all active IVR sessions for the admin IVR Monitor."""
         return list(_active_sessions.values())
 
+    def prune_idle_sessions(self, max_idle_s: float, limit: int = 1000) -> int:
+        """Forget IVR sessions not seen for `max_idle_s` (calls that hung up)."""
+        cutoff = datetime.now(timezone.utc).timestamp() - max_idle_s
+        idle = []
+        for session_id, sess in list(_active_sessions.items()):
+            try:
+                last_seen = datetime.fromisoformat(sess["last_seen"]).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+            if last_seen < cutoff:
+                idle.append(session_id)
+                if len(idle) >= limit:
+                    break
+        for session_id in idle:
+            _active_sessions.pop(session_id, None)
+        return len(idle)
+
     # ── Helpers ───────────────────────────────────────────────────────────────
 
     def _upsert_session(
@@ -193,17 +211,10 @@ class IVRService:
         }
 
     def _load_slots(self, scheme_name: str) -> list:
-        """Load slot schema from schemes_config.yaml for the given scheme."""
+        """Slot schema for the given scheme from the shared scheme catalog."""
         try:
-            import yaml
-            config_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-                "data", "schemes_config.yaml"
-            )
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
-            scheme = config.get("schemes", {}).get(scheme_name, {})
-            return scheme.get("slots", [])
+            from app.services.scheme_catalog import get_scheme_catalog
+            return get_scheme_catalog().slots(scheme_name)
         except Exception as e:
             logger.error(f"[IVRService] Failed to load slot schema for {scheme_name}: {e}")
             return []
@@ -0,0 +1,217 @@
+"""
+latency_histogram.py — Mergeable log-bucketed latency histograms.
+
+Each value lands in bucket ceil(log_γ(v)) with γ = (1 + ε) / (1 − ε), so any
+reported percentile is within ε (LATENCY_HISTOGRAM_PRECISION, default 1%)
+of the true value whatever the range — 1 ms and 60 s share one histogram of
+a few hundred sparse buckets. Histograms with the same γ merge by adding
+bucket counts, which is what makes per-worker snapshots combinable.
+
+Series are keyed by (metric, labels) and kept over a rolling window of
+per-minute histograms (LATENCY_WINDOW_MINUTES). Each thread records into
+its own shard of a series, so the request path takes no lock once the
+series and the thread's shard exist; snapshots merge the shards.
+
+  RequestLatencyMs     {route}        — log_request_lifecycle
+  DependencyLatencyMs  {dependency}   — CircuitBreaker.record
+  <metric>Ms           {dims…}        — any TelemetryService.emit in Milliseconds
+"""
+
+import os
+import math
+import time
+import threading
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+from app.services.metrics_exporter import ThreadShards, observe_latency
+
+PRECISION = float(os.getenv("LATENCY_HISTOGRAM_PRECISION", "0.01"))
+WINDOW_MINUTES = int(os.getenv("LATENCY_WINDOW_MINUTES", "5"))
+MAX_SERIES = int(os.getenv("LATENCY_MAX_SERIES", "500"))
+MIN_VALUE = 1e-3        # ≤ 1 µs (in ms) counts as zero
+QUANTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))
+
+
+class LogHistogram:
+    def __init__(self, precision: float = PRECISION):
+        self.precision = precision
+        self.gamma = (1 + precision) / (1 - precision)
+        self._log_gamma = math.log(self.gamma)
+        self.counts: Dict[int, int] = {}
+        self.zero = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value: float):
+        if value <= MIN_VALUE:
+            self.zero += 1
+        else:
+            i = math.ceil(math.log(value) / self._log_gamma)
+            self.counts[i] = self.counts.get(i, 0) + 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LogHistogram") -> "LogHistogram":
+        if other.precision != self.precision:
+            raise ValueError("cannot merge histograms with different precision")
+        for i, c in list(other.counts.items()):     # other may be a live shard
+            self.counts[i] = self.counts.get(i, 0) + c
+        self.zero += other.zero
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero
+        if rank < seen:
+            return 0.0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if rank < seen:
+                # Bucket midpoint (in relative terms), clamped to what was observed
+                estimate = 2 * self.gamma ** i / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        out = {"count": self.count,
+               "mean": round(self.sum / self.count, 2) if self.count else None}
+        for name, q in QUANTILES:
+            p = self.percentile(q)
+            out[name] = round(p, 2) if p is not None else None
+        out["max"] = round(self.max, 2) if self.count else None
+        return out
+
+    def to_dict(self) -> dict:
+        return {"precision": self.precision, "counts": {str(i): c for i, c in self.counts.items()},
+                "zero": self.zero, "count": self.count, "sum": self.sum,
+                "min": self.min if self.count else None, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LogHistogram":
+        h = cls(data.get("precision", PRECISION))
+        h.counts = {int(i): int(c) for i, c in data.get("counts", {}).items()}
+        h.zero = int(data.get("zero", 0))
+        h.count = int(data.get("count", 0))
+        h.sum = float(data.get("sum", 0.0))
+        h.min = data["min"] if data.get("min") is not None else math.inf
+        h.max = float(data.get("max", 0.0))
+        return h
+
+
+class RollingHistogram:
+    """
+    Per-minute LogHistograms over the last `window_minutes`, one deque of
+    minutes per recording thread; minutes of finished threads are merged
+    into `_retired`.
+    """
+
+    def __init__(self, window_minutes: int = WINDOW_MINUTES, precision: float = PRECISION):
+        self.window_minutes = window_minutes
+        self.precision = precision
+        self._retired: Dict[int, LogHistogram] = {}
+        self._shards = ThreadShards(lambda: deque(maxlen=window_minutes), self._fold)
+
+    def _fold(self, shard: deque):
+        for minute, h in shard:
+            retired = self._retired.get(minute)
+            if retired is None:
+                retired = self._retired[minute] = LogHistogram(self.precision)
+            retired.merge(h)
+        for minute in sorted(self._retired)[:-self.window_minutes]:
+            del self._retired[minute]
+
+    def record(self, value: float, now: Optional[float] = None):
+        minute = int((now if now is not None else time.time()) // 60)
+        shard = self._shards.get()
+        if not shard or shard[-1][0] != minute:
+            shard.append((minute, LogHistogram(self.precision)))
+        shard[-1][1].record(value)
+
+    def snapshot(self, now: Optional[float] = None) -> LogHistogram:
+        oldest = int((now if now is not None else time.time()) // 60) - self.window_minutes + 1
+        retired, shards = self._shards.collect(list, retired=lambda: list(self._retired.items()))
+        merged = LogHistogram(self.precision)
+        for minutes in [retired] + shards:
+            for minute, h in minutes:
+                if minute >= oldest:
+                    merged.merge(h)
+        return merged
+
+
+class LatencyHistograms:
+    """Registry of rolling histograms keyed by (metric, sorted label pairs)."""
+
+    def __init__(self, window_minutes: int = WINDOW_MINUTES, max_series: int = MAX_SERIES):
+        self.window_minutes = window_minutes
+        self.max_series = max_series
+        self._series: Dict[tuple, RollingHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, metric: str, value_ms: float, labels: Optional[dict] = None):
+        key = (metric, tuple(sorted((k, str(v)) for k, v in (labels or {}).items())))
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.get(key)
+                if series is None:
+                    if len(self._series) >= self.max_series:
+                        return      # cardinality cap — drop rather than grow unbounded
+                    series = self._series[key] = RollingHistogram(self.window_minutes)
+        series.record(value_ms)
+        observe_latency(metric, key[1], value_ms)
+
+    def snapshots(self) -> Dict[tuple, LogHistogram]:
+        with self._lock:
+            items = list(self._series.items())
+        return {key: series.snapshot() for key, series in items}
+
+    def summary(self) -> dict:
+        """{metric: [{"labels": {...}, "count", "mean", "p50", "p90", "p99", "max"}, ...]}"""
+        out: dict = {}
+        for (metric, labels), h in sorted(self.snapshots().items()):
+            if h.count:
+                out.setdefault(metric, []).append({"labels": dict(labels), **h.summary()})
+        return out
+
+    def export(self) -> list:
+        """Serialised snapshots, for merging across workers with `merge_exports`."""
+        return [{"metric": metric, "labels": dict(labels), "histogram": h.to_dict()}
+                for (metric, labels), h in self.snapshots().items() if h.count]
+
+
+def merge_exports(exports: Iterable[list]) -> dict:
+    """Combine `LatencyHistograms.export()` payloads from several workers into one summary."""
+    merged: Dict[tuple, LogHistogram] = {}
+    for export in exports:
+        for item in export:
+            key = (item["metric"], tuple(sorted(item["labels"].items())))
+            h = LogHistogram.from_dict(item["histogram"])
+            if key in merged:
+                merged[key].merge(h)
+            else:
+                merged[key] = h
+    out: dict = {}
+    for (metric, labels), h in sorted(merged.items()):
+        out.setdefault(metric, []).append({"labels": dict(labels), **h.summary()})
+    return out
+
+
+_histograms: Optional[LatencyHistograms] = None
+
+
+def get_latency_histograms() -> LatencyHistograms:
+    global _histograms
+    if _histograms is None:
+        _histograms = LatencyHistograms()
+    return _histograms
@@ -0,0 +1,272 @@
+"""
+metrics_exporter.py — Prometheus / OpenMetrics text exposition for /metrics.
+
+For self-hosted deployments without CloudWatch. Exported families:
+
+  jansathi_<latency>_ms            histogram  RequestLatencyMs{route},
+                                              DependencyLatencyMs{dependency},
+                                              every *Ms telemetry metric
+  jansathi_telemetry_events_total  counter    TelemetryService.emit calls {metric}
+  jansathi_telemetry_value_total   counter    sum of emitted values {metric}
+  jansathi_cache_hit_ratio         gauge      {cache=session|intent|bedrock}
+  jansathi_circuit_state           gauge      1 for the current state {dependency, state}
+  jansathi_circuit_short_circuited_total  counter  {dependency}
+  jansathi_queue_depth             gauge      {queue=hitl|audit|learned_qa}
+
+Hot path: latency observations go into a per-thread shard (a plain dict
+only its own thread writes), so recording takes no lock. A scrape copies
+every shard and sums them. Shards of finished threads are folded into a
+retired total whenever a new thread registers (amortised) and on every
+scrape, so thread-per-request servers without a scraper stay bounded.
+"""
+
+import os
+import re
+import time
+import bisect
+import logging
+import threading
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+QUEUE_CACHE_SECONDS = float(os.getenv("METRICS_QUEUE_CACHE_SECONDS", "30"))
+
+
+class ThreadShards:
+    """
+    One `factory()` object per thread, written only by its owner.
+
+    The lock is taken once per thread (registration) and by `collect`.
+    Shards of dead threads are passed to `retire` (called with the lock
+    held) and dropped — on collect, and on registration once the list has
+    doubled since the last prune, so pruning stays O(1) amortised.
+    """
+
+    MIN_PRUNE = 64
+
+    def __init__(self, factory, retire):
+        self._factory = factory
+        self._retire = retire
+        self._local = threading.local()
+        self._shards: list = []             # (thread, shard)
+        self._prune_at = self.MIN_PRUNE
+        self._lock = threading.Lock()
+
+    def get(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = self._factory()
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+                if len(self._shards) >= self._prune_at:
+                    self._prune()
+        return shard
+
+    def _prune(self):
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                self._retire(shard)
+        self._shards = live
+        self._prune_at = max(self.MIN_PRUNE, 2 * len(live))
+
+    def collect(self, copy, retired=None) -> tuple:
+        """
+        Prune, then under the lock return (retired(), [copy(shard), ...]) so
+        the retired total and the live shards are read consistently.
+        """
+        with self._lock:
+            self._prune()
+            return (retired() if retired else None), [copy(shard) for _, shard in self._shards]
+
+    def __len__(self) -> int:
+        return len(self._shards)
+
+
+class ShardedCounters:
+    """Counters keyed by tuples; each thread increments only its own dict."""
+
+    def __init__(self):
+        self._retired: Dict[tuple, float] = {}
+        self._shards = ThreadShards(dict, self._fold)
+
+    def _fold(self, shard: dict):
+        for k, v in dict(shard).items():
+            self._retired[k] = self._retired.get(k, 0) + v
+
+    def add(self, key: tuple, amount: float = 1.0):
+        shard = self._shards.get()
+        shard[key] = shard.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[tuple, float]:
+        # dict() copies atomically under the GIL
+        totals, shards = self._shards.collect(dict, retired=lambda: dict(self._retired))
+        for shard in shards:
+            for k, v in shard.items():
+                totals[k] = totals.get(k, 0) + v
+        return totals
+
+
+_latency = ShardedCounters()
+
+
+def observe_latency(metric: str, labels: tuple, value_ms: float):
+    """Record one latency sample (labels: sorted ((name, value), ...) pairs)."""
+    i = bisect.bisect_left(LATENCY_BUCKETS_MS, value_ms)
+    _latency.add((metric, labels, "bucket", i))
+    _latency.add((metric, labels, "sum", None), value_ms)
+    _latency.add((metric, labels, "count", None))
+
+
+# ── Rendering ────────────────────────────────────────────────────────────────
+
+def _snake(name: str) -> str:
+    return re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", name).lower()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _render_latency(lines: list):
+    series: Dict[tuple, dict] = {}
+    for (metric, labels, kind, idx), v in _latency.snapshot().items():
+        s = series.setdefault((metric, labels), {"buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                                                 "sum": 0.0, "count": 0})
+        if kind == "bucket":
+            s["buckets"][idx] += v
+        else:
+            s[kind] += v
+    by_metric: Dict[str, list] = {}
+    for (metric, labels), s in sorted(series.items()):
+        by_metric.setdefault(metric, []).append((labels, s))
+    for metric, items in by_metric.items():
+        name = "jansathi_" + _snake(metric).removesuffix("_ms") + "_ms"
+        lines.append(f"# HELP {name} {metric} in milliseconds")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, s in items:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS_MS + ("+Inf",), s["buckets"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {_fmt(cumulative)}")
+            lines.append(f"{name}_sum{_labels(labels)} {_fmt(s['sum'])}")
+            lines.append(f"{name}_count{_labels(labels)} {_fmt(s['count'])}")
+
+
+def _render_telemetry(lines: list):
+    from app.services.telemetry_service import get_telemetry
+    summary = get_telemetry().get_summary()
+    lines.append("# HELP jansathi_telemetry_events_total Telemetry data points emitted")
+    lines.append("# TYPE jansathi_telemetry_events_total counter")
+    for metric, s in sorted(summary.items()):
+        lines.append(f"jansathi_telemetry_events_total{_labels((('metric', metric),))} {_fmt(s['count'])}")
+    lines.append("# HELP jansathi_telemetry_value_total Sum of emitted telemetry values")
+    lines.append("# TYPE jansathi_telemetry_value_total counter")
+    for metric, s in sorted(summary.items()):
+        lines.append(f"jansathi_telemetry_value_total{_labels((('metric', metric),))} {_fmt(s['total'])}")
+
+
+def _cache_ratios() -> dict:
+    ratios = {}
+    try:
+        from agentic_engine.session_cache import get_session_cache
+        ratios["session"] = get_session_cache().stats()["hit_ratio"]
+    except Exception:
+        pass
+    try:
+        from app.services.intent_service import get_active_intent_classifier
+        classifier = get_active_intent_classifier()
+        if classifier is not None:
+            stats = classifier.stats()
+            ratios["intent"] = round(stats.get("cache", 0) / stats["total"], 4) if stats.get("total") else 0.0
+    except Exception:
+        pass
+    try:
+        from app.services.token_usage_service import get_usage_tracker
+        ratios["bedrock"] = get_usage_tracker().summary()["cache_hit_ratio"]
+    except Exception:
+        pass
+    return ratios
+
+
+def _render_caches(lines: list):
+    lines.append("# HELP jansathi_cache_hit_ratio Hit ratio per in-process cache")
+    lines.append("# TYPE jansathi_cache_hit_ratio gauge")
+    for cache, ratio in sorted(_cache_ratios().items()):
+        lines.append(f"jansathi_cache_hit_ratio{_labels((('cache', cache),))} {_fmt(ratio)}")
+
+
+def _render_breakers(lines: list):
+    from app.core.resilience import breaker_states, CLOSED, OPEN, HALF_OPEN
+    lines.append("# HELP jansathi_circuit_state Circuit breaker state (1 = current)")
+    lines.append("# TYPE jansathi_circuit_state gauge")
+    for dep, snap in breaker_states().items():
+        for state in (CLOSED, OPEN, HALF_OPEN):
+            value = 1 if snap["state"] == state else 0
+            lines.append(f"jansathi_circuit_state{_labels((('dependency', dep), ('state', state)))} {value}")
+    lines.append("# HELP jansathi_circuit_short_circuited_total Calls rejected by an open breaker")
+    lines.append("# TYPE jansathi_circuit_short_circuited_total counter")
+    for dep, snap in breaker_states().items():
+        lines.append(f"jansathi_circuit_short_circuited_total{_labels((('dependency', dep),))} {snap['short_circuited']}")
+
+
+_queue_cache: dict = {"at": 0.0, "depths": {}}
+
+
+def _queue_depths() -> dict:
+    """HITL depth needs a store query, so the set is cached for QUEUE_CACHE_SECONDS."""
+    now = time.monotonic()
+    if now - _queue_cache["at"] < QUEUE_CACHE_SECONDS and _queue_cache["depths"]:
+        return _queue_cache["depths"]
+    depths = {}
+    try:
+        from app.services.hitl_service import HITLService
+        depths["hitl"] = HITLService().count_cases("pending_review")
+    except Exception as e:
+        logger.debug(f"[Metrics] hitl depth unavailable: {e}")
+    try:
+        from app.services import audit_service
+        depths["audit"] = audit_service._writer.pending() if audit_service._writer else 0
+    except Exception:
+        pass
+    try:
+        from app.services.smart_rag_service import learned_qa_backlog
+        depths["learned_qa"] = learned_qa_backlog()
+    except Exception:
+        pass
+    _queue_cache.update(at=now, depths=depths)
+    return depths
+
+
+def _render_queues(lines: list):
+    lines.append("# HELP jansathi_queue_depth Items waiting per internal queue")
+    lines.append("# TYPE jansathi_queue_depth gauge")
+    for queue, depth in sorted(_queue_depths().items()):
+        lines.append(f"jansathi_queue_depth{_labels((('queue', queue),))} {_fmt(depth)}")
+
+
+def render_metrics() -> str:
+    """Full exposition; each family is collected independently."""
+    lines: list = []
+    for render in (_render_latency, _render_telemetry, _render_caches, _render_breakers, _render_queues):
+        try:
+            render(lines)
+        except Exception as e:
+            logger.warning(f"[Metrics] {render.__name__} failed: {e}")
+    return "\n".join(lines) + "\n"
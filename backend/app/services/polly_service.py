@@ -8,6 +8,7 @@ from botocore.exceptions import NoCredentialsError
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.core.utils import logger, retry_aws
+from app.core.resilience import adaptive_client, get_breaker
 
 # Language → Polly configuration (Optimized for Neural quality)
 VOICE_MAP = {
@@ -31,13 +32,19 @@ class PollyService:
         self.bucket_name = os.getenv("S3_BUCKET_NAME")
 
         try:
-            self.polly_client = boto3.client("polly", region_name=self.region)
+            adaptive_client("polly", "polly", self.region)
             self.s3_client = boto3.client("s3", region_name=self.region)
             self.use_aws = True
         except NoCredentialsError:
             logger.warning("Polly Init Failed: No AWS credentials. Using mock.")
             self.use_aws = False
 
+    @property
+    def polly_client(self):
+        # Looked up per call, not stored: adaptive_client swaps in a new client
+        # when the breaker's recommended read timeout drifts
+        return adaptive_client("polly", "polly", self.region)
+
     @retry_aws()
     def synthesize(self, text: str, language: str = "hi"):
         """
@@ -55,7 +62,9 @@ class PollyService:
             engine = cfg["engine"]
 
             # 1️⃣ Synthesize speech
-            response = self.polly_client.synthesize_speech(
+            # Open circuit raises CircuitOpenError → _mock_fallback below
+            response = get_breaker("polly").call(
+                self.polly_client.synthesize_speech,
                 Text=text,
                 OutputFormat="mp3",
                 VoiceId=voice_id,
@@ -35,11 +35,12 @@ class RagService:
         self.app_context = None # Initialize to avoid lint error
         
         # Initialize AWS Kendra Client
-        import boto3
+        from app.core.resilience import adaptive_client
         try:
-            self.kendra = boto3.client('kendra', region_name=self.region)
+            adaptive_client('kendra', 'kendra', self.region)
+            self._kendra_ready = True
         except Exception:
-            self.kendra = None
+            self._kendra_ready = False
         
         # Initialize attributes to avoid lint errors
         self.vectorizer = None
@@ -72,6 +73,13 @@ class RagService:
         # Mocking AWS parts
         self.use_aws = False
 
+    @property
+    def kendra(self):
+        if not self._kendra_ready:
+            return None
+        from app.core.resilience import adaptive_client
+        return adaptive_client('kendra', 'kendra', self.region)
+
     def _load_schemes_from_db(self):
         """Load schemes from SQLite database."""
         try:
@@ -203,7 +211,9 @@ class RagService:
         if not self.kendra or self.kendra_index_id == 'mock-index':
             return []
         try:
-            response = self.kendra.retrieve(
+            from app.core.resilience import get_breaker
+            response = get_breaker('kendra').call(
+                self.kendra.retrieve,
                 IndexId=self.kendra_index_id,
                 QueryText=query,
                 PageSize=3
@@ -247,14 +247,8 @@ class ReceiptService:
         # First check YAML config for any extra docs, then standard list
         docs = list(STANDARD_DOCS.get(scheme_name, []))
         try:
-            import yaml
-            config_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-                "data", "schemes_config.yaml"
-            )
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
-            extra = config.get("schemes", {}).get(scheme_name, {}).get("documents", [])
+            from app.services.scheme_catalog import get_scheme_catalog
+            extra = (get_scheme_catalog().get(scheme_name) or {}).get("documents", [])
             for d in extra:
                 if d not in docs:
                     docs.append(d)
@@ -1,89 +1,226 @@
+import json
+import hashlib
 import operator
+import threading
+from collections import OrderedDict
 from typing import Callable, Any
 
-class RulesEngine:
+OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "in": lambda a, b: a in b if isinstance(b, list) else a == b,
+    "contains": lambda a, b: b in a if isinstance(a, str) else False
+}
+
+_NO_RULES_BREAKDOWN = ({"label": "No rules", "rule": "no_rules", "pass": True, "citation": ""},)
+_COMPILE_CACHE_SIZE = 256
+
+
+def to_number(value):
+    """Leading number of a profile value ("1,50,000 rupees" → 150000.0), or None."""
+    if value is None or isinstance(value, float):
+        return value
+    try:
+        return float(str(value).replace(',', '').split()[0])
+    except (ValueError, IndexError):
+        return None
+
+
+class EligibilityResult:
+    """Verdict of one compiled rule set; `breakdown` is only built when read."""
+
+    __slots__ = ("eligible", "score", "_rules", "_profile", "_numbers", "_breakdown")
+
+    def __init__(self, eligible, score, rules, profile, numbers):
+        self.eligible = eligible
+        self.score = score
+        self._rules = rules
+        self._profile = profile
+        self._numbers = numbers
+        self._breakdown = None
+
+    @property
+    def breakdown(self) -> list:
+        if self._breakdown is None:
+            self._breakdown = self._rules.breakdown(self._profile, self._numbers)
+        return self._breakdown
+
+    def as_tuple(self):
+        return self.eligible, self.breakdown, self.score
+
+
+class CompiledRules:
     """
-    Deterministic Eligibility Engine.
-    Evaluates structured JSON rules against user profile data.
+    One scheme's `rules` turned into a specialised evaluator.
+
+    Operators, numeric targets and labels are resolved at compile time; each
+    numeric profile field is coerced once per evaluation and shared by every
+    predicate that reads it. `check` returns only the verdict — the per-rule
+    breakdown for receipts is produced by `breakdown` / EligibilityResult.
     """
-    
-    OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
-        "eq": operator.eq,
-        "ne": operator.ne,
-        "lt": operator.lt,
-        "lte": operator.le,
-        "gt": operator.gt,
-        "gte": operator.ge,
-        "in": lambda a, b: a in b if isinstance(b, list) else a == b,
-        "contains": lambda a, b: b in a if isinstance(a, str) else False
-    }
-
-    def evaluate(self, user_profile, rules):
-        """
-        Evaluates a set of rules against a user profile.
-        Returns (eligible, breakdown, matching_score)
 
-        breakdown is now a list of dicts:
-          { "label": str, "rule": str, "pass": bool, "citation": str, "user_value": any }
-        """
-        if not rules or 'mandatory' not in rules:
-            return True, [{"label": "No rules", "rule": "no_rules", "pass": True, "citation": ""}], 1.0
+    def __init__(self, rules):
+        self.has_rules = bool(rules) and 'mandatory' in rules
+        specs = []
+        numeric_fields = []
+        for rule in (rules or {}).get('mandatory', []) if self.has_rules else []:
+            field = rule.get('field')
+            target = rule.get('value')
+            numeric = isinstance(target, (int, float))
+            specs.append((
+                field,
+                rule.get('operator'),
+                OPERATORS.get(rule.get('operator')),
+                target,
+                float(target) if numeric else None,
+                rule.get('label', field),
+                rule.get('citation', ''),
+            ))
+            if numeric and field not in numeric_fields:
+                numeric_fields.append(field)
+        self.specs = tuple(specs)
+        self.numeric_fields = tuple(numeric_fields)
+        self.total = len(self.specs)
 
-        breakdown = []
-        is_eligible = True
-        matched_count = 0
-        total_mandatory = len(rules.get('mandatory', []))
+    def _numbers(self, profile) -> dict:
+        return {f: to_number(profile.get(f)) for f in self.numeric_fields}
 
-        for rule in rules.get('mandatory', []):
-            field = rule.get('field')
-            op_name = rule.get('operator')
-            target_value = rule.get('value')
-            label = rule.get('label', field)
-            citation = rule.get('citation', '')
-
-            user_value = user_profile.get(field)
-
-            # Basic type conversion for numbers if needed
-            if isinstance(target_value, (int, float)) and isinstance(user_value, str):
-                try:
-                    user_value = float(user_value.replace(',', '').split()[0])
-                except (ValueError, IndexError):
-                    pass
-
-            op_func = self.OPERATORS.get(op_name)
-            if not op_func:
-                breakdown.append({"label": label, "rule": f"Unknown operator: {op_name}", "pass": False, "citation": citation, "user_value": user_value})
-                continue
+    @staticmethod
+    def _match(spec, profile, numbers) -> bool:
+        field, _, op_func, target, numeric_target, _, _ = spec
+        if numeric_target is not None:
+            number = numbers[field]
+            if number is not None:
+                return bool(op_func(number, numeric_target))
+        return bool(op_func(profile.get(field), target))
 
+    def check(self, profile, numbers=None):
+        """(eligible, score) without building a breakdown."""
+        if not self.has_rules:
+            return True, 1.0
+        if numbers is None:
+            numbers = self._numbers(profile)
+        eligible = True
+        matched = 0
+        for spec in self.specs:
+            if spec[2] is None:
+                continue            # unknown operator: not counted, doesn't fail eligibility
             try:
-                is_numeric = isinstance(target_value, (int, float))
-                if is_numeric and user_value is not None:
-                    try:
-                        match = op_func(float(str(user_value).replace(',', '').split()[0]), float(target_value))
-                    except (ValueError, IndexError):
-                        match = op_func(user_value, target_value)
+                if self._match(spec, profile, numbers):
+                    matched += 1
                 else:
-                    match = op_func(user_value, target_value)
+                    eligible = False
+            except Exception:
+                eligible = False
+        return eligible, (matched / self.total if self.total else 1.0)
 
-                entry = {
+    def evaluate(self, profile) -> EligibilityResult:
+        numbers = self._numbers(profile) if self.has_rules else {}
+        eligible, score = self.check(profile, numbers)
+        return EligibilityResult(eligible, score, self, profile, numbers)
+
+    def breakdown(self, profile, numbers=None) -> list:
+        if not self.has_rules:
+            return [dict(entry) for entry in _NO_RULES_BREAKDOWN]
+        if numbers is None:
+            numbers = self._numbers(profile)
+        out = []
+        for spec in self.specs:
+            field, op_name, op_func, target, numeric_target, label, citation = spec
+            user_value = profile.get(field)
+            if numeric_target is not None and isinstance(user_value, str) and numbers[field] is not None:
+                user_value = numbers[field]
+            if op_func is None:
+                out.append({"label": label, "rule": f"Unknown operator: {op_name}", "pass": False,
+                            "citation": citation, "user_value": user_value})
+                continue
+            try:
+                match = self._match(spec, profile, numbers)
+                out.append({
                     "label": label,
-                    "rule": f"{field} {op_name} {target_value}",
-                    "pass": bool(match),
+                    "rule": f"{field} {op_name} {target}",
+                    "pass": match,
                     "citation": citation,
                     "user_value": user_value,
-                    "required_value": target_value,
-                }
-                breakdown.append(entry)
-                if match:
-                    matched_count += 1
-                else:
-                    is_eligible = False
+                    "required_value": target,
+                })
             except Exception as e:
-                breakdown.append({"label": label, "rule": f"Error: {e}", "pass": False, "citation": citation, "user_value": user_value})
-                is_eligible = False
+                out.append({"label": label, "rule": f"Error: {e}", "pass": False,
+                            "citation": citation, "user_value": user_value})
+        return out
+
+
+# Constant rule sets (module-level SCHEME_RULES) are compiled once by
+# precompile() and found again by identity, with no hashing. Anything else —
+# typically dicts freshly decoded from the DB on every call — is keyed on
+# content: an equal dict reuses the evaluator and an in-place edit gets a new one.
+_precompiled: dict = {}         # id(rules) -> (rules, CompiledRules); entries live as long as the constants
+_compiled: "OrderedDict[tuple, CompiledRules]" = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+def precompile(rule_sets: dict) -> dict:
+    """
+    {scheme_id: CompiledRules} for constant rule sets. compile_rules() on the
+    same dict objects afterwards is a dict lookup; they must not be mutated.
+    """
+    out = {}
+    for scheme_id, rules in rule_sets.items():
+        compiled = CompiledRules(rules)
+        _precompiled[id(rules)] = (rules, compiled)
+        out[scheme_id] = compiled
+    return out
+
+
+def _rules_digest(rules) -> str:
+    blob = json.dumps(rules, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def compile_rules(rules, scheme_id: str = "") -> CompiledRules:
+    """Compiled evaluator for a rules dict: precompiled constant, else cached by (scheme_id, content hash)."""
+    entry = _precompiled.get(id(rules))
+    if entry is not None and entry[0] is rules:
+        return entry[1]
+    key = (scheme_id, _rules_digest(rules))
+    with _compiled_lock:
+        compiled = _compiled.get(key)
+        if compiled is not None:
+            _compiled.move_to_end(key)
+            return compiled
+    compiled = CompiledRules(rules)
+    with _compiled_lock:
+        _compiled[key] = compiled
+        while len(_compiled) > _COMPILE_CACHE_SIZE:
+            _compiled.popitem(last=False)
+    return compiled
+
+
+class RulesEngine:
+    """
+    Deterministic Eligibility Engine.
+    Evaluates structured JSON rules against user profile data.
+    """
+
+    OPERATORS = OPERATORS
+
+    def evaluate(self, user_profile, rules, scheme_id: str = ""):
+        """
+        Evaluates a set of rules against a user profile.
+        Returns (eligible, breakdown, matching_score)
+
+        breakdown is now a list of dicts:
+          { "label": str, "rule": str, "pass": bool, "citation": str, "user_value": any }
+        """
+        return compile_rules(rules, scheme_id).evaluate(user_profile).as_tuple()
 
-        score = matched_count / total_mandatory if total_mandatory > 0 else 1.0
-        return is_eligible, breakdown, score
+    def check(self, user_profile, rules, scheme_id: str = ""):
+        """Fast path: (eligible, matching_score) with no breakdown."""
+        return compile_rules(rules, scheme_id).check(user_profile)
 
     def generate_explainability(self, results):
         """
@@ -0,0 +1,210 @@
+"""
+scheme_catalog.py — Shared in-memory catalog of schemes_config.yaml
+
+One parse per file change for the whole process. Every consumer (workflow
+engine, IVR slot collection, AgentCore tools, /v1/schemes, scheme feed,
+receipts) reads the same immutable snapshot:
+
+  schemes     {scheme_id: scheme}   read-only dict/list views of the YAML
+  slot index  {scheme_id: (version, {slot_key: slot})}
+  compiled    {scheme_id: CompiledRules}    rules_engine evaluators, built on first use
+
+The file's mtime is checked at most every SCHEME_CATALOG_CHECK_SECONDS; a
+change swaps in a new snapshot atomically. If the new YAML fails to parse the
+previous snapshot stays in service.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Optional
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+CATALOG_PATH = os.getenv(
+    "SCHEME_CATALOG_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "schemes_config.yaml"),
+)
+CHECK_SECONDS = float(os.getenv("SCHEME_CATALOG_CHECK_SECONDS", "2"))
+
+
+# ── Read-only containers ─────────────────────────────────────────────────────
+# dict/list subclasses so existing isinstance checks, .get() and jsonify keep
+# working; mutation raises instead of silently corrupting the shared snapshot.
+
+def _readonly(*_args, **_kwargs):
+    raise TypeError("scheme catalog entries are read-only; copy before modifying")
+
+
+class FrozenDict(dict):
+    __setitem__ = __delitem__ = update = pop = popitem = setdefault = clear = __ior__ = _readonly
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+class FrozenList(list):
+    __setitem__ = __delitem__ = append = extend = insert = pop = remove = clear = sort = reverse = \
+        __iadd__ = __imul__ = _readonly
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Plain mutable deep copy of a catalog entry."""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [thaw(v) for v in value]
+    return value
+
+
+# ── Precompiled structures ───────────────────────────────────────────────────
+
+def scheme_version(scheme: dict) -> str:
+    """Short content hash of a scheme's slot definitions."""
+    blob = json.dumps(scheme.get("slots", []), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:12]
+
+
+class CatalogSnapshot:
+    """One immutable parse of the catalog file."""
+
+    def __init__(self, raw: dict, mtime_ns: int = 0):
+        schemes = raw.get("schemes", {}) if isinstance(raw, dict) else {}
+        schemes = {sid: s for sid, s in (schemes or {}).items() if isinstance(s, dict)}
+        self.mtime_ns = mtime_ns
+        self.loaded_at = time.time()
+        self.schemes = freeze(schemes)
+        self.slot_index = {
+            sid: (scheme_version(s), FrozenDict((slot["key"], slot) for slot in self.schemes[sid].get("slots", [])
+                                                if isinstance(slot, dict) and "key" in slot))
+            for sid, s in schemes.items()
+        }
+        self.compiled_rules: dict = {}      # scheme_id -> CompiledRules, filled on first use
+        self.version = hashlib.sha1(
+            json.dumps(schemes, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        ).hexdigest()[:12]
+
+
+_EMPTY_INDEX = (scheme_version({}), FrozenDict())
+
+
+class SchemeCatalog:
+    def __init__(self, path: str = CATALOG_PATH, check_seconds: float = CHECK_SECONDS):
+        self.path = path
+        self.check_seconds = check_seconds
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _mtime_ns(self) -> int:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return 0
+
+    def snapshot(self) -> CatalogSnapshot:
+        snap = self._snapshot
+        now = time.monotonic()
+        if snap is not None and now < self._next_check:
+            return snap
+        with self._lock:
+            snap = self._snapshot
+            if snap is None or now >= self._next_check:
+                self._next_check = now + self.check_seconds
+                mtime = self._mtime_ns()
+                if snap is None or mtime != snap.mtime_ns:
+                    snap = self._load(mtime, snap)
+        return snap
+
+    def _load(self, mtime_ns: int, previous: Optional[CatalogSnapshot]) -> CatalogSnapshot:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = yaml.safe_load(f) or {}
+            snap = CatalogSnapshot(raw, mtime_ns)
+            if previous is not None:
+                logger.info(f"[SchemeCatalog] Reloaded {self.path} (version {snap.version})")
+        except Exception as e:
+            if previous is not None:
+                logger.warning(f"[SchemeCatalog] Reload failed, keeping version {previous.version}: {e}")
+                previous.mtime_ns = mtime_ns     # don't re-parse the same broken file every check
+                return previous
+            logger.warning(f"[SchemeCatalog] Could not load {self.path}: {e}")
+            snap = CatalogSnapshot({}, mtime_ns)
+        self._snapshot = snap
+        return snap
+
+    def reload(self) -> CatalogSnapshot:
+        """Force a re-read on the next access."""
+        self._next_check = 0.0
+        with self._lock:
+            if self._snapshot is not None:
+                self._snapshot.mtime_ns = -1
+        return self.snapshot()
+
+    # ── Accessors ─────────────────────────────────────────────────────────────
+
+    def schemes(self) -> FrozenDict:
+        return self.snapshot().schemes
+
+    def get(self, scheme_id: str) -> Optional[FrozenDict]:
+        return self.snapshot().schemes.get(scheme_id)
+
+    def slots(self, scheme_id: str) -> FrozenList:
+        scheme = self.get(scheme_id)
+        return scheme.get("slots", FrozenList()) if scheme else FrozenList()
+
+    def slot_index(self, scheme_id: str) -> tuple:
+        """(version, {slot_key: slot}) for a scheme; empty index if unknown."""
+        return self.snapshot().slot_index.get(scheme_id, _EMPTY_INDEX)
+
+    def rules(self, scheme_id: str) -> FrozenDict:
+        scheme = self.get(scheme_id)
+        return scheme.get("rules", FrozenDict()) if scheme else FrozenDict()
+
+    def compiled_rules(self, scheme_id: str):
+        """CompiledRules evaluator for a scheme, built once per snapshot."""
+        snap = self.snapshot()
+        compiled = snap.compiled_rules.get(scheme_id)
+        if compiled is None:
+            from app.services.rules_engine import CompiledRules
+            scheme = snap.schemes.get(scheme_id)
+            compiled = snap.compiled_rules[scheme_id] = CompiledRules(scheme.get("rules", {}) if scheme else {})
+        return compiled
+
+
+_catalog: Optional[SchemeCatalog] = None
+
+
+def get_scheme_catalog() -> SchemeCatalog:
+    global _catalog
+    if _catalog is None:
+        _catalog = SchemeCatalog()
+    return _catalog
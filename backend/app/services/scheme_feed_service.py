@@ -4,7 +4,7 @@ scheme_feed_service.py
 Builds a personalized, auto-refreshable scheme feed for the dashboard.
 Sources:
 1) SQLite Scheme table (if present)
-2) app/data/schemes_config.yaml (authoritative fallback)
+2) app/data/schemes_config.yaml via the shared scheme catalog (authoritative fallback)
 """
 
 from __future__ import annotations
@@ -15,9 +15,9 @@ from threading import Lock
 from typing import Any, Dict, List, Optional
 from types import SimpleNamespace
 
-import yaml
-
 from app.models.models import Scheme, UserProfile
+from app.services.eligibility_matrix import catalog_eligibility, profile_record
+from app.services.scheme_catalog import get_scheme_catalog
 
 
 class SchemeFeedService:
@@ -36,10 +36,11 @@ class SchemeFeedService:
     def get_feed(self, user_id: str) -> Dict[str, Any]:
         base_schemes = self._get_base_schemes()
         profile = UserProfile.query.get(user_id)
+        verdicts = self._rule_verdicts(base_schemes, profile)
 
         scored: List[Dict[str, Any]] = []
         for scheme in base_schemes:
-            enriched = self._personalize_scheme(scheme, profile)
+            enriched = self._personalize_scheme(scheme, profile, verdicts.get(scheme["id"]))
             scored.append(enriched)
 
         scored.sort(
@@ -77,9 +78,11 @@ class SchemeFeedService:
                 land_holding_acres=user_profile.get("land_holding_acres", user_profile.get("land", 0)) or 0,
             )
 
+        verdicts = self._rule_verdicts(base_schemes, user_profile)
+
         scored: List[Dict[str, Any]] = []
         for scheme in base_schemes:
-            scored.append(self._personalize_scheme(scheme, profile_obj))
+            scored.append(self._personalize_scheme(scheme, profile_obj, verdicts.get(scheme["id"])))
 
         scored.sort(
             key=lambda item: (
@@ -145,17 +148,7 @@ class SchemeFeedService:
         return [s for s in out if s["id"] and s["title"]]
 
     def _load_from_yaml(self) -> List[Dict[str, Any]]:
-        path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            "data",
-            "schemes_config.yaml",
-        )
-        if not os.path.exists(path):
-            return []
-
-        with open(path, "r", encoding="utf-8") as f:
-            parsed = yaml.safe_load(f) or {}
-        schemes = parsed.get("schemes", {})
+        schemes = get_scheme_catalog().schemes()
         out: List[Dict[str, Any]] = []
 
         for sid, item in schemes.items():
@@ -184,7 +177,29 @@ class SchemeFeedService:
             )
         return out
 
-    def _personalize_scheme(self, scheme: Dict[str, Any], profile: Optional[UserProfile]) -> Dict[str, Any]:
+    @staticmethod
+    def _rule_verdicts(schemes: List[Dict[str, Any]], profile: Any) -> Dict[str, Dict[str, Any]]:
+        """
+        {scheme_id: {"eligible", "score", "complete"}} from the catalog's compiled
+        rules, for yaml-sourced schemes; all cards evaluated in one matrix pass.
+        """
+        if not profile:
+            return {}
+        ids = [s["id"] for s in schemes if s.get("source") == "yaml"]
+        if not ids:
+            return {}
+        try:
+            matrix = catalog_eligibility([profile_record(profile)], ids)
+        except Exception:
+            return {}
+        return {sid: matrix.cell(0, sid) for sid in ids}
+
+    def _personalize_scheme(
+        self,
+        scheme: Dict[str, Any],
+        profile: Optional[UserProfile],
+        verdict: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
         score = 0.45
         reasons: List[str] = []
 
@@ -221,6 +236,14 @@ class SchemeFeedService:
         else:
             reasons.append("Complete profile for stronger personalization")
 
+        # Published rules only decide the card when the profile has every field they read
+        if verdict and verdict["complete"]:
+            if verdict["eligible"]:
+                score += 0.2
+                reasons.insert(0, "Meets the published eligibility rules")
+            else:
+                score -= 0.2
+
         score = max(0.0, min(score, 0.99))
         status = "eligible" if score >= 0.75 else "likely_eligible" if score >= 0.55 else "check_criteria"
 
@@ -228,6 +251,9 @@ class SchemeFeedService:
         enriched["eligibility_score"] = round(score, 2)
         enriched["eligibility_status"] = status
         enriched["why_recommended"] = reasons[:3]
+        if verdict and verdict["complete"]:
+            enriched["rules_eligible"] = verdict["eligible"]
+            enriched["rules_score"] = round(verdict["score"], 2)
         return enriched
 
     @staticmethod
@@ -0,0 +1,163 @@
+"""
+session_sweeper.py — Background TTL sweeper + compaction for local stores.
+
+DynamoDB expires sessions with its native TTL (expires_at). Everything else
+grows forever unless pruned:
+
+  - session store (SQLite / sessions.json): sessions not written for
+    SESSION_TTL_SECONDS, deleted in batches of SWEEP_BATCH_SIZE (at most
+    SWEEP_MAX_BATCHES per run), then compacted (WAL checkpoint / VACUUM)
+  - local HITL store: approved/rejected cases older than HITL_RETENTION_DAYS
+  - IVRService._active_sessions: calls idle for IVR_IDLE_SECONDS
+
+Each run records size/age histograms of the session store and emits
+`SessionsSwept`. The sweeper thread is started from create_app; set
+SESSION_SWEEP_INTERVAL_SECONDS=0 to disable it.
+"""
+
+import os
+import time
+import bisect
+import logging
+import threading
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL_SECONDS = float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "600"))
+SWEEP_BATCH_SIZE = int(os.getenv("SESSION_SWEEP_BATCH_SIZE", "500"))
+SWEEP_MAX_BATCHES = int(os.getenv("SESSION_SWEEP_MAX_BATCHES", "20"))
+HITL_RETENTION_DAYS = float(os.getenv("HITL_RETENTION_DAYS", "30"))
+IVR_IDLE_SECONDS = float(os.getenv("IVR_IDLE_SECONDS", "1800"))
+
+# Histogram upper bounds (last bucket is +Inf)
+AGE_BUCKETS_S = (300, 3600, 6 * 3600, 24 * 3600, 7 * 24 * 3600)
+SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536)
+
+
+def histogram(values: Iterable[float], bounds: tuple) -> dict:
+    """Per-bucket (non-cumulative) counts keyed by upper bound ("+Inf" last)."""
+    counts = [0] * (len(bounds) + 1)
+    for v in values:
+        counts[bisect.bisect_left(bounds, v)] += 1
+    labels = [str(b) for b in bounds] + ["+Inf"]
+    return dict(zip(labels, counts))
+
+
+class SessionSweeper:
+    def __init__(self, storage=None, ttl_s: Optional[float] = None, batch_size: int = SWEEP_BATCH_SIZE,
+                 max_batches: int = SWEEP_MAX_BATCHES):
+        from agentic_engine.storage import _SESSION_TTL_SECONDS
+        self._storage = storage
+        self.ttl_s = ttl_s if ttl_s is not None else _SESSION_TTL_SECONDS
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.last_report: dict = {}
+        self._lock = threading.Lock()
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            from agentic_engine.session_manager import get_session_manager
+            return get_session_manager().storage
+        return self._storage
+
+    # ── Sweeps ────────────────────────────────────────────────────────────────
+
+    def sweep_sessions(self) -> dict:
+        storage = self.storage
+        cutoff = time.time() - self.ttl_s
+        expired = batches = 0
+        more = True
+        try:
+            while more and batches < self.max_batches:
+                n = storage.expire_sessions(cutoff, self.batch_size)
+                batches += 1
+                expired += n
+                more = n == self.batch_size
+        except NotImplementedError:
+            return {"expired": 0, "batches": 0, "skipped": "native TTL"}
+        if expired:
+            storage.compact()
+        return {"expired": expired, "batches": batches, "more": more}
+
+    def sweep_hitl(self) -> int:
+        from app.services.hitl_service import HITLService
+        return HITLService().prune_resolved(HITL_RETENTION_DAYS * 86400, limit=self.batch_size)
+
+    def sweep_ivr(self) -> int:
+        from app.services.ivr_service import IVRService
+        return IVRService().prune_idle_sessions(IVR_IDLE_SECONDS, limit=self.batch_size * self.max_batches)
+
+    def session_histograms(self) -> dict:
+        try:
+            meta = list(self.storage.iter_session_meta())
+        except NotImplementedError:
+            return {}
+        now = time.time()
+        return {
+            "count": len(meta),
+            "size_bytes": histogram((size or 0 for size, _ in meta), SIZE_BUCKETS_BYTES),
+            "age_seconds": histogram((now - (ts or now) for _, ts in meta), AGE_BUCKETS_S),
+            "total_bytes": sum(size or 0 for size, _ in meta),
+        }
+
+    def run_once(self) -> dict:
+        """One full maintenance pass; each part fails independently."""
+        with self._lock:
+            t0 = time.perf_counter()
+            report = {"ts": time.time()}
+            for name, fn in (("sessions", self.sweep_sessions), ("hitl_pruned", self.sweep_hitl),
+                             ("ivr_pruned", self.sweep_ivr), ("histograms", self.session_histograms)):
+                try:
+                    report[name] = fn()
+                except Exception as e:
+                    logger.warning(f"[SessionSweeper] {name} failed: {e}")
+                    report[name] = {"error": str(e)}
+            report["duration_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+            self.last_report = report
+
+        expired = report["sessions"].get("expired", 0) if isinstance(report["sessions"], dict) else 0
+        try:
+            from app.services.telemetry_service import get_telemetry
+            get_telemetry().emit("SessionsSwept", float(expired), {"store": type(self.storage).__name__})
+        except Exception:
+            pass
+        if expired or report.get("hitl_pruned") or report.get("ivr_pruned"):
+            logger.info(f"[SessionSweeper] expired={expired} hitl={report.get('hitl_pruned')} "
+                        f"ivr={report.get('ivr_pruned')} in {report['duration_ms']}ms")
+        return report
+
+
+# ── Background thread ─────────────────────────────────────────────────────────
+
+_sweeper: Optional[SessionSweeper] = None
+_thread: Optional[threading.Thread] = None
+
+
+def get_sweeper() -> SessionSweeper:
+    global _sweeper
+    if _sweeper is None:
+        _sweeper = SessionSweeper()
+    return _sweeper
+
+
+def _loop(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            get_sweeper().run_once()
+        except Exception as e:
+            logger.error(f"[SessionSweeper] run failed: {e}")
+
+
+def start_sweeper(interval: float = SWEEP_INTERVAL_SECONDS) -> bool:
+    """Start the daemon sweeper once per process. Returns True if running."""
+    global _thread
+    if interval <= 0:
+        return False
+    if _thread is None or not _thread.is_alive():
+        _thread = threading.Thread(target=_loop, args=(interval,), name="session-sweeper", daemon=True)
+        _thread.start()
+        logger.info(f"[SessionSweeper] started (every {interval:.0f}s)")
+    return True
@@ -23,6 +23,7 @@ from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 from botocore.exceptions import ClientError
 from botocore.config import Config as BotoConfig
+from app.core.resilience import adaptive_client, get_breaker
 
 # ── Local knowledge base (used when Kendra + Bedrock are unavailable) ─────────
 _LOCAL_KB: List[Dict] = [
@@ -204,6 +205,15 @@ def _local_kb_query(query: str, language: str) -> Optional[str]:
     return None
 
 
+# Learned Q&A pairs stored to S3 since the last successful Kendra sync
+# (process-wide; SmartRAGService is constructed per request)
+_learned_since_sync = 0
+
+
+def learned_qa_backlog() -> int:
+    return _learned_since_sync
+
+
 class SmartRAGService:
     def __init__(self):
         self.region = os.getenv('AWS_REGION', 'us-east-1')
@@ -216,15 +226,14 @@ class SmartRAGService:
         self.LOW_CONFIDENCE = 0.40   # Generate new answer with Bedrock
 
         _cfg = BotoConfig(connect_timeout=4, read_timeout=8, retries={'max_attempts': 1})
-        # Initialize AWS clients
+        # Initialize AWS clients (Kendra timeouts adapt to observed p99)
         try:
-            self.kendra = boto3.client('kendra', region_name=self.region, config=_cfg)
+            adaptive_client('kendra', 'kendra', self.region)
             self.s3 = boto3.client('s3', region_name=self.region, config=_cfg)
             self.working = True
         except Exception as e:
             print(f"SmartRAG Init Error: {e}")
             self.working = False
-            self.kendra = None
             self.s3 = None
         
         # In-memory cache for recent queries (session-level)
@@ -238,6 +247,11 @@ class SmartRAGService:
             'cache_hits': 0,
             'learned_qa_stored': 0,
         }
+
+    @property
+    def kendra(self):
+        # Shared client from adaptive_client on every use so timeout updates take effect
+        return adaptive_client('kendra', 'kendra', self.region) if self.working else None
     
     def query(self, user_query: str, language: str = 'en', 
               user_profile: Optional[Dict] = None, 
@@ -338,7 +352,9 @@ class SmartRAGService:
             )
             
             if learned:
+                global _learned_since_sync
                 self.stats['learned_qa_stored'] += 1
+                _learned_since_sync += 1
             
             # Cache it
             self._cache_answer(user_query, answer, bedrock_result['confidence'], [])
@@ -411,7 +427,8 @@ class SmartRAGService:
             return {'confidence': 0.0, 'raw_text': '', 'sources': []}
         
         try:
-            response = self.kendra.retrieve(
+            response = get_breaker('kendra').call(
+                self.kendra.retrieve,
                 IndexId=self.kendra_index_id,
                 QueryText=query,
                 PageSize=5
@@ -672,6 +689,8 @@ For official information, please visit https://myscheme.gov.in
                 IndexId=self.kendra_index_id
             )
             
+            global _learned_since_sync
+            _learned_since_sync = 0
             execution_id = response.get('ExecutionId')
             print(f"✅ Kendra sync triggered: {execution_id}")
             return True
@@ -3,11 +3,28 @@ telemetry_service.py — CloudWatch metrics emitter for JanSathi.
 
 Emits operational + impact metrics with console-log fallback for local dev.
 Used by all agents to give judges / dashboard real KPIs.
+
+`emit` never does network I/O on the request path. Data points are folded
+into per-(metric, unit, dimensions) statistic sets (SampleCount / Sum /
+Minimum / Maximum) and a background thread ships them every
+TELEMETRY_FLUSH_SECONDS in PutMetricData calls of up to 1000 datums.
+
+TELEMETRY_SINK selects the output:
+  cloudwatch — batched PutMetricData (default when boto3 is configured)
+  emf        — CloudWatch Embedded Metric Format lines on stdout, written
+               at emit time (default on Lambda, where background threads
+               are frozen between invocations)
+  log        — console only (local dev)
 """
 
 import os
+import sys
+import json
+import atexit
 import logging
+import threading
 import time
+from collections import deque
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -31,10 +48,27 @@ METRICS = {
     "SubmissionError":    {"unit": "Count",         "desc": "Submission failures (gov API down)"},
     "ConsentCaptured":    {"unit": "Count",         "desc": "User consents recorded"},
     "AuditLogWritten":    {"unit": "Count",         "desc": "Audit entries persisted"},
+    "BedrockInputTokens": {"unit": "Count",         "desc": "Bedrock input tokens by route/model/cache"},
+    "BedrockOutputTokens": {"unit": "Count",        "desc": "Bedrock output tokens by route/model/cache"},
+    "CircuitOpened":      {"unit": "Count",         "desc": "Dependency circuit breaker tripped open"},
+    "IntentClassified":   {"unit": "Count",         "desc": "Intent classifications by stage (rules/bedrock/cache)"},
+    "SessionsSwept":      {"unit": "Count",         "desc": "Expired sessions deleted by the TTL sweeper"},
+    "AgentNodeLatencyMs": {"unit": "Milliseconds",  "desc": "Per-node agent pipeline latency by Node"},
 }
 
-# In-process store for local dev reporting
-_local_buffer: list = []
+FLUSH_SECONDS = float(os.getenv("TELEMETRY_FLUSH_SECONDS", "10"))
+BUFFER_SIZE = int(os.getenv("TELEMETRY_BUFFER_SIZE", "1000"))
+MAX_DATUMS_PER_PUT = 1000
+
+# In-process ring of recent data points for the local dev dashboard
+_local_buffer: deque = deque(maxlen=BUFFER_SIZE)
+
+
+def _default_sink() -> str:
+    sink = os.getenv("TELEMETRY_SINK", "").lower()
+    if sink:
+        return sink
+    return "emf" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "cloudwatch"
 
 
 class TelemetryService:
@@ -43,16 +77,27 @@ class TelemetryService:
     Falls back to console + in-memory buffer when AWS is not configured.
     """
 
-    def __init__(self):
+    def __init__(self, sink: Optional[str] = None, flush_seconds: float = FLUSH_SECONDS):
         self._cw = None
         self._namespace = NAMESPACE
         self._region = os.getenv("AWS_REGION", "ap-south-1")
         self._enabled = os.getenv("TELEMETRY_ENABLED", "true").lower() == "true"
-        self._init_cloudwatch()
+        self._sink = sink or _default_sink()
+        self._flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._pending: dict = {}        # (metric, unit, dims) → [count, sum, min, max]
+        self._totals: dict = {}         # metric → [total, count] since start
+        self._thread: Optional[threading.Thread] = None
+        if self._sink == "cloudwatch":
+            self._init_cloudwatch()
+            if self._cw is None:
+                self._sink = "log"
 
     def _init_cloudwatch(self):
         try:
             import boto3
+            if boto3.Session().get_credentials() is None:
+                raise RuntimeError("no AWS credentials")
             self._cw = boto3.client("cloudwatch", region_name=self._region)
             logger.info("[Telemetry] CloudWatch client initialised")
         except Exception as e:
@@ -64,7 +109,7 @@ class TelemetryService:
     def emit(self, metric_name: str, value: float = 1.0,
              dimensions: Optional[dict] = None, unit: Optional[str] = None) -> None:
         """
-        Emit a single metric data point.
+        Record a single metric data point (shipped on the next flush).
 
         Args:
             metric_name: Must be one of METRICS keys (or custom string)
@@ -76,31 +121,43 @@ class TelemetryService:
             return
 
         resolved_unit = unit or METRICS.get(metric_name, {}).get("unit", "Count")
-        dims = [{"Name": k, "Value": str(v)} for k, v in (dimensions or {}).items()]
+        dims = tuple(sorted((k, str(v)) for k, v in (dimensions or {}).items()))
+        value = float(value)
 
-        entry = {
+        _local_buffer.append({
             "metric": metric_name,
             "value": value,
             "unit": resolved_unit,
             "dimensions": dimensions or {},
             "ts": datetime.now(timezone.utc).isoformat(),
-        }
-        _local_buffer.append(entry)
-
-        if self._cw:
-            try:
-                self._cw.put_metric_data(
-                    Namespace=self._namespace,
-                    MetricData=[{
-                        "MetricName": metric_name,
-                        "Dimensions": dims,
-                        "Value": value,
-                        "Unit": resolved_unit,
-                        "Timestamp": datetime.now(timezone.utc),
-                    }]
-                )
-            except Exception as e:
-                logger.warning(f"[Telemetry] CloudWatch put failed: {e}")
+        })
+
+        with self._lock:
+            total = self._totals.get(metric_name)
+            if total is None:
+                self._totals[metric_name] = [value, 1]
+            else:
+                total[0] += value
+                total[1] += 1
+            if self._sink == "cloudwatch":
+                key = (metric_name, resolved_unit, dims)
+                stat = self._pending.get(key)
+                if stat is None:
+                    self._pending[key] = [1, value, value, value]
+                else:
+                    stat[0] += 1
+                    stat[1] += value
+                    stat[2] = min(stat[2], value)
+                    stat[3] = max(stat[3], value)
+
+        if resolved_unit == "Milliseconds":
+            from app.services.latency_histogram import get_latency_histograms
+            get_latency_histograms().record(metric_name, value, dimensions)
+
+        if self._sink == "cloudwatch":
+            self._ensure_flusher()
+        elif self._sink == "emf":
+            self._write_emf(metric_name, value, resolved_unit, dims)
         else:
             logger.info(f"[TELEMETRY] {metric_name}={value} {resolved_unit} {dimensions or ''}")
 
@@ -110,19 +167,72 @@ class TelemetryService:
         self.emit(metric_name, ms, dimensions, unit="Milliseconds")
         return ms
 
+    def flush(self) -> int:
+        """Ship pending statistic sets to CloudWatch. Returns the number of datums sent."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or self._cw is None:
+            return 0
+        now = datetime.now(timezone.utc)
+        datums = [{
+            "MetricName": name,
+            "Dimensions": [{"Name": k, "Value": v} for k, v in dims],
+            "StatisticValues": {"SampleCount": c, "Sum": total, "Minimum": lo, "Maximum": hi},
+            "Unit": unit,
+            "Timestamp": now,
+        } for (name, unit, dims), (c, total, lo, hi) in pending.items()]
+        sent = 0
+        for i in range(0, len(datums), MAX_DATUMS_PER_PUT):
+            batch = datums[i:i + MAX_DATUMS_PER_PUT]
+            try:
+                self._cw.put_metric_data(Namespace=self._namespace, MetricData=batch)
+                sent += len(batch)
+            except Exception as e:
+                # Metrics are best-effort: a failed batch is dropped, not retried
+                logger.warning(f"[Telemetry] CloudWatch put failed ({len(batch)} datums): {e}")
+        return sent
+
     def get_local_metrics(self) -> list:
-        """Return in-memory buffer (for local dev dashboard)."""
+        """Return the recent-points ring (for local dev dashboard)."""
         return list(_local_buffer)
 
     def get_summary(self) -> dict:
         """Aggregate in-memory metrics for the health endpoint."""
-        from collections import defaultdict
-        totals: dict = defaultdict(float)
-        counts: dict = defaultdict(int)
-        for e in _local_buffer:
-            totals[e["metric"]] += e["value"]
-            counts[e["metric"]] += 1
-        return {k: {"total": totals[k], "count": counts[k]} for k in totals}
+        with self._lock:
+            return {k: {"total": t, "count": c} for k, (t, c) in self._totals.items()}
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _write_emf(self, metric_name: str, value: float, unit: str, dims: tuple):
+        doc = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": self._namespace,
+                    "Dimensions": [[k for k, _ in dims]],
+                    "Metrics": [{"Name": metric_name, "Unit": unit}],
+                }],
+            },
+            metric_name: value,
+            **dict(dims),
+        }
+        sys.stdout.write(json.dumps(doc) + "\n")
+
+    def _ensure_flusher(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="telemetry-flush", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            time.sleep(self._flush_seconds)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"[Telemetry] flush failed: {e}")
 
 
 # Module-level singleton
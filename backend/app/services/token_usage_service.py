@@ -0,0 +1,195 @@
+"""
+token_usage_service.py — Bedrock token + cost accounting.
+
+Every Converse / AgentCore call reports its `usage` block here, tagged with
+route, model, session and cache status:
+
+  - rolling per-minute counters (last USAGE_WINDOW_MINUTES) per
+    (route, model, cache) → calls, input/output tokens, estimated USD
+  - top token-consuming prompts, keyed by a caller-supplied label (a prompt
+    template name) or route + model; prompt text is never stored, only its
+    size, because it carries citizen utterances
+  - BedrockInputTokens / BedrockOutputTokens emitted via TelemetryService
+
+Session and route tags flow through `usage_context(...)` so deep helpers
+like nova_converse need no extra parameters.
+"""
+
+import os
+import time
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+WINDOW_MINUTES = int(os.getenv("USAGE_WINDOW_MINUTES", "60"))
+MAX_PROMPTS = int(os.getenv("USAGE_MAX_PROMPTS", "256"))
+
+# On-demand USD per 1K tokens (input, output)
+MODEL_PRICING = {
+    "amazon.nova-micro-v1:0": (0.000035, 0.00014),
+    "amazon.nova-lite-v1:0":  (0.00006, 0.00024),
+    "amazon.nova-pro-v1:0":   (0.0008, 0.0032),
+}
+
+_usage_ctx: contextvars.ContextVar = contextvars.ContextVar("jansathi_usage_ctx", default={})
+
+
+@contextmanager
+def usage_context(**tags):
+    """Tag all usage recorded inside the block (session_id=..., route=...)."""
+    token = _usage_ctx.set({**_usage_ctx.get(), **{k: v for k, v in tags.items() if v}})
+    try:
+        yield
+    finally:
+        _usage_ctx.reset(token)
+
+
+def _current_route() -> str:
+    route = _usage_ctx.get().get("route")
+    if route:
+        return route
+    try:
+        from flask import has_request_context, request
+        if has_request_context():
+            # Route template, not the concrete path — ids would explode cardinality
+            return request.url_rule.rule if request.url_rule else "<unmatched>"
+    except Exception:
+        pass
+    return "internal"
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    in_rate, out_rate = MODEL_PRICING.get(model, (0.0, 0.0))
+    return input_tokens / 1000.0 * in_rate + output_tokens / 1000.0 * out_rate
+
+
+class TokenUsageTracker:
+    def __init__(self, window_minutes: int = WINDOW_MINUTES, max_prompts: int = MAX_PROMPTS):
+        self._buckets: deque = deque(maxlen=window_minutes)   # (minute, {key: [calls, in, out, cost]})
+        self._prompts: dict = {}
+        self._max_prompts = max_prompts
+        self._lock = threading.Lock()
+
+    def _bucket(self, minute: int) -> dict:
+        if not self._buckets or self._buckets[-1][0] != minute:
+            self._buckets.append((minute, {}))
+        return self._buckets[-1][1]
+
+    def record(self, usage: Optional[dict], model: str, prompt: str = "", label: Optional[str] = None,
+               cache_status: str = "miss", session_id: Optional[str] = None,
+               route: Optional[str] = None) -> dict:
+        """Record one model call. `usage` is the Converse/AgentCore usage block."""
+        usage = usage or {}
+        input_tokens = int(usage.get("inputTokens", 0) or 0)
+        output_tokens = int(usage.get("outputTokens", 0) or 0)
+        ctx = _usage_ctx.get()
+        route = route or _current_route()
+        session_id = session_id or ctx.get("session_id", "")
+        cost = estimate_cost(model, input_tokens, output_tokens)
+        key = (route, model, cache_status)
+        label = label or f"{route}:{model}"
+
+        with self._lock:
+            row = self._bucket(int(time.time() // 60)).setdefault(key, [0, 0, 0, 0.0])
+            row[0] += 1
+            row[1] += input_tokens
+            row[2] += output_tokens
+            row[3] += cost
+
+            if cache_status != "hit":
+                p = self._prompts.get(label)
+                if p is None:
+                    if len(self._prompts) >= self._max_prompts:
+                        # Evict the lightest prompt so heavy hitters stay visible
+                        lightest = min(self._prompts, key=lambda k: self._prompts[k]["input_tokens"])
+                        del self._prompts[lightest]
+                    p = self._prompts[label] = {
+                        "label": label, "route": route, "model": model, "calls": 0,
+                        "input_tokens": 0, "output_tokens": 0, "max_input_tokens": 0,
+                        "cost_usd": 0.0, "max_prompt_chars": 0,
+                        "last_session": "",
+                    }
+                p["calls"] += 1
+                p["input_tokens"] += input_tokens
+                p["output_tokens"] += output_tokens
+                p["max_input_tokens"] = max(p["max_input_tokens"], input_tokens)
+                p["max_prompt_chars"] = max(p["max_prompt_chars"], len(prompt or ""))
+                p["cost_usd"] += cost
+                p["last_session"] = session_id
+
+        try:
+            from app.services.telemetry_service import get_telemetry
+            tel = get_telemetry()
+            dims = {"route": route, "model": model, "cache": cache_status}
+            if input_tokens:
+                tel.emit("BedrockInputTokens", float(input_tokens), dims)
+            if output_tokens:
+                tel.emit("BedrockOutputTokens", float(output_tokens), dims)
+        except Exception:
+            pass
+
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "cost_usd": cost}
+
+    def summary(self) -> dict:
+        """Rolling-window totals per route/model/cache status."""
+        cutoff = int(time.time() // 60) - self._buckets.maxlen
+        totals: dict = {}
+        with self._lock:
+            for minute, rows in self._buckets:
+                if minute <= cutoff:
+                    continue
+                for key, (calls, tin, tout, cost) in rows.items():
+                    t = totals.setdefault(key, [0, 0, 0, 0.0])
+                    t[0] += calls
+                    t[1] += tin
+                    t[2] += tout
+                    t[3] += cost
+        rows = [
+            {"route": r, "model": m, "cache": c, "calls": v[0], "input_tokens": v[1],
+             "output_tokens": v[2], "cost_usd": round(v[3], 6)}
+            for (r, m, c), v in totals.items()
+        ]
+        hits = sum(r["calls"] for r in rows if r["cache"] == "hit")
+        misses = sum(r["calls"] for r in rows if r["cache"] != "hit")
+        return {
+            "window_minutes": self._buckets.maxlen,
+            "by_route": sorted(rows, key=lambda r: -(r["input_tokens"] + r["output_tokens"])),
+            "input_tokens": sum(r["input_tokens"] for r in rows),
+            "output_tokens": sum(r["output_tokens"] for r in rows),
+            "cost_usd": round(sum(r["cost_usd"] for r in rows), 6),
+            "cache_hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        }
+
+    def top_prompts(self, limit: int = 20) -> list:
+        with self._lock:
+            prompts = [dict(p) for p in self._prompts.values()]
+        for p in prompts:
+            p["avg_input_tokens"] = round(p["input_tokens"] / p["calls"], 1) if p["calls"] else 0.0
+            p["cost_usd"] = round(p["cost_usd"], 6)
+        prompts.sort(key=lambda p: -(p["input_tokens"] + p["output_tokens"]))
+        return prompts[:limit]
+
+
+# Module-level singleton
+_tracker: Optional[TokenUsageTracker] = None
+
+
+def get_usage_tracker() -> TokenUsageTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = TokenUsageTracker()
+    return _tracker
+
+
+def record_usage(usage: Optional[dict], model: str, **tags) -> dict:
+    """Never let accounting break a model call."""
+    try:
+        return get_usage_tracker().record(usage, model, **tags)
+    except Exception as e:
+        logger.warning(f"[TokenUsage] record failed: {e}")
+        return {}
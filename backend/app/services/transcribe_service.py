@@ -5,6 +5,7 @@ import json
 import urllib.request
 from botocore.exceptions import ClientError, NoCredentialsError
 from app.core.utils import logger, retry_aws
+from app.core.resilience import adaptive_client, get_breaker
 
 class TranscribeService:
     def __init__(self):
@@ -12,7 +13,7 @@ class TranscribeService:
         self.bucket_name = os.getenv('S3_BUCKET_NAME', 'jansathi-audio-demo-bucket')
         
         try:
-            self.transcribe_client = boto3.client('transcribe', region_name=self.region)
+            adaptive_client('transcribe', 'transcribe', self.region)
             self.s3_client = boto3.client('s3', region_name=self.region)
             self.use_aws = True
         except NoCredentialsError:
@@ -22,6 +23,11 @@ class TranscribeService:
             logger.error(f"Transcribe Init Error: {e}")
             self.use_aws = False
 
+    @property
+    def transcribe_client(self):
+        # Not cached on the instance so read-timeout changes apply immediately
+        return adaptive_client('transcribe', 'transcribe', self.region)
+
     @retry_aws()
     def transcribe_audio(self, file_path=None, job_name=None, s3_uri=None):
         """
@@ -47,7 +53,9 @@ class TranscribeService:
 
             # 2. Start Job
             logger.info(f"Starting Transcribe job: {job_name}")
-            self.transcribe_client.start_transcription_job(
+            # Open circuit raises CircuitOpenError → _mock_fallback below
+            get_breaker('transcribe').call(
+                self.transcribe_client.start_transcription_job,
                 TranscriptionJobName=job_name,
                 Media={'MediaFileUri': file_uri},
                 MediaFormat='wav', # simplistic assumption for demo
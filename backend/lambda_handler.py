@@ -36,7 +36,26 @@ try:
     from mangum import Mangum
     # Mangum 0.17+ is ASGI-only; wrap Flask (WSGI) with asgiref
     from asgiref.wsgi import WsgiToAsgi
-    handler = Mangum(WsgiToAsgi(_flask_app), lifespan="off")
+    _mangum = Mangum(WsgiToAsgi(_flask_app), lifespan="off")
+
+    def handler(event, context):
+        try:
+            return _mangum(event, context)
+        finally:
+            # No background writer on Lambda — persist this invocation's audit
+            # records before the container is frozen
+            try:
+                from app.services.audit_service import get_audit_writer
+                get_audit_writer().flush()
+            except Exception as e:
+                logger.error(f"[Lambda] audit flush failed: {e}")
+            # Same for buffered DynamoDB cache counters
+            try:
+                from app.data.dynamodb_repo import flush_all_stats
+                flush_all_stats()
+            except Exception as e:
+                logger.error(f"[Lambda] cache stats flush failed: {e}")
+
     logger.info("[Lambda] Flask app loaded via Mangum")
 
 except Exception as _bootstrap_err:
@@ -89,6 +89,12 @@ def create_app():
     except Exception as e:
         print(f"Error registering profile_bp: {e}", flush=True)
 
+    try:
+        from app.api.metrics_routes import metrics_bp
+        app.register_blueprint(metrics_bp)
+    except Exception as e:
+        print(f"Error registering metrics_bp: {e}", flush=True)
+
 
     # Create SQLite tables only in local dev mode
     if not USE_DYNAMODB:
@@ -96,6 +102,20 @@ def create_app():
             from app.models.models import db
             db.create_all()
 
+    # Persist buffered response-cache hit counts on shutdown
+    try:
+        from app.services.bedrock_service import BedrockQueryCache
+        BedrockQueryCache.flush_on_exit(app)
+    except Exception as e:
+        print(f"Error registering cache flush: {e}", flush=True)
+
+    # Session TTL sweeper for local stores (DynamoDB uses native TTL)
+    try:
+        from app.services.session_sweeper import start_sweeper
+        start_sweeper()
+    except Exception as e:
+        print(f"Error starting session sweeper: {e}", flush=True)
+
     return app
 
 
@@ -0,0 +1,177 @@
+"""
+tests/test_audit.py — Batched audit writer + hash chain
+========================================================
+Tests cover:
+  1. Records are queued off the request path and written in batches
+  2. Writers sharing a local file extend one continuous chain
+  3. S3 sink: one KMS put per batch, local fallback on failure
+  4. On Lambda records wait for the handler's flush (no background thread)
+"""
+import sys
+import os
+import json
+import pytest
+from unittest.mock import MagicMock
+
+# ── Path setup ────────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _record(n):
+    return {"record_id": f"{n:08d}-rec", "record_type": "turn", "session_id": "s1",
+            "ts": "2026-01-01T00:00:00+00:00", "payload": {"n": n}}
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestAuditWriter:
+    def test_submit_is_deferred_and_batched(self, tmp_path):
+        from app.services.audit_service import AuditWriter, LocalAuditSink
+        sink = LocalAuditSink(str(tmp_path / "audit.jsonl"))
+        writer = AuditWriter(sink=sink, flush_seconds=3600, batch_size=2, background=False)
+        for n in range(5):
+            writer.submit(_record(n))
+        assert not os.path.exists(sink.path)
+        assert writer.flush() == 5
+        assert writer.pending() == 0
+        assert [r["seq"] for r in _read(sink.path)] == [0, 1, 2, 3, 4]
+        assert len(_read(sink.checkpoint_path)) == 3           # batches of 2, 2, 1
+
+    def test_shared_local_file_forms_one_chain(self, tmp_path):
+        from app.services.audit_service import AuditWriter, LocalAuditSink, record_hash, GENESIS_HASH
+        path = str(tmp_path / "audit.jsonl")
+        a = AuditWriter(sink=LocalAuditSink(path), flush_seconds=3600)
+        b = AuditWriter(sink=LocalAuditSink(path), flush_seconds=3600)
+        for n in range(6):
+            (a if n % 2 else b).submit(_record(n))
+            (a if n % 2 else b).flush()
+        prev = GENESIS_HASH
+        for seq, rec in enumerate(_read(path)):
+            assert rec["seq"] == seq and rec["prev_hash"] == prev
+            assert rec["integrity_hash"] == record_hash(prev, rec)
+            prev = rec["integrity_hash"]
+
+    def test_head_recovered_from_existing_log(self, tmp_path):
+        from app.services.audit_service import LocalAuditSink
+        path = tmp_path / "audit.jsonl"
+        path.write_text(json.dumps({**_record(0), "integrity_hash": "abc"}) + "\n")
+        sink = LocalAuditSink(str(path))
+        sink.write_batch([_record(1)])
+        last = _read(path)[-1]
+        assert last["prev_hash"] == "abc" and last["seq"] == 1
+
+    def test_lambda_writer_has_no_background_thread(self, monkeypatch):
+        import app.services.audit_service as audit
+        monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "jansathi-api")
+        monkeypatch.setenv("AUDIT_SINK", "local")
+        monkeypatch.setattr(audit, "_writer", None)
+        writer = audit.get_audit_writer()
+        assert writer.background is False
+        writer.submit(_record(0))
+        assert writer._thread is None and writer.pending() == 1
+        writer._queue.clear()
+
+
+class TestS3AuditSink:
+    def test_one_put_per_batch_with_checkpoint_metadata(self):
+        from app.services.audit_service import S3AuditSink
+        sink = S3AuditSink(bucket="b")
+        sink._s3 = MagicMock()
+        sink.write_batch([_record(0), _record(1)])
+        sink.write_batch([_record(2)])
+        calls = sink._s3.put_object.call_args_list
+        assert len(calls) == 2
+        first, second = calls[0].kwargs, calls[1].kwargs
+        assert first["ServerSideEncryption"] == "aws:kms"
+        assert first["Metadata"]["count"] == "2"
+        assert second["Metadata"]["prev-hash"] == first["Metadata"]["last-hash"]
+        assert second["Key"].endswith(f"{sink.writer_id}/000000000002.jsonl")
+
+    def test_falls_back_to_local_when_put_fails(self, tmp_path):
+        from app.services.audit_service import AuditWriter, S3AuditSink, LocalAuditSink
+        sink = S3AuditSink(bucket="b")
+        sink._s3 = MagicMock()
+        sink._s3.put_object.side_effect = RuntimeError("no creds")
+        writer = AuditWriter(sink=sink, flush_seconds=3600)
+        writer.fallback = LocalAuditSink(str(tmp_path / "audit.jsonl"))
+        writer.submit(_record(0))
+        assert writer.flush() == 1
+        assert len(_read(writer.fallback.path)) == 1
+        assert sink._seq == 0                                  # S3 chain not advanced
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CHAIN VERIFIER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestAuditVerifier:
+    def _log(self, tmp_path, batches=4, per_batch=5):
+        from app.services.audit_service import LocalAuditSink
+        sink = LocalAuditSink(str(tmp_path / "audit.jsonl"))
+        for b in range(batches):
+            sink.write_batch([_record(b * per_batch + i) for i in range(per_batch)])
+        return sink.path
+
+    def test_intact_log_verifies_in_parallel(self, tmp_path):
+        from app.services.audit_verifier import verify_local
+        path = self._log(tmp_path)
+        report = verify_local(path, workers=2, segment_bytes=1)  # one segment per batch
+        assert report["ok"] and report["records"] == 20 and report["segments"] == 4
+
+    def test_thread_pool_mode_for_request_path(self, tmp_path):
+        from app.services.audit_verifier import verify_local
+        report = verify_local(self._log(tmp_path), workers=2, segment_bytes=1, processes=False)
+        assert report["ok"] and report["records"] == 20 and report["segments"] == 4
+
+    def test_reports_first_tampered_record(self, tmp_path):
+        from app.services.audit_verifier import verify_local
+        path = self._log(tmp_path)
+        lines = open(path, encoding="utf-8").read().splitlines(True)
+        for idx in (7, 15):
+            rec = json.loads(lines[idx])
+            rec["payload"]["n"] = -1
+            lines[idx] = json.dumps(rec) + "\n"
+        # Same-length edit keeps checkpoint offsets valid
+        open(path, "w", encoding="utf-8").writelines(lines)
+        report = verify_local(path, workers=1, segment_bytes=1)
+        assert not report["ok"]
+        assert report["first_break"]["seq"] == 7
+        assert report["first_break"]["reason"] == "integrity_hash mismatch"
+
+    def test_deleted_records_break_the_chain(self, tmp_path):
+        from app.services.audit_verifier import verify_local
+        path = self._log(tmp_path)
+        os.remove(path + ".ckpt")                               # fall back to byte segments
+        lines = open(path, encoding="utf-8").read().splitlines(True)
+        open(path, "w", encoding="utf-8").writelines(lines[:10] + lines[11:])
+        report = verify_local(path, workers=1)
+        assert not report["ok"] and report["first_break"]["seq"] == 11
+
+        open(path, "w", encoding="utf-8").writelines(lines[:-1])
+        report = verify_local(path, workers=1)
+        assert report["first_break"]["reason"] == "log ends before the recorded chain head"
+
+    def test_s3_segments_stitched_per_writer(self):
+        from app.services.audit_service import S3AuditSink
+        from app.services.audit_verifier import verify_s3
+        store = {}
+        sink = S3AuditSink(bucket="b")
+        sink._s3 = MagicMock()
+        sink._s3.put_object.side_effect = lambda **kw: store.__setitem__(kw["Key"], kw)
+        for b in range(3):
+            sink.write_batch([_record(b * 2), _record(b * 2 + 1)])
+
+        s3 = MagicMock()
+        s3.get_paginator.return_value.paginate.side_effect = lambda **kw: [{"Contents": [{"Key": k} for k in store]}]
+        s3.get_object.side_effect = lambda Bucket, Key: {
+            "Metadata": store[Key]["Metadata"],
+            "Body": MagicMock(iter_lines=lambda: store[Key]["Body"].splitlines()),
+        }
+        assert verify_s3(bucket="b", s3=s3, workers=2)["ok"]
+
+        del store[sorted(store)[1]]                             # drop the middle segment
+        report = verify_s3(bucket="b", s3=s3, workers=2)
+        assert not report["ok"] and report["first_break"]["seq"] == 4
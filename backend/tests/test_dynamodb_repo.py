@@ -0,0 +1,100 @@
+"""
+tests/test_dynamodb_repo.py — DynamoDB cache repository
+========================================================
+Tests cover:
+  1. Buffered hit/miss/set counters flushed with one UpdateItem ADD
+  2. cache_stats without a table scan; counters flushed on shutdown
+  3. cache_get_many via chunked BatchGetItem with UnprocessedKeys retry
+"""
+import sys
+import os
+import time
+import pytest
+from unittest.mock import patch
+
+# ── Path setup ────────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.fixture
+def repo():
+    with patch("boto3.resource"):
+        from app.data.dynamodb_repo import DynamoDBRepo
+        r = DynamoDBRepo()
+    r.cache_table.put_item.return_value = {}
+    return r
+
+
+def _item(repo, query, language="hi", ttl_offset=3600):
+    return {"QueryHash": repo._cache_key(query, language), "Response": f"r:{query}:{language}",
+            "Sources": "[]", "HitCount": 0, "ttl": int(time.time()) + ttl_offset}
+
+
+class TestCacheCounters:
+    def test_counters_buffered_then_added_in_one_update(self, repo):
+        repo.cache_table.get_item.side_effect = [{"Item": _item(repo, "q")}, {}]
+        repo.cache_set("q", "hi", "r")
+        repo.cache_get("q")
+        repo.cache_get("other")
+        repo.cache_table.update_item.assert_not_called()
+
+        repo.flush_stats()
+        kwargs = repo.cache_table.update_item.call_args.kwargs
+        assert kwargs["Key"] == {"QueryHash": "__stats__"}
+        assert kwargs["UpdateExpression"].startswith("ADD ")
+        added = {kwargs["ExpressionAttributeNames"][k.replace(":", "#")]: v
+                 for k, v in kwargs["ExpressionAttributeValues"].items()}
+        assert added == {"Entries": 1, "Sets": 1, "Hits": 1, "Misses": 1}
+
+    def test_overwrite_does_not_count_new_entry(self, repo):
+        repo.cache_table.put_item.return_value = {"Attributes": {"QueryHash": "x"}}
+        repo.cache_set("q", "hi", "r")
+        assert repo._pending_stats == {"Sets": 1}
+
+    def test_stats_reads_counter_item_without_scan(self, repo):
+        repo.cache_table.get_item.return_value = {"Item": {"Hits": 3, "Misses": 1, "Entries": 2, "Sets": 4}}
+        repo.dynamodb.meta.client.describe_table.return_value = {"Table": {"ItemCount": 2}}
+        stats = repo.cache_stats()
+        repo.cache_table.scan.assert_not_called()
+        assert stats["hit_ratio"] == 0.75 and stats["total_entries"] == 1 and stats["sets"] == 4   # minus the stats item
+
+    def test_pending_counters_flushed_on_shutdown(self, repo):
+        from app.data.dynamodb_repo import flush_all_stats
+        repo.cache_table.get_item.return_value = {}
+        repo.cache_get("q")
+        repo.cache_table.update_item.assert_not_called()
+        flush_all_stats()                                   # atexit / end of Lambda invocation
+        assert repo.cache_table.update_item.call_args.kwargs["ExpressionAttributeValues"] == {":c0": 1}
+        assert repo._pending_stats == {}
+
+
+class TestCacheGetMany:
+    def test_batches_dedupes_and_retries_unprocessed(self, repo):
+        queries = [(f"q{i}", "hi") for i in range(150)] + [("q0", "hi")]
+        table = repo.cache_table_name
+        calls = []
+
+        def batch_get_item(RequestItems):
+            keys = RequestItems[table]["Keys"]
+            calls.append(len(keys))
+            by_hash = {repo._cache_key(q, l): q for q, l in queries}
+            items = [_item(repo, by_hash[k["QueryHash"]]) for k in keys]
+            if len(calls) == 1:                 # throttle the last key once
+                return {"Responses": {table: items[:-1]},
+                        "UnprocessedKeys": {table: {**RequestItems[table], "Keys": keys[-1:]}}}
+            return {"Responses": {table: items}}
+
+        repo.dynamodb.batch_get_item.side_effect = batch_get_item
+        with patch("app.data.dynamodb_repo.time.sleep"):
+            found = repo.cache_get_many(queries)
+        assert calls == [100, 1, 50]
+        assert len(found) == 150 and found[("q7", "hi")]["response"] == "r:q7:hi"
+        assert repo._pending_stats["Hits"] == 151
+
+    def test_expired_items_are_misses(self, repo):
+        table = repo.cache_table_name
+        repo.dynamodb.batch_get_item.return_value = {
+            "Responses": {table: [_item(repo, "a"), _item(repo, "a", "en", ttl_offset=-5)]}}
+        found = repo.cache_get_many([("a", "hi"), ("a", "en")])
+        assert list(found) == [("a", "hi")]
+        assert repo._pending_stats == {"Hits": 1, "Misses": 1}
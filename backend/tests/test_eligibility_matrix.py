@@ -0,0 +1,131 @@
+"""
+tests/test_eligibility_matrix.py — Vectorised profile × scheme eligibility
+===========================================================================
+Tests cover:
+  1. Matrix cells agree with CompiledRules.check, including odd values;
+     profile records supply the fields real scheme rules read
+  2. Proactive alert rules evaluated as one matrix over many profiles
+  3. Nightly outreach batches over stored profiles
+  4. Scheme feed cards carry the published-rules verdict
+"""
+import sys
+import os
+import random
+import pytest
+from flask import Flask
+
+# ── Path setup ────────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+RULE_SETS = {
+    "income_cap": {"mandatory": [{"field": "income", "operator": "lt", "value": 200000},
+                                 {"field": "age", "operator": "gte", "value": 18}]},
+    "state_list": {"mandatory": [{"field": "state", "operator": "in", "value": ["bihar", "assam"]},
+                                 {"field": "occupation", "operator": "contains", "value": "farm"}]},
+    "odd": {"mandatory": [{"field": "age", "operator": "eq", "value": 40},
+                          {"field": "income", "operator": "between", "value": 1}]},
+    "open": {},
+}
+
+
+@pytest.fixture
+def profile_db(tmp_path):
+    from app.models.models import db
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'profiles.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield db
+
+
+class TestEligibilityMatrix:
+    def test_matches_compiled_rules_cell_for_cell(self):
+        from app.services.eligibility_matrix import eligibility_matrix
+        from app.services.rules_engine import compile_rules
+        rng = random.Random(7)
+        values = {
+            "income": [None, 0, 150000, 250000, "1,50,000 rupees", "unknown", 199999.5],
+            "age": [None, 17, 18, 40, "40", "forty"],
+            "state": [None, "bihar", "goa", "assam"],
+            "occupation": [None, "farmer", "mason", ["farm"]],
+        }
+        profiles = [{f: rng.choice(v) for f, v in values.items() if rng.random() > 0.1} for _ in range(500)]
+        matrix = eligibility_matrix(profiles, RULE_SETS)
+        assert matrix.eligible.shape == (500, len(RULE_SETS))
+        for i, profile in enumerate(profiles):
+            for j, sid in enumerate(matrix.scheme_ids):
+                eligible, score = compile_rules(RULE_SETS[sid]).check(profile)
+                assert (matrix.eligible[i, j], matrix.score[i, j]) == (eligible, pytest.approx(score)), (profile, sid)
+
+    def test_complete_and_cell(self):
+        from app.services.eligibility_matrix import eligibility_matrix
+        matrix = eligibility_matrix([{"income": 100000, "age": 30}, {"income": 100000}], RULE_SETS)
+        assert matrix.cell(0, "income_cap") == {"eligible": True, "score": 1.0, "complete": True}
+        assert matrix.cell(1, "income_cap") == {"eligible": False, "score": 0.5, "complete": False}
+        assert matrix.eligible_schemes(0) == ["income_cap", "open"]
+
+
+class TestProfileRecord:
+    def test_record_covers_real_rule_fields(self):
+        from agents.rules_agent import SCHEME_RULES
+        from app.models.models import UserProfile
+        from app.services.eligibility_matrix import catalog_eligibility, eligibility_matrix, profile_record
+        record = profile_record(UserProfile(id="u1", age=40, annual_income=120000, land_holding_acres=2.0,
+                                            has_bank_account=True, location_state="Bihar"))
+        assert record["land_area_acres"] == 2.0 and record["land_hectares"] == pytest.approx(0.8094, abs=1e-4)
+        agent = eligibility_matrix([record], {"pm_kisan": SCHEME_RULES["pm_kisan"]})
+        assert agent.cell(0, "pm_kisan") == {"eligible": True, "score": 1.0, "complete": True}
+        catalog = catalog_eligibility([record], ["pm_kisan"])
+        assert catalog.cell(0, "pm_kisan") == {"eligible": True, "score": 1.0, "complete": True}
+
+
+class TestProactiveAlerts:
+    def test_matrix_over_many_profiles(self):
+        from app.services.civic_infra_service import CivicInfraService, _PROACTIVE_SCHEMES
+        ids = [rule["id"] for rule in _PROACTIVE_SCHEMES]
+        matrix = CivicInfraService.proactive_matrix([
+            {"state": "Uttar Pradesh", "occupation": "farmer", "income": 120000},
+            {"state": "Tamil Nadu", "occupation": "Farmer", "income": 450000, "land_acres": 2.5},
+            {"state": "Karnataka", "occupation": "engineer", "income": 900000},
+            {},
+        ])
+        hits = [[ids[j] for j, hit in enumerate(row) if hit] for row in matrix]
+        assert hits[0] == ["pm_kisan", "e_shram", "ayushman", "pmay_gramin"]
+        assert hits[1] == ["pm_kisan", "solar_pump", "e_shram", "tn_farmer"]
+        assert hits[2] == []
+        assert hits[3] == ["ayushman", "pmay_gramin"]      # missing income counts as 0, missing state as ""
+
+    def test_outreach_batches_stored_profiles(self, profile_db):
+        from app.models.models import UserProfile
+        from app.services.civic_infra_service import CivicInfraService
+        profile_db.session.add_all([
+            UserProfile(id="u1", phone_e164="+911", occupation="farmer", annual_income=90000,
+                        location_state="Bihar", preferred_language="en"),
+            UserProfile(id="u2", occupation="engineer", annual_income=900000, location_state="Goa"),
+            UserProfile(id="u3", occupation="mason", annual_income=400000, location_state="Kerala"),
+        ])
+        profile_db.session.commit()
+        service = CivicInfraService.__new__(CivicInfraService)   # outreach needs no alert log
+        out = list(service.outreach_alerts(batch_size=2))
+        assert [o["user_id"] for o in out] == ["u1", "u3"]
+        assert out[0]["phone"] == "+911" and out[0]["language"] == "en"
+        assert out[0]["alerts"][0]["sms_alert"].startswith("JanSathi Alert: You qualify for PM-KISAN")
+        assert [a["id"] for a in out[1]["alerts"]] == ["e_shram"]
+
+
+class TestSchemeFeedVerdicts:
+    def test_yaml_cards_get_rules_verdict(self):
+        from app.services.scheme_catalog import get_scheme_catalog
+        from app.services.scheme_feed_service import SchemeFeedService
+        catalog = get_scheme_catalog()
+        sid = next(s for s in catalog.schemes() if catalog.compiled_rules(s).has_rules)
+        cards = [{"id": sid, "title": "x", "source": "yaml"}, {"id": "db_row", "title": "y", "source": "database"}]
+        verdicts = SchemeFeedService._rule_verdicts(cards, {"income": 1})
+        assert set(verdicts) == {sid}
+        assert SchemeFeedService._rule_verdicts(cards, None) == {}
+
+        card = SchemeFeedService()._personalize_scheme(
+            cards[0], None, {"eligible": True, "score": 1.0, "complete": True})
+        assert card["rules_eligible"] is True
+        assert card["why_recommended"][0] == "Meets the published eligibility rules"
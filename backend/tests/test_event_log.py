@@ -0,0 +1,53 @@
+"""
+tests/test_event_log.py — Append-only JSONL event logs
+=======================================================
+Tests cover:
+  1. Appends are queued and written by flush, with O(1) counts
+  2. Size-based rotation keeps the counter across segments
+  3. Legacy JSON array import
+"""
+import sys
+import os
+import json
+
+# ── Path setup ────────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+class TestEventLog:
+    def _log(self, tmp_path, **kw):
+        from app.services.event_log import EventLog
+        kw.setdefault("flush_seconds", 3600)   # keep the background flusher idle
+        return EventLog(str(tmp_path / "events.jsonl"), **kw)
+
+    def test_append_is_deferred_until_flush(self, tmp_path):
+        log = self._log(tmp_path)
+        for i in range(3):
+            log.append({"n": i})
+        assert log.count() == 3
+        assert not os.path.exists(log.path)
+        assert log.flush() == 3
+        with open(log.path, encoding="utf-8") as f:
+            assert [json.loads(line)["n"] for line in f] == [0, 1, 2]
+        assert log.tail(2) == [{"n": 1}, {"n": 2}]
+        # A fresh instance reads the count from the index, not the log
+        assert self._log(tmp_path).count() == 3
+
+    def test_rotation_keeps_total_count(self, tmp_path):
+        log = self._log(tmp_path, max_bytes=64, backups=2)
+        for i in range(20):
+            log.append({"n": i, "pad": "x" * 20})
+            log.flush()
+        assert os.path.exists(log.path + ".1") and os.path.exists(log.path + ".2")
+        assert not os.path.exists(log.path + ".3")
+        assert log.count() == 20
+        assert log.tail(1) == [{"n": 19, "pad": "x" * 20}]
+
+    def test_legacy_json_imported_once(self, tmp_path):
+        legacy = tmp_path / "events.json"
+        legacy.write_text(json.dumps([{"id": "a"}, {"id": "b"}]))
+        log = self._log(tmp_path, legacy_json_path=str(legacy))
+        assert log.count() == 2
+        log.append({"id": "c"})
+        log.flush()
+        assert self._log(tmp_path, legacy_json_path=str(legacy)).count() == 3
@@ -5,8 +5,9 @@ Tests cover:
   1. JanSathiState TypedDict structure
   2. Nova model constants
   3. Individual agent nodes (unit tests with mocked services)
-  4. Supervisor pipeline smoke test
+  4. Supervisor pipeline smoke test + per-node tracing
   5. AgentCore tool dispatch
+  6. Offline AgentCore emulator
 """
 import json
 import sys
@@ -161,6 +162,115 @@ class TestIntentAgent:
         assert "application_id" in slots
 
 
+class TestTwoStageIntentClassifier:
+    def _clf(self, bedrock_result=None):
+        from app.services.intent_service import TwoStageIntentClassifier
+        bedrock = MagicMock()
+        bedrock.classify.return_value = bedrock_result or {
+            "intent": "grievance", "confidence": 0.9, "scheme_hint": "pm_kisan",
+        }
+        return TwoStageIntentClassifier(threshold=0.85, cache_size=8, bedrock=bedrock), bedrock
+
+    def test_confident_rule_short_circuits(self):
+        clf, bedrock = self._clf()
+        result = clf.classify("PM Kisan apply karna hai", "hi")
+        assert result["intent"] == "apply"
+        assert result["scheme_hint"] == "pm_kisan"
+        bedrock.classify.assert_not_called()
+        assert clf.stats()["rules"] == 1
+
+    def test_ambiguous_utterance_goes_to_bedrock(self):
+        clf, bedrock = self._clf()
+        # Scheme keyword + grievance keyword → rival penalty drops below threshold
+        result = clf.classify("pm kisan payment nahi aaya, pending hai", "hi")
+        assert result["intent"] == "grievance"
+        bedrock.classify.assert_called_once()
+        assert clf.stats()["bedrock"] == 1
+
+    def test_cache_by_normalised_utterance(self):
+        clf, bedrock = self._clf()
+        clf.classify("hello there", "hi")
+        clf.classify("  Hello   THERE ", "hi")
+        assert bedrock.classify.call_count == 1
+        stats = clf.stats()
+        assert stats["cache"] == 1
+        assert stats["bedrock_ratio"] == 0.5
+
+    def test_bedrock_fallback_is_not_cached(self):
+        clf, bedrock = self._clf({"intent": "info", "confidence": 0.5, "source": "rules_fallback"})
+        clf.classify("hello there", "hi")
+        clf.classify("hello there", "hi")
+        assert bedrock.classify.call_count == 2           # retried once Bedrock is back
+        stats = clf.stats()
+        assert stats["bedrock_fallback"] == 2 and stats["bedrock"] == 0 and stats["cache_size"] == 0
+
+    def test_rival_keywords_lower_rule_confidence(self):
+        from app.services.intent_service import RuleBasedIntentClassifier
+        clf = RuleBasedIntentClassifier()
+        clean = clf.classify("pm kisan apply")["confidence"]
+        mixed = clf.classify("pm kisan apply status")["confidence"]
+        assert mixed < clean
+
+    def test_stats_follow_the_configured_classifier(self, monkeypatch):
+        from app.services.intent_service import IntentService, get_active_intent_classifier
+        from app.services.metrics_exporter import _cache_ratios
+        monkeypatch.setenv("INTENT_CLASSIFIER", "bedrock")
+        assert get_active_intent_classifier() is IntentService().classifier
+        assert "intent" in _cache_ratios()
+        for mode in ("bedrock_only", "rule_based"):
+            monkeypatch.setenv("INTENT_CLASSIFIER", mode)
+            assert get_active_intent_classifier() is None
+            assert "intent" not in _cache_ratios()
+
+
+class TestLocalIntentModel:
+    def _model(self):
+        from app.services.intent_model import NaiveBayesIntentModel
+        texts = ["apply for pm kisan", "want to register", "payment not received",
+                 "complaint about rejection", "check my application status", "track case id"]
+        labels = ["apply", "apply", "grievance", "grievance", "track", "track"]
+        return NaiveBayesIntentModel.fit(texts, labels)
+
+    def test_fit_and_classify_many(self):
+        model = self._model()
+        results = model.classify_many(["pm kisan apply", "payment nahi received", "status check"])
+        assert [r[0] for r in results] == ["apply", "grievance", "track"]
+        assert all(0.0 < conf <= 1.0 for _, conf in results)
+
+    def test_npz_round_trip(self, tmp_path):
+        from app.services.intent_model import NaiveBayesIntentModel
+        model = self._model()
+        path = str(tmp_path / "intent_model.npz")
+        model.save(path)
+        loaded = NaiveBayesIntentModel.load(path)
+        assert loaded.classify("track my case") == model.classify("track my case")
+
+    def test_batch_matches_single(self):
+        model = self._model()
+        queries = ["apply", "", "complaint"]
+        batch = model.classify_many(queries)
+        assert batch == [model.classify(q) for q in queries]
+
+    def test_audit_turns_bootstrap_labels(self, tmp_path):
+        from app.services.intent_model import audit_examples
+        path = tmp_path / "audit.jsonl"
+        rows = [
+            {"record_type": "turn", "payload": {"transcript": "kisan apply", "intent": "APPLY_SCHEME", "intent_confidence": 0.9}},
+            {"record_type": "turn", "payload": {"transcript": "umm", "intent": "INFORMATION", "intent_confidence": 0.4}},
+            {"record_type": "consent", "payload": {}},
+        ]
+        path.write_text("\n".join(json.dumps(r) for r in rows))
+        assert audit_examples(str(path)) == [("kisan apply", "apply")]
+
+    def test_local_model_classifier_shape(self):
+        from app.services.intent_service import LocalModelIntentClassifier
+        clf = LocalModelIntentClassifier(model=self._model())
+        result = clf.classify("PM Kisan apply karna hai", "hi")
+        assert result["intent"] == "apply"
+        assert result["scheme_hint"] == "pm_kisan"
+        assert len(clf.classify_many(["a", "b"])) == 2
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # RULES AGENT TESTS (deterministic — no mocking needed)
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -319,6 +429,67 @@ class TestAgentCoreTools:
         assert "Unknown tool" in result["error"]
 
 
+    def test_dispatch_coerces_string_params(self):
+        """Return Control sends strings; dict/bool params must still work."""
+        from agentcore.tools import dispatch_tool
+        result = dispatch_tool("validate_eligibility", {
+            "slots": json.dumps({"land_holding_acres": 2}),
+            "scheme_hint": "pm_kisan",
+        })
+        assert result["success"] is True
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# AGENTCORE EMULATOR (offline invoke_agent contract)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestAgentCoreEmulator:
+    def test_info_turn_runs_real_tools(self):
+        from agentcore.invoke import invoke_agentcore
+        from agentcore.emulator import EmulatedAgentRuntime
+        result = invoke_agentcore(
+            "list schemes", session_id="emu-001", language="en",
+            client=EmulatedAgentRuntime(),
+        )
+        tools = [t["tool"] for t in result["thoughts"] if t["type"] == "tool_call"]
+        assert tools == ["classify_intent", "retrieve_knowledge"]
+        assert "Available government schemes" in result["response"]
+        assert result["mode"] == "agentcore"
+
+    def test_apply_turn_reaches_risk_decision(self):
+        from agentcore.invoke import invoke_agentcore
+        from agentcore.emulator import EmulatedAgentRuntime
+        result = invoke_agentcore(
+            "PM Kisan apply karna hai", session_id="emu-002", language="en",
+            slots={"land_holding_acres": 2}, client=EmulatedAgentRuntime(),
+        )
+        tools = [t["tool"] for t in result["thoughts"] if t["type"] == "tool_call"]
+        assert tools == ["classify_intent", "validate_eligibility", "compute_risk_score"]
+        assert "Decision:" in result["response"]
+
+    def test_stale_invocation_id_rejected(self):
+        from botocore.exceptions import ClientError
+        from agentcore.emulator import EmulatedAgentRuntime
+        rt = EmulatedAgentRuntime()
+        with pytest.raises(ClientError):
+            rt.invoke_agent(sessionId="emu-003", sessionState={"invocationId": "nope"})
+
+    def test_env_flag_enables_emulator(self, monkeypatch):
+        from agentcore import invoke
+        monkeypatch.setenv("AGENTCORE_EMULATOR", "true")
+        monkeypatch.setattr(invoke, "AGENT_ID", "")
+        result = invoke.invoke_agentcore("list schemes", session_id="emu-004", language="en")
+        assert "error" not in result
+
+    def test_load_test_reports_tail_latency(self):
+        from agentcore.emulator import run_load_test
+        report = run_load_test(utterances=["list schemes"], iterations=10, concurrency=2)
+        assert report["turns"] == 10
+        assert report["errors"] == 0
+        assert report["tool_calls"] == 20
+        assert report["p50_ms"] <= report["p99_ms"] <= report["max_ms"]
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # SUPERVISOR PIPELINE SMOKE TEST (fallback mode — no LangGraph required)
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -359,6 +530,37 @@ class TestSupervisorPipeline:
         assert "session_id" in result
         assert "consent_given" in result
 
+    def test_fallback_pipeline_records_node_spans(self, tmp_path):
+        """Every node that ran leaves a span; the spans export as a Chrome trace."""
+        from agents.supervisor import run_pipeline_fallback
+        from agents.tracing import node_timings, chrome_trace, export_chrome_trace
+        with patch("agents.nova_client.get_bedrock_client", side_effect=RuntimeError("offline")):
+            result = run_pipeline_fallback(session_id="smoke-003", user_query="what is PM Kisan?",
+                                           channel="web", language="en")
+        nodes = [s["node"] for s in result["trace_spans"]]
+        assert nodes[:3] == ["telecom_agent", "intent_agent", "rag_agent"]
+        assert set(node_timings(result)) == set(nodes)
+        trace = chrome_trace(result)
+        assert [e["name"] for e in trace["traceEvents"]] == nodes
+        assert trace["traceEvents"][0]["ts"] == 0 and all(e["ph"] == "X" for e in trace["traceEvents"])
+        path = export_chrome_trace(result, str(tmp_path))
+        assert json.load(open(path))["otherData"]["session_id"] == "smoke-003"
+
+    def test_traced_node_marks_errors(self):
+        from agents.tracing import traced
+
+        def broken(state):
+            raise ValueError("boom")
+
+        state = {"trace_spans": []}
+        with patch("app.services.telemetry_service.TelemetryService.emit") as emit:
+            with pytest.raises(ValueError):
+                traced("broken", broken)(state)
+        assert state["trace_spans"][0]["node"] == "broken"
+        assert state["trace_spans"][0]["error"] == "ValueError"
+        assert emit.call_args.args[0] == "AgentNodeLatencyMs"
+        assert emit.call_args.args[2] == {"Node": "broken"}
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,124 @@
+"""
+tests/test_resilience.py — Circuit breaker + adaptive timeout tests
+====================================================================
+Tests cover:
+  1. Breaker state transitions (closed → open → half-open → closed)
+  2. p99-derived read timeouts, picked up by services on their next call
+  3. Fail-fast fallback in nova_converse
+"""
+import sys
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+
+# ── Path setup ────────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CIRCUIT BREAKER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestCircuitBreaker:
+    def _breaker(self, **kw):
+        from app.core.resilience import CircuitBreaker
+        params = dict(window=10, min_calls=4, error_threshold=0.5, cooldown_s=60,
+                      timeouts=(1.0, 10.0, 1.0, 12.0))
+        params.update(kw)
+        return CircuitBreaker("test", **params)
+
+    def test_opens_after_error_threshold(self):
+        from app.core.resilience import OPEN, CircuitOpenError
+        b = self._breaker()
+        for ok in (True, False, True, False):
+            b.record(ok, 100)
+        assert b.state == OPEN
+        with pytest.raises(CircuitOpenError):
+            b.call(lambda: "never")
+        assert b.snapshot()["short_circuited"] == 1
+
+    def test_stays_closed_below_min_calls(self):
+        from app.core.resilience import CLOSED
+        b = self._breaker()
+        b.record(False, 100)
+        b.record(False, 100)
+        assert b.state == CLOSED
+
+    def test_half_open_probe_closes_on_success(self):
+        from app.core.resilience import CLOSED, HALF_OPEN
+        b = self._breaker(cooldown_s=0)
+        for _ in range(4):
+            b.record(False, 50)
+        assert b.state == HALF_OPEN
+        assert b.allow() is True
+        assert b.allow() is False          # only one probe in flight
+        b.record(True, 50)
+        assert b.state == CLOSED
+
+    def test_failed_call_is_recorded_and_reraised(self):
+        b = self._breaker()
+
+        def boom():
+            raise RuntimeError("down")
+
+        with pytest.raises(RuntimeError):
+            b.call(boom)
+        assert b.snapshot()["error_rate"] == 1.0
+
+
+class TestAdaptiveTimeouts:
+    def test_default_until_enough_samples(self):
+        from app.core.resilience import CircuitBreaker
+        b = CircuitBreaker("t", min_calls=5, timeouts=(1.0, 10.0, 1.0, 12.0))
+        b.record(True, 200)
+        assert b.read_timeout() == 10.0
+
+    def test_timeout_tracks_p99_with_clamp(self):
+        from app.core.resilience import CircuitBreaker
+        b = CircuitBreaker("t", window=100, min_calls=5, timeouts=(1.0, 10.0, 1.0, 12.0))
+        for _ in range(20):
+            b.record(True, 1000)
+        assert b.read_timeout() == 1.5       # 1000ms × 1.5 headroom
+        for _ in range(100):
+            b.record(True, 20000)
+        assert b.read_timeout() == 12.0      # clamped to max
+
+    def test_services_pick_up_rebuilt_clients(self):
+        from app.services.polly_service import PollyService
+        old, new = MagicMock(), MagicMock()
+        with patch("app.services.polly_service.adaptive_client", side_effect=[old, old, new]), \
+             patch("app.services.polly_service.boto3"):
+            svc = PollyService()
+            assert svc.polly_client is old
+            assert svc.polly_client is new     # timeout drifted → adaptive_client rebuilt it
+
+    def test_health_snapshot_lists_dependencies(self):
+        from app.core.resilience import breaker_states
+        states = breaker_states()
+        for dep in ("bedrock", "kendra", "polly", "transcribe"):
+            assert dep in states
+            assert "state" in states[dep]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FAIL-FAST FALLBACK
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestFailFast:
+    def test_nova_converse_skips_client_when_open(self):
+        from app.core import resilience
+        from agents.nova_client import nova_converse, build_user_message, _offline_fallback
+
+        breaker = resilience.CircuitBreaker("bedrock", min_calls=1, cooldown_s=60)
+        breaker.record(False, 10)
+        mock_bedrock = MagicMock()
+        with patch.dict(resilience._breakers, {"bedrock": breaker}), \
+             patch("agents.nova_client.get_bedrock_client", return_value=mock_bedrock):
+            text = nova_converse([build_user_message("hi")])
+
+        mock_bedrock.converse.assert_not_called()
+        assert text == _offline_fallback([])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
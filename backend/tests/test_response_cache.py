@@ -0,0 +1,93 @@
+"""
+tests/test_response_cache.py — SQL-backed Bedrock response cache
+=================================================================
+Tests cover:
+  1. Hits are counted in memory and flushed in one batch
+  2. set() upserts in place
+  3. Expired rows are purged by a set-based DELETE
+  4. Pending hits are written at exit
+"""
+import sys
+import os
+import pytest
+from flask import Flask
+
+# ── Path setup ────────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.fixture
+def cache_app(tmp_path):
+    from app.models.models import db
+    import app.services.cache_service  # noqa: F401 — registers CacheEntry before create_all
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'cache.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield db
+
+
+def _row(db, cache):
+    from app.services.cache_service import CacheEntry
+    return db.session.get(CacheEntry, cache._cache_key("pm kisan", "hi"), populate_existing=True)
+
+
+class TestResponseCache:
+    def test_hits_are_batched_not_committed_per_read(self, cache_app):
+        from sqlalchemy import event
+        from app.services.cache_service import ResponseCache
+        cache = ResponseCache(hit_flush_seconds=3600)
+        cache.set("PM Kisan", "hi", "answer")
+        statements = []
+        listener = lambda conn, cur, stmt, *a: statements.append(stmt.split()[0].upper())
+        event.listen(cache_app.engine, "before_cursor_execute", listener)
+        try:
+            for n in range(5):
+                assert cache.get("pm kisan ", "hi")["hit_count"] == n + 1
+        finally:
+            event.remove(cache_app.engine, "before_cursor_execute", listener)
+        assert set(statements) == {"SELECT"}
+        assert _row(cache_app, cache).hit_count == 0
+
+        assert cache.flush_hits() == 1
+        assert _row(cache_app, cache).hit_count == 5
+        assert cache.get("pm kisan", "hi")["hit_count"] == 6
+        stats = cache.stats()
+        assert stats["total_hits"] == 6 and stats["hit_ratio"] == 1.0
+
+    def test_set_upserts_existing_key(self, cache_app):
+        from app.services.cache_service import ResponseCache
+        cache = ResponseCache()
+        cache.set("PM Kisan", "hi", "old", [{"title": "a"}])
+        cache.set("PM Kisan", "hi", "new")
+        hit = cache.get("PM Kisan", "hi")
+        assert hit["response"] == "new" and hit["sources"] == []
+        assert cache.stats()["total_entries"] == 1
+
+    def test_cleanup_deletes_expired_rows_only(self, cache_app):
+        from app.services.cache_service import ResponseCache
+        expired = ResponseCache(ttl_seconds=-10)
+        for q in ("a", "b", "c"):
+            expired.set(q, "hi", "x")
+        live = ResponseCache()
+        live.set("d", "hi", "x")
+        assert expired.get("a", "hi") is None
+        assert live.cleanup_expired() == 3
+        stats = live.stats()
+        assert stats["total_entries"] == 1 and stats["active_entries"] == 1
+
+    def test_pending_hits_flushed_at_exit(self, cache_app):
+        from unittest.mock import patch
+        from flask import current_app
+        from app.services.cache_service import ResponseCache
+        cache = ResponseCache(hit_flush_seconds=3600)
+        cache.set("PM Kisan", "hi", "answer")
+        with patch("app.services.cache_service.atexit.register") as register:
+            cache.flush_on_exit(current_app._get_current_object())
+            cache.flush_on_exit(current_app._get_current_object())
+        register.assert_called_once()
+        cache.get("pm kisan", "hi")
+        cache.get("pm kisan", "hi")
+        register.call_args.args[0]()                        # what the interpreter runs at exit
+        assert _row(cache_app, cache).hit_count == 2
@@ -0,0 +1,87 @@
+"""
+tests/test_rules_engine.py — Compiled eligibility rules
+========================================================
+Tests cover:
+  1. Verdicts and breakdowns of the compiled evaluator
+  2. Numeric coercion once per profile field
+  3. Lazy breakdown and per-snapshot compilation in the scheme catalog
+  4. Embedded scheme rules compiled once and never re-hashed
+"""
+import sys
+import os
+import pytest
+from unittest.mock import patch
+
+# ── Path setup ────────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+RULES = {"mandatory": [
+    {"field": "income", "operator": "lt", "value": 200000, "label": "Income < 2L", "citation": "G 2.3"},
+    {"field": "income", "operator": "gte", "value": 0, "label": "Income declared"},
+    {"field": "state", "operator": "in", "value": ["bihar", "assam"], "label": "State"},
+    {"field": "age", "operator": "between", "value": 18, "label": "Unknown op"},
+]}
+
+
+class TestCompiledRules:
+    def test_verdict_and_breakdown(self):
+        from app.services.rules_engine import RulesEngine
+        eligible, breakdown, score = RulesEngine().evaluate(
+            {"income": "1,50,000 rupees", "state": "bihar"}, RULES)
+        assert eligible is True and score == 0.75        # unknown operator counts against the score only
+        assert breakdown[0] == {"label": "Income < 2L", "rule": "income lt 200000", "pass": True,
+                                "citation": "G 2.3", "user_value": 150000.0, "required_value": 200000}
+        assert breakdown[3]["rule"] == "Unknown operator: between"
+
+        eligible, breakdown, score = RulesEngine().evaluate({"state": "goa"}, RULES)
+        assert eligible is False and score == 0.0
+        assert breakdown[0]["rule"].startswith("Error:")  # None < 200000
+        assert RulesEngine().evaluate({}, {}) == (True, [{"label": "No rules", "rule": "no_rules",
+                                                           "pass": True, "citation": ""}], 1.0)
+
+    def test_numeric_field_coerced_once(self):
+        from app.services import rules_engine
+        compiled = rules_engine.CompiledRules(RULES)
+        with patch.object(rules_engine, "to_number", wraps=rules_engine.to_number) as coerce:
+            result = compiled.evaluate({"income": "90000", "state": "assam"})
+            assert result.breakdown[1]["pass"]
+        assert compiled.numeric_fields == ("income", "age")
+        assert coerce.call_count == 2                    # two income rules share one coercion
+
+    def test_breakdown_built_only_on_demand(self):
+        from app.services.rules_engine import CompiledRules
+        compiled = CompiledRules(RULES)
+        with patch.object(CompiledRules, "breakdown", wraps=compiled.breakdown) as build:
+            result = compiled.evaluate({"income": 1, "state": "bihar"})
+            assert result.eligible and compiled.check({"income": 1, "state": "x"})[0] is False
+            build.assert_not_called()
+            assert result.breakdown is result.breakdown
+            build.assert_called_once()
+
+    def test_compile_cache_and_catalog(self):
+        from app.services.rules_engine import compile_rules
+        from app.services.scheme_catalog import get_scheme_catalog
+        assert compile_rules(RULES) is compile_rules(RULES)
+        import copy
+        fresh = copy.deepcopy(RULES)                    # e.g. decoded from the DB on every call
+        assert compile_rules(fresh, "s1") is compile_rules(copy.deepcopy(RULES), "s1")
+        fresh["mandatory"] = fresh["mandatory"][:1]     # edited in place → new evaluator
+        assert compile_rules(fresh, "s1").total == 1
+        catalog = get_scheme_catalog()
+        compiled = catalog.compiled_rules("pm_kisan")
+        assert compiled is catalog.compiled_rules("pm_kisan")
+        assert compiled.check({"land_hectares": "1.5", "income_annual": 120000}) == (True, 1.0)
+
+    def test_scheme_rules_precompiled_once(self):
+        from agents.rules_agent import COMPILED_RULES, SCHEME_RULES, compiled_scheme_rules
+        from app.services import rules_engine
+        from app.services.rules_engine import RulesEngine
+        profile = {"age": 40, "land_area_acres": 2, "bank_account_linked": True}
+        with patch.object(rules_engine, "_rules_digest") as digest, \
+             patch.object(rules_engine, "CompiledRules") as compile_cls:
+            for _ in range(3):
+                assert RulesEngine().evaluate(profile, SCHEME_RULES["pm_kisan"], "pm_kisan")[0] is True
+            assert compiled_scheme_rules("pm_kisan") is COMPILED_RULES["pm_kisan"]
+            assert compiled_scheme_rules("no_such_scheme") is COMPILED_RULES["unknown"]
+        digest.assert_not_called()
+        compile_cls.assert_not_called()
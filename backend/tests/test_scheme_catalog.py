@@ -0,0 +1,97 @@
+"""
+tests/test_scheme_catalog.py — Shared scheme catalog
+=====================================================
+Tests cover:
+  1. One parse shared by every consumer
+  2. mtime-based hot reload (and keeping the old snapshot on a bad edit)
+  3. Read-only entries and precompiled slot index / compiled rules
+"""
+import sys
+import os
+import json
+import copy
+import pytest
+from unittest.mock import patch
+
+# ── Path setup ────────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+YAML = """
+schemes:
+  demo:
+    display_name: "Demo"
+    slots:
+      - key: income
+        type: float
+        prompt: "Income?"
+    rules:
+      mandatory:
+        - field: income
+          operator: lt
+          value: {limit}
+          label: "Income limit"
+"""
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    from app.services.scheme_catalog import SchemeCatalog
+    path = tmp_path / "schemes.yaml"
+    path.write_text(YAML.format(limit=100000), encoding="utf-8")
+    return SchemeCatalog(str(path), check_seconds=0)
+
+
+def _touch(path, text):
+    stat = os.stat(path)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestSchemeCatalog:
+    def test_consumers_share_one_parse(self):
+        import yaml
+        from app.services import scheme_catalog
+        from app.services.ivr_service import IVRService
+        from app.services.receipt_service import ReceiptService
+        from agentic_engine.workflow_engine import _load_schemes, _slot_index
+        from agentcore.tools import retrieve_knowledge
+        with patch.object(scheme_catalog, "_catalog", None), \
+             patch("app.services.scheme_catalog.yaml.safe_load", wraps=yaml.safe_load) as parse:
+            assert "pm_kisan" in _load_schemes()
+            assert _slot_index("pm_kisan")[1]["state"]["type"] == "string"
+            assert [s["key"] for s in IVRService()._load_slots("pm_kisan")][0] == "state"
+            ReceiptService().generate_document_checklist("pm_kisan")
+            assert retrieve_knowledge("list schemes")["success"]
+        assert parse.call_count == 1
+
+    def test_hot_reload_on_mtime_change(self, catalog):
+        first = catalog.snapshot()
+        assert catalog.compiled_rules("demo").check({"income": 150000})[0] is False
+        assert catalog.snapshot() is first                  # unchanged file → same snapshot
+        _touch(catalog.path, YAML.format(limit=250000))
+        assert catalog.compiled_rules("demo").check({"income": 150000})[0] is True
+        assert catalog.snapshot().version != first.version
+
+    def test_bad_edit_keeps_previous_snapshot(self, catalog):
+        good = catalog.snapshot()
+        _touch(catalog.path, "schemes: [unclosed")
+        assert catalog.snapshot() is good
+        assert catalog.get("demo")["display_name"] == "Demo"
+
+    def test_entries_are_read_only_but_serialisable(self, catalog):
+        scheme = catalog.get("demo")
+        with pytest.raises(TypeError):
+            scheme["display_name"] = "x"
+        with pytest.raises(TypeError):
+            catalog.slots("demo").append({})
+        assert isinstance(scheme, dict) and isinstance(catalog.slots("demo"), list)
+        assert json.loads(json.dumps(scheme))["slots"][0]["key"] == "income"
+        mutable = copy.deepcopy(scheme)
+        mutable["slots"].append({"key": "age"})             # thawed copy is a plain dict
+        assert len(catalog.slots("demo")) == 1
+
+    def test_unknown_scheme_is_empty(self, catalog):
+        assert catalog.get("nope") is None
+        assert catalog.slots("nope") == [] and not catalog.compiled_rules("nope").has_rules
+        assert catalog.slot_index("nope")[1] == {}
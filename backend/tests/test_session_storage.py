@@ -0,0 +1,496 @@
+"""
+tests/test_session_storage.py — Session storage backend tests
+=============================================================
+Tests cover:
+  1. SQLite-WAL session storage (round trip, upsert, legacy import, concurrency)
+  2. Batched mutations: SessionManager.patch + request-scoped unit of work
+  3. DynamoDB partial updates, versioning and Decimal conversion
+  4. Write-behind LRU session cache with version-checked reads
+  5. Process-wide SessionManager with health-checked lazy init
+  6. Compact session encoding + slot schema references
+  7. TTL sweeper: batched expiry, compaction, HITL/IVR pruning, histograms
+"""
+import sys
+import os
+import json
+import time
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+
+# ── Path setup ────────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _write_session(db_path, worker):
+    from agentic_engine.storage import SQLiteSessionStorage
+    storage = SQLiteSessionStorage(db_path)
+    storage.initialize()
+    for i in range(20):
+        storage.put_session(f"p{worker}-{i}", {"current_state": "START", "data": {"i": i}})
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SQLITE SESSION STORAGE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSQLiteSessionStorage:
+    def _storage(self, tmp_path, **kw):
+        from agentic_engine.storage import SQLiteSessionStorage
+        storage = SQLiteSessionStorage(str(tmp_path / "sessions.db"), **kw)
+        storage.initialize()
+        return storage
+
+    def test_round_trip_and_upsert(self, tmp_path):
+        storage = self._storage(tmp_path)
+        assert storage.get_session("missing") is None
+        storage.put_session("s1", {"current_state": "START", "data": {"x": 1.5}})
+        storage.put_session("s1", {"current_state": "COLLECT_SLOTS", "data": {"x": 2}})
+        session = storage.get_session("s1")
+        assert session.pop("version") == 2
+        assert session == {"current_state": "COLLECT_SLOTS", "data": {"x": 2}}
+        assert list(storage.load()) == ["s1"]
+
+    def test_uses_wal_journal(self, tmp_path):
+        storage = self._storage(tmp_path)
+        mode = storage._conn().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode.lower() == "wal"
+
+    def test_imports_legacy_json_once(self, tmp_path):
+        legacy = tmp_path / "sessions.json"
+        legacy.write_text(json.dumps({"old": {"current_state": "START", "data": {}}}))
+        storage = self._storage(tmp_path, legacy_json_path=str(legacy))
+        assert storage.get_session("old")["current_state"] == "START"
+        storage.put_session("old", {"current_state": "END", "data": {}})
+        storage.initialize()                      # second boot must not re-import
+        assert storage.get_session("old")["current_state"] == "END"
+
+    def test_session_manager_on_sqlite(self, tmp_path):
+        from agentic_engine.session_manager import SessionManager
+        from agentic_engine.storage import SQLiteSessionStorage
+        sm = SessionManager(SQLiteSessionStorage(str(tmp_path / "sessions.db")))
+        sm.create_session("s1")
+        sm.update_data("s1", "_channel", "web")
+        assert sm.get_session("s1")["data"]["_channel"] == "web"
+        assert "s1" in sm.list_all_sessions()
+
+    def test_concurrent_threads_do_not_lose_sessions(self, tmp_path):
+        storage = self._storage(tmp_path)
+
+        def writer(n):
+            for i in range(25):
+                storage.put_session(f"t{n}-{i}", {"data": {"i": i}})
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(storage.load()) == 100
+
+    def test_concurrent_processes_do_not_lose_sessions(self, tmp_path):
+        import multiprocessing
+        db_path = str(tmp_path / "sessions.db")
+        procs = [multiprocessing.Process(target=_write_session, args=(db_path, n)) for n in range(3)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(30)
+        from agentic_engine.storage import SQLiteSessionStorage
+        assert len(SQLiteSessionStorage(db_path).load()) == 60
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BATCHED MUTATIONS (patch + unit of work)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _counting_storage():
+    """In-memory BaseSessionStorage that counts round trips."""
+    from agentic_engine.storage import BaseSessionStorage
+
+    class CountingStorage(BaseSessionStorage):
+        def __init__(self):
+            self.sessions, self.gets, self.puts, self.patches = {}, 0, 0, []
+
+        def initialize(self):
+            pass
+
+        def get_session(self, session_id):
+            self.gets += 1
+            return json.loads(json.dumps(self.sessions[session_id])) if session_id in self.sessions else None
+
+        def put_session(self, session_id, data):
+            self.puts += 1
+            self.sessions[session_id] = json.loads(json.dumps(data))
+
+        def patch_session(self, session_id, data, state_changed, data_keys):
+            self.patches.append((state_changed, set(data_keys)))
+            super().patch_session(session_id, data, state_changed, data_keys)
+
+    return CountingStorage()
+
+
+class TestSessionUnitOfWork:
+    def test_patch_is_one_read_one_write(self):
+        from agentic_engine.session_manager import SessionManager
+        storage = _counting_storage()
+        sm = SessionManager(storage)
+        sm.create_session("s1")
+        storage.gets = storage.puts = 0
+        sm.patch("s1", state="COLLECT_SLOTS", data={"_scheme": "pm_kisan", "_pending_slots": ["a"]})
+        assert (storage.gets, storage.puts) == (1, 1)
+        assert storage.patches[-1] == (True, {"_scheme", "_pending_slots"})
+        assert storage.sessions["s1"]["current_state"] == "COLLECT_SLOTS"
+
+    def test_patch_rejects_invalid_transition(self):
+        from agentic_engine.session_manager import SessionManager
+        sm = SessionManager(_counting_storage())
+        sm.create_session("s1")
+        with pytest.raises(ValueError):
+            sm.patch("s1", state="COMPLETED", data={"x": 1})
+        with pytest.raises(KeyError):
+            sm.patch("missing", data={"x": 1})
+
+    def test_unit_of_work_loads_once_and_writes_once(self):
+        from agentic_engine.session_manager import SessionManager
+        storage = _counting_storage()
+        sm = SessionManager(storage)
+        with sm.unit_of_work() as uow:
+            sm.create_session("s1")
+            sm.update_data("s1", "_user_id", "u1")
+            sm.update_data("s1", "_channel", "ivr")
+            sm.update_state("s1", "COLLECT_SLOTS")
+            assert storage.puts == 0
+            assert sm.get_session("s1")["data"]["_channel"] == "ivr"
+        assert (storage.gets, storage.puts) == (0, 1)
+        assert uow.writes == 1
+        assert storage.sessions["s1"]["data"] == {"_user_id": "u1", "_channel": "ivr"}
+
+    def test_unit_of_work_discards_on_error(self):
+        from agentic_engine.session_manager import SessionManager
+        storage = _counting_storage()
+        sm = SessionManager(storage)
+        with pytest.raises(RuntimeError):
+            with sm.unit_of_work():
+                sm.create_session("s1")
+                raise RuntimeError("boom")
+        assert "s1" not in storage.sessions
+
+    def test_apply_workflow_turn_is_batched(self):
+        from agentic_engine.session_manager import SessionManager
+        from agentic_engine.workflow_engine import AgenticWorkflowEngine
+        storage = _counting_storage()
+        engine = AgenticWorkflowEngine(SessionManager(storage))
+        result = engine.handle_input("s1", "start_apply:pm_kisan")
+        assert result["current_state"] == "COLLECT_SLOTS"
+        assert (storage.gets, storage.puts) == (1, 1)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DYNAMODB PARTIAL UPDATES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestDynamoDBSessionStorage:
+    def _storage(self):
+        from agentic_engine.storage import DynamoDBStorage
+        storage = DynamoDBStorage("JanSathi-Sessions", "us-east-1")
+        storage.table = MagicMock()
+        return storage
+
+    def _conflict(self):
+        from botocore.exceptions import ClientError
+        return ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem")
+
+    def test_decimal_conversion_round_trip(self):
+        from decimal import Decimal
+        from agentic_engine.storage import _to_dynamo, _from_dynamo
+        value = {"land": 1.2, "age": 40, "tags": [0.5, "x"], "ok": True}
+        dyn = _to_dynamo(value)
+        assert dyn["land"] == Decimal("1.2") and dyn["tags"][0] == Decimal("0.5")
+        assert _from_dynamo(dyn) == value
+        assert isinstance(_from_dynamo(Decimal("3")), int)
+
+    def test_get_session_returns_native_types_and_version(self):
+        from decimal import Decimal
+        storage = self._storage()
+        storage.table.get_item.return_value = {"Item": {
+            "session_id": "s1", "version": Decimal("3"),
+            "data": {"current_state": "START", "data": {"land": Decimal("1.5")}},
+        }}
+        session = storage.get_session("s1")
+        assert session == {"current_state": "START", "data": {"land": 1.5}, "version": 3}
+
+    def test_patch_updates_only_changed_attributes(self):
+        from decimal import Decimal
+        storage = self._storage()
+        session = {"current_state": "COLLECT_SLOTS", "data": {"land": 2.5, "big": "x" * 1000}, "version": 3}
+        storage.patch_session("s1", session, True, {"land"})
+        kwargs = storage.table.update_item.call_args.kwargs
+        assert "#d.#cs = :cs" in kwargs["UpdateExpression"]
+        assert kwargs["ExpressionAttributeNames"]["#k0"] == "land"
+        assert kwargs["ExpressionAttributeValues"][":v0"] == Decimal("2.5")
+        assert "big" not in str(kwargs["ExpressionAttributeValues"])
+        assert kwargs["ConditionExpression"] == "#v = :expected"
+        assert session["version"] == 4
+        storage.table.put_item.assert_not_called()
+
+    def test_stale_version_raises_conflict(self):
+        from agentic_engine.storage import SessionConflictError
+        storage = self._storage()
+        storage.table.update_item.side_effect = self._conflict()
+        with pytest.raises(SessionConflictError):
+            storage.patch_session("s1", {"current_state": "START", "data": {"x": 1}, "version": 1}, False, {"x"})
+
+    def test_put_session_strips_version_and_is_conditional(self):
+        storage = self._storage()
+        session = {"current_state": "START", "data": {}, "version": 2}
+        storage.put_session("s1", session)
+        kwargs = storage.table.put_item.call_args.kwargs
+        assert "version" not in kwargs["Item"]["data"]
+        assert kwargs["Item"]["version"] == 3
+        assert kwargs["ExpressionAttributeValues"] == {":expected": 2}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SESSION CACHE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSessionCache:
+    def _instance(self, db_path, trust_seconds=60.0, max_entries=16):
+        """One app instance: its own cache in front of the shared SQLite file."""
+        from agentic_engine.session_cache import CachedSessionStorage, SessionCache
+        from agentic_engine.session_manager import SessionManager
+        from agentic_engine.storage import SQLiteSessionStorage
+        cache = SessionCache(max_entries=max_entries, trust_seconds=trust_seconds)
+        return SessionManager(CachedSessionStorage(SQLiteSessionStorage(db_path), cache))
+
+    def test_reads_served_from_memory(self, tmp_path):
+        sm = self._instance(str(tmp_path / "s.db"))
+        sm.create_session("s1")
+        sm.update_data("s1", "lang", "hi")
+        sm.storage.backend.get_session = MagicMock(side_effect=AssertionError("should hit cache"))
+        assert sm.get_session("s1")["data"]["lang"] == "hi"
+        assert sm.storage.cache.stats()["hits"] >= 2
+
+    def test_cached_copy_is_isolated_from_callers(self, tmp_path):
+        sm = self._instance(str(tmp_path / "s.db"))
+        sm.create_session("s1")
+        sm.get_session("s1")["data"]["leak"] = True
+        assert "leak" not in sm.get_session("s1")["data"]
+
+    def test_version_check_detects_other_instance_write(self, tmp_path):
+        db = str(tmp_path / "s.db")
+        a = self._instance(db, trust_seconds=0)
+        b = self._instance(db, trust_seconds=0)
+        a.create_session("s1")
+        assert b.get_session("s1")["current_state"] == "START"
+        b.get_session("s1")
+        assert b.storage.cache.stats()["revalidated"] == 1
+        a.update_state("s1", "COLLECT_SLOTS")
+        assert b.get_session("s1")["current_state"] == "COLLECT_SLOTS"
+        assert b.storage.cache.stats()["stale"] == 1
+
+    def test_stale_entry_cannot_overwrite_newer_session(self, tmp_path):
+        from agentic_engine.storage import SessionConflictError
+        db = str(tmp_path / "s.db")
+        a = self._instance(db)
+        b = self._instance(db)
+        a.create_session("s1")
+        b.get_session("s1")                         # b caches version 1
+        a.update_data("s1", "x", 1)                 # version 2
+        with pytest.raises(SessionConflictError):
+            b.update_data("s1", "y", 2)             # trusted stale copy → conflict
+        b.update_data("s1", "y", 2)                 # entry dropped, re-read, succeeds
+        assert a.storage.backend.get_session("s1")["data"] == {"x": 1, "y": 2}
+
+    def test_lru_is_bounded(self, tmp_path):
+        sm = self._instance(str(tmp_path / "s.db"), max_entries=2)
+        for sid in ("a", "b", "c"):
+            sm.create_session(sid)
+        stats = sm.storage.cache.stats()
+        assert stats["entries"] == 2 and stats["evictions"] == 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SHARED SESSION MANAGER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSharedSessionManager:
+    @pytest.fixture(autouse=True)
+    def _isolated(self, tmp_path, monkeypatch):
+        from agentic_engine.session_manager import reset_session_managers
+        monkeypatch.setenv("STORAGE_TYPE", "local")
+        monkeypatch.setenv("SESSION_DB_PATH", str(tmp_path / "sessions.db"))
+        reset_session_managers()
+        yield
+        reset_session_managers()
+
+    def test_one_manager_per_storage_config(self):
+        from agentic_engine.session_manager import get_session_manager
+        sm = get_session_manager()
+        assert get_session_manager() is sm
+        assert get_session_manager("json") is not sm
+
+    def test_dynamodb_initialized_once(self):
+        from agentic_engine.session_manager import get_session_manager
+        with patch("agentic_engine.storage.DynamoDBStorage.initialize") as init:
+            for _ in range(5):
+                get_session_manager("dynamodb")
+        assert init.call_count == 1
+
+    def test_failed_init_is_retried_after_backoff(self):
+        from agentic_engine import session_manager
+        with patch("agentic_engine.storage.DynamoDBStorage.initialize",
+                   side_effect=RuntimeError("table missing")) as init:
+            with pytest.raises(RuntimeError):
+                session_manager.get_session_manager("dynamodb")
+            with pytest.raises(RuntimeError, match="unavailable"):
+                session_manager.get_session_manager("dynamodb")
+            assert init.call_count == 1
+            with patch.object(session_manager, "_INIT_RETRY_SECONDS", 0):
+                with pytest.raises(RuntimeError):
+                    session_manager.get_session_manager("dynamodb")
+            assert init.call_count == 2
+
+    def test_health_reports_backend_state(self):
+        from agentic_engine.session_manager import session_store_health
+        assert session_store_health() == {"backend": "sqlite", "state": "ok"}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# COMPACT ENCODING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSessionEncoding:
+    SESSION = {"current_state": "COLLECT_SLOTS", "data": {"state": "उत्तर प्रदेश", "land": 1.5, "n": [1, 2]}}
+
+    def test_json_fallback_round_trip(self):
+        from agentic_engine import codec
+        with patch.object(codec, "msgpack", None), patch.object(codec, "zstandard", None):
+            payload = codec.encode_session(self.SESSION)
+            assert payload[:1] == b"J" and b" " not in payload[:40]
+            assert codec.decode_session(payload) == self.SESSION
+
+    def test_decodes_legacy_json_text(self):
+        from agentic_engine.codec import decode_session
+        assert decode_session(json.dumps(self.SESSION)) == self.SESSION
+
+    def test_msgpack_zstd_round_trip(self):
+        pytest.importorskip("msgpack")
+        pytest.importorskip("zstandard")
+        from agentic_engine import codec
+        big = {"data": {"x": "y" * 5000}}
+        with patch.object(codec, "ZSTD_MIN_BYTES", 100):
+            payload = codec.encode_session(big)
+        assert payload[:1] == b"Z" and len(payload) < 1000
+        assert codec.decode_session(payload) == big
+
+    def test_sqlite_reads_legacy_text_rows(self, tmp_path):
+        from agentic_engine.storage import SQLiteSessionStorage
+        storage = SQLiteSessionStorage(str(tmp_path / "s.db"))
+        storage.initialize()
+        storage._conn().execute(
+            "INSERT INTO sessions (session_id, payload, updated_at) VALUES (?, ?, ?)",
+            ("old", json.dumps(self.SESSION), time.time()),
+        )
+        assert storage.get_session("old")["data"] == self.SESSION["data"]
+
+    def test_apply_session_stores_scheme_reference_not_schemas(self):
+        from agentic_engine.session_manager import SessionManager
+        from agentic_engine.workflow_engine import AgenticWorkflowEngine, _slot_index
+        storage = _counting_storage()
+        engine = AgenticWorkflowEngine(SessionManager(storage))
+        engine.handle_input("s1", "start_apply:pm_kisan")
+        data = storage.sessions["s1"]["data"]
+        assert "_slot_schemas" not in data
+        assert data["_scheme_version"] == _slot_index("pm_kisan")[0]
+        engine.handle_input("s1", "DTMF:2")          # resolved via catalog dtmf_map
+        assert storage.sessions["s1"]["data"]["state"] == "tamil nadu"
+
+    def test_legacy_session_with_embedded_schemas(self):
+        from agentic_engine.session_manager import SessionManager
+        from agentic_engine.workflow_engine import AgenticWorkflowEngine
+        storage = _counting_storage()
+        storage.sessions["s1"] = {"current_state": "COLLECT_SLOTS", "data": {
+            "_scheme": "pm_kisan", "_pending_slots": ["state", "land_hectares"],
+            "_slot_schemas": {"state": {"key": "state", "dtmf_map": {"9": "legacy"}}},
+        }}
+        engine = AgenticWorkflowEngine(SessionManager(storage))
+        engine.handle_input("s1", "DTMF:9")
+        assert storage.sessions["s1"]["data"]["state"] == "legacy"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TTL SWEEPER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSessionSweeper:
+    def _sqlite(self, tmp_path, n_old=7, n_new=3):
+        from agentic_engine.storage import SQLiteSessionStorage
+        storage = SQLiteSessionStorage(str(tmp_path / "s.db"))
+        storage.initialize()
+        for i in range(n_old + n_new):
+            storage.put_session(f"s{i}", {"current_state": "START", "data": {"i": i}})
+        storage._conn().execute(
+            "UPDATE sessions SET updated_at = ? WHERE session_id IN (%s)" % ",".join("?" * n_old),
+            [time.time() - 10 * 86400] + [f"s{i}" for i in range(n_old)],
+        )
+        return storage
+
+    def test_expires_in_bounded_batches(self, tmp_path):
+        from app.services.session_sweeper import SessionSweeper
+        storage = self._sqlite(tmp_path)
+        sweeper = SessionSweeper(storage, ttl_s=86400, batch_size=3, max_batches=2)
+        assert sweeper.sweep_sessions() == {"expired": 6, "batches": 2, "more": True}
+        assert sweeper.sweep_sessions()["expired"] == 1
+        assert len(storage.load()) == 3
+
+    def test_expired_session_not_readable_before_sweep(self, tmp_path):
+        storage = self._sqlite(tmp_path)
+        assert storage.get_session("s0") is None
+        assert storage.get_version("s0") is None
+        assert storage.get_session("s9")["data"]["i"] == 9
+
+    def test_json_store_expiry_and_compaction(self, tmp_path):
+        from agentic_engine.storage import LocalJSONStorage
+        from app.services.session_sweeper import SessionSweeper
+        storage = LocalJSONStorage(str(tmp_path / "sessions.json"))
+        storage.save({"old": {"created_at": time.time() - 10 * 86400}, "new": {"created_at": time.time()}})
+        assert SessionSweeper(storage, ttl_s=86400).sweep_sessions()["expired"] == 1
+        assert list(storage.load()) == ["new"]
+
+    def test_dynamodb_relies_on_native_ttl(self):
+        from agentic_engine.storage import DynamoDBStorage
+        from app.services.session_sweeper import SessionSweeper
+        report = SessionSweeper(DynamoDBStorage("t", "us-east-1")).sweep_sessions()
+        assert report["skipped"] == "native TTL"
+
+    def test_histograms(self, tmp_path):
+        from app.services.session_sweeper import SessionSweeper
+        hist = SessionSweeper(self._sqlite(tmp_path)).session_histograms()
+        assert hist["count"] == 10
+        assert hist["age_seconds"]["+Inf"] == 7 and hist["age_seconds"]["300"] == 3
+        assert sum(hist["size_bytes"].values()) == 10
+
+    def test_ivr_idle_sessions_pruned(self):
+        from datetime import datetime, timezone, timedelta
+        from app.services import ivr_service
+        stale = (datetime.now(timezone.utc) - timedelta(hours=2)).isoformat()
+        fresh = datetime.now(timezone.utc).isoformat()
+        with patch.dict(ivr_service._active_sessions, {"a": {"last_seen": stale}, "b": {"last_seen": fresh}},
+                        clear=True):
+            assert ivr_service.IVRService().prune_idle_sessions(3600) == 1
+            assert list(ivr_service._active_sessions) == ["b"]
+
+    def test_run_once_isolates_failures(self, tmp_path):
+        from app.services.session_sweeper import SessionSweeper
+        sweeper = SessionSweeper(self._sqlite(tmp_path), ttl_s=86400)
+        with patch.object(SessionSweeper, "sweep_hitl", side_effect=RuntimeError("boom")):
+            report = sweeper.run_once()
+        assert report["sessions"]["expired"] == 7
+        assert "error" in report["hitl_pruned"]
+        assert sweeper.last_report is report
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,268 @@
+"""
+tests/test_telemetry.py — Observability tests for JanSathi
+===========================================================
+Tests cover:
+  1. Bedrock token + cost accounting
+  2. Batched statistic-set emitter (CloudWatch / EMF)
+  3. Mergeable latency histograms + rolling percentiles
+  4. Prometheus /metrics exposition
+"""
+import sys
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+
+# ── Path setup ────────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TOKEN USAGE ACCOUNTING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestTokenUsage:
+    def _tracker(self):
+        from app.services.token_usage_service import TokenUsageTracker
+        return TokenUsageTracker(window_minutes=5, max_prompts=2)
+
+    def test_rolling_totals_and_cost(self):
+        tracker = self._tracker()
+        tracker.record({"inputTokens": 1000, "outputTokens": 500}, "amazon.nova-lite-v1:0",
+                       label="rag", route="/v1/query")
+        tracker.record(None, "amazon.nova-lite-v1:0", label="rag", route="/v1/query", cache_status="hit")
+        summary = tracker.summary()
+        assert summary["input_tokens"] == 1000
+        assert summary["output_tokens"] == 500
+        assert summary["cost_usd"] == pytest.approx(0.00006 + 0.00012)
+        assert summary["cache_hit_ratio"] == 0.5
+
+    def test_top_prompts_ranked_and_bounded(self):
+        tracker = self._tracker()
+        tracker.record({"inputTokens": 10}, "m", label="small")
+        tracker.record({"inputTokens": 900}, "m", label="big")
+        tracker.record({"inputTokens": 500}, "m", label="medium")   # evicts "small"
+        labels = [p["label"] for p in tracker.top_prompts()]
+        assert labels == ["big", "medium"]
+
+    def test_usage_context_tags_session_and_route(self):
+        from app.services.token_usage_service import usage_context
+        tracker = self._tracker()
+        with usage_context(session_id="s-42", route="agent"):
+            tracker.record({"inputTokens": 5}, "m", label="x")
+        top = tracker.top_prompts()[0]
+        assert top["last_session"] == "s-42"
+        assert top["route"] == "agent"
+
+    def test_prompt_text_never_stored_and_route_is_templated(self):
+        from flask import Flask
+        app = Flask(__name__)
+        app.add_url_rule("/v1/cases/<case_id>", "case", lambda case_id: "")
+        tracker = self._tracker()
+        with app.test_request_context("/v1/cases/c-123"):
+            tracker.record({"inputTokens": 5}, "m", prompt="Mera naam Ramesh hai, phone 9876543210")
+        top = tracker.top_prompts()[0]
+        assert top["route"] == "/v1/cases/<case_id>"
+        assert top["label"] == "/v1/cases/<case_id>:m"
+        assert "Ramesh" not in str(top) and top["max_prompt_chars"] == 38
+
+    def test_nova_converse_reports_usage(self):
+        from app.services import token_usage_service
+        from agents.nova_client import nova_converse, build_user_message
+        tracker = self._tracker()
+        mock_bedrock = MagicMock()
+        mock_bedrock.converse.return_value = {
+            "output": {"message": {"content": [{"text": "ok"}]}},
+            "usage": {"inputTokens": 120, "outputTokens": 30},
+        }
+        with patch.object(token_usage_service, "_tracker", tracker), \
+             patch.dict("app.core.resilience._breakers", clear=True), \
+             patch("agents.nova_client.get_bedrock_client", return_value=mock_bedrock):
+            nova_converse([build_user_message("What is PM Kisan?")])
+        assert tracker.summary()["input_tokens"] == 120
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BATCHED EMITTER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestTelemetryEmitter:
+    def _service(self, sink):
+        from app.services.telemetry_service import TelemetryService
+        tel = TelemetryService(sink=sink, flush_seconds=3600)
+        tel._ensure_flusher = lambda: None
+        if sink == "cloudwatch":
+            tel._sink, tel._cw = "cloudwatch", MagicMock()
+        return tel
+
+    def test_points_fold_into_statistic_sets(self):
+        tel = self._service("cloudwatch")
+        for ms in (120.0, 80.0, 400.0):
+            tel.emit("BedrockLatencyMs", ms, {"route": "/v1/query"})
+        tel._cw.put_metric_data.assert_not_called()            # nothing on the request path
+        assert tel.flush() == 1
+        datum = tel._cw.put_metric_data.call_args.kwargs["MetricData"][0]
+        assert datum["StatisticValues"] == {"SampleCount": 3, "Sum": 600.0, "Minimum": 80.0, "Maximum": 400.0}
+        assert datum["Dimensions"] == [{"Name": "route", "Value": "/v1/query"}]
+        assert tel.get_summary()["BedrockLatencyMs"] == {"total": 600.0, "count": 3}
+        assert tel.flush() == 0
+
+    def test_flush_batches_at_most_1000_datums(self):
+        tel = self._service("cloudwatch")
+        for i in range(1500):
+            tel.emit("CallProcessed", 1.0, {"session": str(i)})
+        assert tel.flush() == 1500
+        sizes = [len(c.kwargs["MetricData"]) for c in tel._cw.put_metric_data.call_args_list]
+        assert sizes == [1000, 500]
+
+    def test_emf_lines_on_stdout(self, capsys):
+        import json
+        tel = self._service("emf")
+        tel.emit("HITLCreated", 1.0, {"scheme": "pm_kisan"})
+        doc = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+        assert doc["HITLCreated"] == 1.0 and doc["scheme"] == "pm_kisan"
+        assert doc["_aws"]["CloudWatchMetrics"][0]["Dimensions"] == [["scheme"]]
+
+    def test_local_buffer_is_bounded(self):
+        from app.services.telemetry_service import _local_buffer
+        tel = self._service("log")
+        for _ in range(_local_buffer.maxlen + 10):
+            tel.emit("WebChatQuery")
+        assert len(tel.get_local_metrics()) == _local_buffer.maxlen
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LATENCY HISTOGRAMS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestLatencyHistograms:
+    def test_percentiles_within_relative_error(self):
+        from app.services.latency_histogram import LogHistogram
+        h = LogHistogram(precision=0.01)
+        values = list(range(1, 10001))                          # 1 ms … 10 s
+        for v in values:
+            h.record(float(v))
+        for q, exact in ((0.5, 5000.5), (0.9, 9000.1), (0.99, 9900.01)):
+            assert h.percentile(q) == pytest.approx(exact, rel=0.02)
+        assert h.max == 10000.0 and len(h.counts) < 1000
+
+    def test_worker_histograms_merge(self):
+        from app.services.latency_histogram import LatencyHistograms, merge_exports
+        a, b = LatencyHistograms(), LatencyHistograms()
+        for v in range(1, 101):
+            a.record("RequestLatencyMs", float(v), {"route": "/v1/query"})
+        for v in range(101, 201):
+            b.record("RequestLatencyMs", float(v), {"route": "/v1/query"})
+        merged = merge_exports([a.export(), b.export()])["RequestLatencyMs"][0]
+        assert merged["labels"] == {"route": "/v1/query"}
+        assert merged["count"] == 200 and merged["max"] == 200.0
+        assert merged["p50"] == pytest.approx(100.5, rel=0.02)
+
+    def test_rolling_window_drops_old_minutes(self):
+        from app.services.latency_histogram import RollingHistogram
+        r = RollingHistogram(window_minutes=2)
+        r.record(5000.0, now=0)
+        r.record(10.0, now=120)
+        r.record(20.0, now=150)
+        snap = r.snapshot(now=150)
+        assert snap.count == 2 and snap.max == 20.0
+
+    def test_threads_record_into_own_shards(self):
+        import threading
+        from app.services.latency_histogram import RollingHistogram
+        r = RollingHistogram(window_minutes=2)
+        recorded, done = threading.Event(), threading.Event()
+
+        def worker(v):
+            for _ in range(50):
+                r.record(v)
+
+        threads = [threading.Thread(target=worker, args=(float(v),)) for v in (10, 20, 30)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()                                  # finished threads → retired minutes
+        live = threading.Thread(target=lambda: (r.record(40.0), recorded.set(), done.wait(5)))
+        live.start()
+        recorded.wait(5)
+        try:
+            snap = r.snapshot()
+            assert snap.count == 151 and snap.max == 40.0
+            assert r.snapshot().count == 151        # retired minutes not double-counted
+        finally:
+            done.set()
+            live.join()
+
+    def test_emit_and_breaker_feed_histograms(self):
+        import app.services.latency_histogram as lh
+        from app.services.telemetry_service import TelemetryService
+        from app.core.resilience import CircuitBreaker
+        lh._histograms = lh.LatencyHistograms()
+        tel = TelemetryService(sink="log")
+        tel.emit("BedrockLatencyMs", 250.0, {"agent": "intent"})
+        tel.emit("CallProcessed", 1.0)
+        CircuitBreaker("kendra").record(True, 40.0)
+        summary = lh.get_latency_histograms().summary()
+        assert summary["BedrockLatencyMs"][0]["p99"] == pytest.approx(250.0, rel=0.02)
+        assert summary["DependencyLatencyMs"][0]["labels"] == {"dependency": "kendra"}
+        assert "CallProcessed" not in summary
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PROMETHEUS EXPOSITION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestMetricsExporter:
+    def test_sharded_counters_sum_live_and_finished_threads(self):
+        import threading
+        from app.services.metrics_exporter import ShardedCounters
+        counters = ShardedCounters()
+        threads = [threading.Thread(target=lambda: [counters.add(("k",)) for _ in range(100)])
+                   for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        counters.add(("k",), 5)
+        assert counters.snapshot()[("k",)] == 405
+        assert counters.snapshot()[("k",)] == 405                # retired shards not double-counted
+
+    def test_dead_thread_shards_pruned_without_scrapes(self):
+        import threading
+        from app.services.metrics_exporter import ShardedCounters, ThreadShards
+        counters = ShardedCounters()
+        for _ in range(300):                         # thread-per-request, nobody scraping
+            t = threading.Thread(target=counters.add, args=(("k",),))
+            t.start()
+            t.join()
+        assert len(counters._shards) < 2 * ThreadShards.MIN_PRUNE
+        assert counters.snapshot()[("k",)] == 300
+
+    def test_latency_rendered_as_cumulative_histogram(self):
+        from app.services.metrics_exporter import render_metrics
+        from app.services.latency_histogram import LatencyHistograms
+        h = LatencyHistograms()
+        for v in (3, 40, 40, 700):
+            h.record("TestRenderLatencyMs", v, {"route": '/v1/"q"'})
+        text = render_metrics()
+        assert "# TYPE jansathi_test_render_latency_ms histogram" in text
+        labels = 'route="/v1/\\"q\\""'
+        assert f'jansathi_test_render_latency_ms_bucket{{{labels},le="5"}} 1' in text
+        assert f'jansathi_test_render_latency_ms_bucket{{{labels},le="50"}} 3' in text
+        assert f'jansathi_test_render_latency_ms_bucket{{{labels},le="+Inf"}} 4' in text
+        assert f"jansathi_test_render_latency_ms_count{{{labels}}} 4" in text
+
+    def test_endpoint_reports_breakers_and_queues(self):
+        from main import create_app
+        from app.services import metrics_exporter
+        metrics_exporter._queue_cache.update(at=0.0, depths={})
+        with patch("app.services.hitl_service.HITLService.count_cases", return_value=3):
+            resp = create_app().test_client().get("/metrics")
+        assert resp.status_code == 200
+        assert resp.mimetype == "text/plain"
+        text = resp.get_data(as_text=True)
+        assert 'jansathi_queue_depth{queue="hitl"} 3' in text
+        assert 'jansathi_circuit_state{dependency="bedrock",state="closed"}' in text
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])